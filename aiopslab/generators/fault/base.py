@@ -8,12 +8,148 @@ are implemented as child classes of FaultInjector.
 """
 
 import time
+from collections import Counter
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from kubernetes.client.rest import ApiException
+
+from aiopslab.utils.convergence import wait_until
+
+# Upper bound on Kubernetes API requests a bulk operation issues at once
+MAX_CONCURRENT_OPS = 8
+
+# How long to wait for an injected fault to take effect
+FAULT_EFFECT_TIMEOUT = 90
+
+# Settle time for faults that do not define a verify_<fault_type> predicate
+DEFAULT_SETTLE_TIME = 6
 
 
 class FaultInjector:
     def __init__(self, testbed):
         self.testbed = testbed
 
+    ############# BULK OPERATIONS ################
+    # NOTE: these use `self.kubectl`, which every injector sets up.
+
+    def run_concurrently(self, fn, items) -> list:
+        """Apply `fn` to every item in parallel and return the results in order."""
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_OPS, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    def delete_pods(self, pods: list[str], namespace: str, wait=True, timeout=120):
+        """Delete pods concurrently, then wait once until all were replaced.
+
+        Replacement pods are not required to become Ready, since the fault
+        usually keeps them from doing so.
+        """
+        if not pods:
+            return
+
+        owners = {}
+        expected = Counter()
+        for pod in self.kubectl.list_pods(namespace).items:
+            owner = _pod_owner(pod)
+            if owner and pod.metadata.deletion_timestamp is None:
+                expected[owner] += 1
+            if pod.metadata.name in pods:
+                owners[pod.metadata.name] = owner
+
+        def delete(pod):
+            try:
+                self.kubectl.core_v1_api.delete_namespaced_pod(pod, namespace)
+                return f'pod "{pod}" deleted'
+            except ApiException as e:
+                return f"Error deleting pod {pod}: {e.reason}"
+
+        for pod, result in zip(pods, self.run_concurrently(delete, pods)):
+            print(f"Deleted service pod {pod} to enforce the fault: {result}")
+
+        if wait:
+            replaced = {owner: expected[owner] for owner in owners.values() if owner}
+            self.wait_for_pods_replaced(namespace, pods, replaced, timeout)
+
+    def wait_for_pods_replaced(
+        self, namespace: str, deleted: list[str], expected: dict, timeout=120, sleep=0.5
+    ) -> bool:
+        """Wait until deleted pods are gone and their owners are back to full size.
+
+        Args:
+            namespace (str): Namespace of the pods.
+            deleted (list[str]): Names of the deleted pods.
+            expected (dict): Owner (e.g. "ReplicaSet/geo-5d8f") -> pod count to restore.
+            timeout (int): Maximum seconds to wait.
+            sleep (float): Initial seconds between checks (backs off from there).
+
+        Returns:
+            bool: True if the condition was met within the timeout.
+        """
+        deleted = set(deleted)
+
+        def replaced():
+            pods = self.kubectl.list_pods(namespace).items
+            live = [pod for pod in pods if pod.metadata.deletion_timestamp is None]
+            counts = Counter(_pod_owner(pod) for pod in live)
+            return not deleted & {pod.metadata.name for pod in pods} and all(
+                counts[owner] >= n for owner, n in expected.items()
+            )
+
+        return wait_until(
+            replaced,
+            timeout=timeout,
+            initial=sleep,
+            description=f"deleted pods to be replaced in {namespace}",
+        )
+
+    def patch_deployments(self, patches: dict, namespace: str):
+        """Patch several deployments concurrently.
+
+        Args:
+            patches (dict): Deployment name -> patch body.
+            namespace (str): Namespace of the deployments.
+        """
+
+        def patch(name):
+            try:
+                self.kubectl.apps_v1_api.patch_namespaced_deployment(
+                    name, namespace, patches[name]
+                )
+                return True
+            except ApiException as e:
+                print(f"Error patching deployment {name}: {e.reason}")
+                return False
+
+        return dict(zip(patches, self.run_concurrently(patch, patches)))
+
+    def restart_deployments(self, deployments: list[str], namespace: str):
+        """Concurrent equivalent of `kubectl rollout restart deployment ...`."""
+        restarted_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        body = {
+            "spec": {
+                "template": {
+                    "metadata": {
+                        "annotations": {
+                            "kubectl.kubernetes.io/restartedAt": restarted_at
+                        }
+                    }
+                }
+            }
+        }
+        results = self.patch_deployments({name: body for name in deployments}, namespace)
+        for name, ok in results.items():
+            if ok:
+                print(f"deployment.apps/{name} restarted")
+        return results
+
+    def scale_deployments(self, deployments: list[str], namespace: str, replicas: int):
+        """Concurrent equivalent of `kubectl scale deployment ... --replicas=N`."""
+        body = {"spec": {"replicas": replicas}}
+        return self.patch_deployments({name: body for name in deployments}, namespace)
+
     # Deprecated method
     def inject_fault(
         self,
@@ -48,7 +184,27 @@ class FaultInjector:
             self._invoke_method("inject", fault_type, microservices)
         else:
             self._invoke_method("inject", fault_type)
-        time.sleep(6)
+        self._wait_for_effect(fault_type, microservices)
+
+    def _wait_for_effect(self, fault_type: str, microservices: list[str] = None):
+        """Return as soon as the fault is observable in the cluster.
+
+        Each injector may define `verify_<fault_type>(microservices)` returning True
+        once the fault is effective; faults without one get a fixed settle time.
+        """
+        verify = getattr(self, f"verify_{fault_type}", None)
+        if verify is None:
+            time.sleep(DEFAULT_SETTLE_TIME)
+            return
+
+        args = (microservices,) if microservices else ()
+        start = time.time()
+        if wait_until(
+            lambda: verify(*args),
+            timeout=FAULT_EFFECT_TIMEOUT,
+            description=f"{fault_type} to take effect",
+        ):
+            print(f"Fault {fault_type} effective after {time.time() - start:.1f}s")
 
     def _recover(
         self,
@@ -68,3 +224,11 @@ class FaultInjector:
             method(*args[1:])
         else:
             print(f"Unknown fault type: {args[0]}")
+
+
+def _pod_owner(pod) -> str | None:
+    """The controller owning a pod, e.g. "ReplicaSet/geo-5d8f", or None."""
+    for ref in pod.metadata.owner_references or []:
+        if ref.controller:
+            return f"{ref.kind}/{ref.name}"
+    return None
@@ -3,34 +3,75 @@
 
 """Inject faults at the application layer: Code, MongoDB, Redis, etc."""
 
-import time
 from aiopslab.generators.fault.base import FaultInjector
 from aiopslab.service.kubectl import KubeCtl
 
 
 class ApplicationFaultInjector(FaultInjector):
     def __init__(self, namespace: str):
+        super().__init__(namespace)
         self.namespace = namespace
         self.kubectl = KubeCtl()
         self.mongo_service_pod_map = {"mongodb-rate": "rate", "mongodb-geo": "geo"}
 
     def delete_service_pods(self, target_service_pods: list[str]):
-        """Kill the corresponding service pod to enforce the fault."""
-        for pod in target_service_pods:
-            delete_pod_command = f"kubectl delete pod {pod} -n {self.namespace}"
-            delete_result = self.kubectl.exec_command(delete_pod_command)
-            print(f"Deleted service pod {pod} to enforce the fault: {delete_result}")
+        """Kill the corresponding service pods to enforce the fault."""
+        self.delete_pods(target_service_pods, self.namespace)
+
+    def _run_mongo_scripts(self, service: str, pods: list[str], script: str, action: str):
+        """Run a script on all MongoDB pods of a service concurrently."""
+
+        def run(pod):
+            return self.kubectl.exec_command(
+                f"kubectl exec -it {pod} -n {self.namespace} -- /bin/bash /scripts/{script}"
+            )
+
+        for result in self.run_concurrently(run, pods):
+            print(f"{action} result for {service}: {result}")
 
     ############# FAULT LIBRARY ################
+    # verify_<fault_type> predicates report when an injected fault is effective
+    # (see FaultInjector._wait_for_effect).
+
+    def verify_revoke_auth(self, microservices: list[str]) -> bool:
+        # delete_service_pods already waited for the pods that pick up the fault
+        return True
+
+    def verify_storage_user_unregistered(self, microservices: list[str]) -> bool:
+        return True
+
+    def verify_misconfig_app(self, microservices: list[str]) -> bool:
+        """The pods running the buggy image are crash-looping."""
+        for service in microservices:
+            pods = [
+                pod
+                for pod in self.kubectl.list_pods(self.namespace).items
+                if pod.metadata.name.startswith(f"{service}-")
+                and pod.metadata.deletion_timestamp is None
+            ]
+            crashing = [
+                pod
+                for pod in pods
+                for cs in pod.status.container_statuses or []
+                if cs.image.endswith("geo:app3")
+                and (
+                    (cs.state.waiting and cs.state.waiting.reason == "CrashLoopBackOff")
+                    or cs.restart_count > 0
+                )
+            ]
+            if not crashing:
+                return False
+        return True
+
     # A.1 - revoke_auth: Revoke admin privileges in MongoDB - Auth
     def inject_revoke_auth(self, microservices: list[str]):
         """Inject a fault to revoke admin privileges in MongoDB."""
         print(f"Microservices to inject: {microservices}")
         target_services = ["mongodb-rate", "mongodb-geo"]
+        pods_to_delete = []
         for service in target_services:
             if service in microservices:
                 pods = self.kubectl.list_pods(self.namespace)
-                # print(pods)
                 target_mongo_pods = [
                     pod.metadata.name
                     for pod in pods.items
@@ -47,19 +88,15 @@ class ApplicationFaultInjector(FaultInjector):
                 ]
                 print(f"Target Service Pods: {target_service_pods}")
 
-                for pod in target_mongo_pods:
-                    if service == "mongodb-rate":
-                        revoke_command = f"kubectl exec -it {pod} -n {self.namespace} -- /bin/bash /scripts/revoke-admin-rate-mongo.sh"
-                    elif service == "mongodb-geo":
-                        revoke_command = f"kubectl exec -it {pod} -n {self.namespace} -- /bin/bash /scripts/revoke-admin-geo-mongo.sh"
-                    result = self.kubectl.exec_command(revoke_command)
-                    print(f"Injection result for {service}: {result}")
+                script = f"revoke-admin-{self.mongo_service_pod_map[service]}-mongo.sh"
+                self._run_mongo_scripts(service, target_mongo_pods, script, "Injection")
+                pods_to_delete.extend(target_service_pods)
 
-                self.delete_service_pods(target_service_pods)
-                time.sleep(3)
+        self.delete_service_pods(pods_to_delete)
 
     def recover_revoke_auth(self, microservices: list[str]):
         target_services = ["mongodb-rate", "mongodb-geo"]
+        pods_to_delete = []
         for service in target_services:
             print(f"Microservices to recover: {microservices}")
             if service in microservices:
@@ -77,20 +114,17 @@ class ApplicationFaultInjector(FaultInjector):
                     for pod in pods.items
                     if self.mongo_service_pod_map[service] in pod.metadata.name
                 ]
-                for pod in target_mongo_pods:
-                    if service == "mongodb-rate":
-                        recover_command = f"kubectl exec -it {pod} -n {self.namespace} -- /bin/bash /scripts/revoke-mitigate-admin-rate-mongo.sh"
-                    elif service == "mongodb-geo":
-                        recover_command = f"kubectl exec -it {pod} -n {self.namespace} -- /bin/bash /scripts/revoke-mitigate-admin-geo-mongo.sh"
-                    result = self.kubectl.exec_command(recover_command)
-                    print(f"Recovery result for {service}: {result}")
+                script = f"revoke-mitigate-admin-{self.mongo_service_pod_map[service]}-mongo.sh"
+                self._run_mongo_scripts(service, target_mongo_pods, script, "Recovery")
+                pods_to_delete.extend(target_service_pods)
 
-                self.delete_service_pods(target_service_pods)
+        self.delete_service_pods(pods_to_delete)
 
     # A.2 - storage_user_unregistered: User not registered in MongoDB - Storage/Net
     def inject_storage_user_unregistered(self, microservices: list[str]):
         """Inject a fault to create an unregistered user in MongoDB."""
         target_services = ["mongodb-rate", "mongodb-geo"]
+        pods_to_delete = []
         for service in target_services:
             if service in microservices:
                 pods = self.kubectl.list_pods(self.namespace)
@@ -106,15 +140,16 @@ class ApplicationFaultInjector(FaultInjector):
                     for pod in pods.items
                     if pod.metadata.name.startswith(self.mongo_service_pod_map[service])
                 ]
-                for pod in target_mongo_pods:
-                    revoke_command = f"kubectl exec -it {pod} -n {self.namespace} -- /bin/bash /scripts/remove-admin-mongo.sh"
-                    result = self.kubectl.exec_command(revoke_command)
-                    print(f"Injection result for {service}: {result}")
+                self._run_mongo_scripts(
+                    service, target_mongo_pods, "remove-admin-mongo.sh", "Injection"
+                )
+                pods_to_delete.extend(target_service_pods)
 
-                self.delete_service_pods(target_service_pods)
+        self.delete_service_pods(pods_to_delete)
 
     def recover_storage_user_unregistered(self, microservices: list[str]):
         target_services = ["mongodb-rate", "mongodb-geo"]
+        pods_to_delete = []
         for service in target_services:
             if service in microservices:
                 pods = self.kubectl.list_pods(self.namespace)
@@ -130,15 +165,11 @@ class ApplicationFaultInjector(FaultInjector):
                     for pod in pods.items
                     if pod.metadata.name.startswith(self.mongo_service_pod_map[service])
                 ]
-                for pod in target_mongo_pods:
-                    if service == "mongodb-rate":
-                        revoke_command = f"kubectl exec -it {pod} -n {self.namespace} -- /bin/bash /scripts/remove-mitigate-admin-rate-mongo.sh"
-                    elif service == "mongodb-geo":
-                        revoke_command = f"kubectl exec -it {pod} -n {self.namespace} -- /bin/bash /scripts/remove-mitigate-admin-geo-mongo.sh"
-                    result = self.kubectl.exec_command(revoke_command)
-                    print(f"Recovery result for {service}: {result}")
+                script = f"remove-mitigate-admin-{self.mongo_service_pod_map[service]}-mongo.sh"
+                self._run_mongo_scripts(service, target_mongo_pods, script, "Recovery")
+                pods_to_delete.extend(target_service_pods)
 
-                self.delete_service_pods(target_service_pods)
+        self.delete_service_pods(pods_to_delete)
 
     # A.3 - misconfig_app: pull the buggy config of the application image - Misconfig
     def inject_misconfig_app(self, microservices: list[str]):
@@ -155,7 +186,6 @@ class ApplicationFaultInjector(FaultInjector):
                     if container.name == f"hotel-reserv-{service}":
                         container.image = "yinfangchen/geo:app3"
                 self.kubectl.update_deployment(service, self.namespace, deployment)
-                time.sleep(10)
 
     def recover_misconfig_app(self, microservices: list[str]):
         for service in microservices:
@@ -6,6 +6,7 @@ from aiopslab.service.kubectl import KubeCtl
 
 class OtelFaultInjector(FaultInjector):
     def __init__(self, namespace: str):
+        super().__init__(namespace)
         self.namespace = namespace
         self.kubectl = KubeCtl()
         self.configmap_name = "flagd-config"
@@ -40,9 +41,7 @@ class OtelFaultInjector(FaultInjector):
             self.configmap_name, self.namespace, updated_data
         )
 
-        self.kubectl.exec_command(
-            f"kubectl rollout restart deployment flagd -n {self.namespace}"
-        )
+        self.restart_deployments(["flagd"], self.namespace)
         
         print(f"Fault injected: Feature flag '{feature_flag}' set to 'on'.")
 
@@ -76,9 +75,7 @@ class OtelFaultInjector(FaultInjector):
             self.configmap_name, self.namespace, updated_data
         )
 
-        self.kubectl.exec_command(
-            f"kubectl rollout restart deployment flagd -n {self.namespace}"
-        )
+        self.restart_deployments(["flagd"], self.namespace)
         print(f"Fault recovered: Feature flag '{feature_flag}' set to 'off'.")
 
 
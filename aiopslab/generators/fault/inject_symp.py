@@ -7,6 +7,7 @@ import threading
 import time
 import yaml
 from typing import List
+from kubernetes import client
 from aiopslab.service.helm import Helm
 from aiopslab.service.kubectl import KubeCtl
 from aiopslab.generators.fault.base import FaultInjector
@@ -46,6 +47,37 @@ class SymptomFaultInjector(FaultInjector):
         command = f"kubectl apply -f {chaos_yaml_path}"
         result = self.kubectl.exec_command(command)
         print(f"Applied {experiment_name} chaos experiment: {result}")
+        self.active_experiment = experiment_yaml
+
+    def is_experiment_injected(self) -> bool:
+        """Check if Chaos Mesh reports the last created experiment as AllInjected."""
+        experiment = getattr(self, "active_experiment", None)
+        if experiment is None:
+            return False
+
+        group, version = experiment["apiVersion"].split("/")
+        status = client.CustomObjectsApi(self.kubectl.api_client).get_namespaced_custom_object(
+            group,
+            version,
+            experiment["metadata"]["namespace"],
+            experiment["kind"].lower(),
+            experiment["metadata"]["name"],
+        ).get("status", {})
+        return any(
+            cond.get("type") == "AllInjected" and cond.get("status") == "True"
+            for cond in status.get("conditions") or []
+        )
+
+    # Every Chaos Mesh fault is effective once its experiment is fully injected
+    # (see FaultInjector._wait_for_effect).
+    def verify_pod_failure(self, *args) -> bool:
+        return self.is_experiment_injected()
+
+    verify_pod_kill = verify_pod_failure
+    verify_network_loss = verify_pod_failure
+    verify_network_delay = verify_pod_failure
+    verify_container_kill = verify_pod_failure
+    verify_kernel_fault = verify_pod_failure
 
     def delete_chaos_experiment(self, experiment_name: str):
         chaos_yaml_path = f"/tmp/{experiment_name}.yaml"
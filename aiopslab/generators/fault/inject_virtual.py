@@ -23,13 +23,44 @@ class VirtualizationFaultInjector(FaultInjector):
         }
 
     def delete_service_pods(self, target_service_pods: list[str]):
-        """Kill the corresponding service pod to enforce the fault."""
-        for pod in target_service_pods:
-            delete_pod_command = f"kubectl delete pod {pod} -n {self.namespace}"
-            delete_result = self.kubectl.exec_command(delete_pod_command)
-            print(f"Deleted service pod {pod} to enforce the fault: {delete_result}")
+        """Kill the corresponding service pods to enforce the fault."""
+        self.delete_pods(target_service_pods, self.namespace)
 
     ############# FAULT LIBRARY ################
+    # verify_<fault_type> predicates report when an injected fault is effective
+    # (see FaultInjector._wait_for_effect).
+
+    def verify_misconfig_k8s(self, microservices: list[str]) -> bool:
+        for service in microservices:
+            spec = self.kubectl.core_v1_api.read_namespaced_service(service, self.testbed).spec
+            if not any(port.target_port == 9999 for port in spec.ports):
+                return False
+        return True
+
+    def verify_scale_pods_to_zero(self, microservices: list[str]) -> bool:
+        return all(
+            not self.kubectl.get_deployment(service, self.namespace).status.replicas
+            for service in microservices
+        )
+
+    def verify_assign_to_non_existent_node(self, microservices: list[str]) -> bool:
+        for service in microservices:
+            pods = self._deployment_pods(service)
+            if not pods or any(pod.status.phase != "Pending" for pod in pods):
+                return False
+        return True
+
+    def _deployment_pods(self, service: str) -> list:
+        """Live pods selected by a deployment."""
+        deployment = self.kubectl.get_deployment(service, self.namespace)
+        selector = ",".join(
+            f"{k}={v}" for k, v in deployment.spec.selector.match_labels.items()
+        )
+        pods = self.kubectl.core_v1_api.list_namespaced_pod(
+            self.namespace, label_selector=selector
+        ).items
+        return [pod for pod in pods if pod.metadata.deletion_timestamp is None]
+
 
     # V.1 - misconfig_k8s: Misconfigure service port in Kubernetes - Misconfig
     def inject_misconfig_k8s(self, microservices: list[str]):
@@ -94,10 +125,7 @@ class VirtualizationFaultInjector(FaultInjector):
             ]
             print(f"Target Service Pods: {target_service_pods}")
             self.delete_service_pods(target_service_pods)
-
-            self.kubectl.exec_command(
-                f"kubectl rollout restart deployment {service} -n {self.namespace}"
-            )
+            self.restart_deployments([service], self.namespace)
 
     def recover_auth_miss_mongodb(self, microservices: list[str]):
         for service in microservices:
@@ -128,26 +156,20 @@ class VirtualizationFaultInjector(FaultInjector):
             print(f"Target Service Pods: {target_service_pods}")
 
             self.delete_service_pods(target_service_pods)
-            self.kubectl.exec_command(
-                f"kubectl rollout restart deployment {service} -n {self.namespace}"
-            )
+            self.restart_deployments([service], self.namespace)
 
     # V.3 - scale_pods_to_zero: Scale pods to zero - Deploy/Operation
     def inject_scale_pods_to_zero(self, microservices: list[str]):
         """Inject a fault to scale pods to zero for a service."""
+        self.scale_deployments(microservices, self.namespace, replicas=0)
         for service in microservices:
-            self.kubectl.exec_command(
-                f"kubectl scale deployment {service} --replicas=0 -n {self.namespace}"
-            )
             print(
                 f"Scaled deployment {service} to 0 replicas | namespace: {self.namespace}"
             )
 
     def recover_scale_pods_to_zero(self, microservices: list[str]):
+        self.scale_deployments(microservices, self.namespace, replicas=1)
         for service in microservices:
-            self.kubectl.exec_command(
-                f"kubectl scale deployment {service} --replicas=1 -n {self.namespace}"
-            )
             print(
                 f"Scaled deployment {service} back to 1 replica | namespace: {self.namespace}"
             )
@@ -3,10 +3,12 @@
 
 """Interface to the wrk workload generator."""
 
-from kubernetes import client, config
+from kubernetes import client
 from aiopslab.paths import BASE_DIR
+from aiopslab.service.apps.base import get_namespace_suffix
+from aiopslab.service.k8s_client import get_api_client
+from aiopslab.utils.convergence import wait_until
 import yaml
-import time
 
 
 class Wrk:
@@ -18,7 +20,7 @@ class Wrk:
         self.threads = threads
         self.latency = latency
 
-        config.load_kube_config()
+        self.api_client = get_api_client()
     
     def create_configmap(self, name, namespace, payload_script_path):
         with open(payload_script_path, "r") as script_file:
@@ -29,7 +31,7 @@ class Wrk:
             data={payload_script_path.name: script_content},
         )
 
-        api_instance = client.CoreV1Api()
+        api_instance = client.CoreV1Api(self.api_client)
         try:
             print(f"Checking for existing ConfigMap '{name}'...")
             api_instance.delete_namespaced_config_map(name=name, namespace=namespace)
@@ -46,7 +48,7 @@ class Wrk:
         except client.exceptions.ApiException as e:
             print(f"Error creating ConfigMap '{name}': {e}")
 
-    def create_wrk_job(self, job_name, namespace, payload_script, url):
+    def create_wrk_job(self, job_name, namespace, payload_script, url, configmap_name="wrk2-payload-script"):
         wrk_job_yaml = BASE_DIR / "generators" / "workload" / "wrk-job-template.yaml"
         with open(wrk_job_yaml, "r") as f:
             job_template = yaml.safe_load(f)
@@ -71,7 +73,7 @@ class Wrk:
         job_template["spec"]["template"]["spec"]["volumes"] = [
             {
                 "name": "wrk2-scripts",
-                "configMap": {"name": "wrk2-payload-script"},
+                "configMap": {"name": configmap_name},
             }
         ]
         job_template["spec"]["template"]["spec"]["containers"][0]["volumeMounts"] = [
@@ -82,7 +84,7 @@ class Wrk:
             }
         ]
 
-        api_instance = client.BatchV1Api()
+        api_instance = client.BatchV1Api(self.api_client)
         try:
             existing_job = api_instance.read_namespaced_job(name=job_name, namespace=namespace)
             if existing_job:
@@ -94,7 +96,11 @@ class Wrk:
                         propagation_policy="Foreground"
                     )
                 )
-                time.sleep(5)
+                wait_until(
+                    lambda: not self._job_exists(api_instance, job_name, namespace),
+                    timeout=60,
+                    description=f"job '{job_name}' to be deleted",
+                )
         except client.exceptions.ApiException as e:
             if e.status != 404:
                 print(f"Error checking for existing job: {e}")
@@ -107,29 +113,42 @@ class Wrk:
             print(f"Error creating job: {e}")
             return
 
+        def job_status():
+            return api_instance.read_namespaced_job_status(
+                name=job_name, namespace=namespace
+            ).status
+
+        if wait_until(
+            lambda: job_status().ready or job_status().failed,
+            timeout=300,
+            max_interval=2,
+            description=f"job '{job_name}'",
+        ):
+            print("Job failed." if job_status().failed else "Job completed successfully.")
+
+    @staticmethod
+    def _job_exists(api_instance, job_name, namespace) -> bool:
         try:
-            while True:
-                job_status = api_instance.read_namespaced_job_status(name=job_name, namespace=namespace)
-                if job_status.status.ready:
-                    print("Job completed successfully.")
-                    break
-                elif job_status.status.failed:
-                    print("Job failed.")
-                    break
-                time.sleep(5)
+            api_instance.read_namespaced_job(name=job_name, namespace=namespace)
+            return True
         except client.exceptions.ApiException as e:
-            print(f"Error monitoring job: {e}")
+            if e.status == 404:
+                return False
+            raise
 
     def start_workload(self, payload_script, url):
         namespace = "default"
-        configmap_name = "wrk2-payload-script"
+        # Keep concurrent problems (see orchestrator/parallel.py) from sharing a job
+        suffix = get_namespace_suffix()
+        configmap_name = "wrk2-payload-script" + suffix
 
         self.create_configmap(name=configmap_name, namespace=namespace, payload_script_path=payload_script)
 
         self.create_wrk_job(
-            job_name="wrk2-job",
+            job_name="wrk2-job" + suffix,
             namespace=namespace,
             payload_script=payload_script.name,
-            url=url
+            url=url,
+            configmap_name=configmap_name,
         )
 
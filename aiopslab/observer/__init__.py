@@ -6,7 +6,6 @@ import sys
 import pytz
 from datetime import datetime, timedelta
 
-from kubernetes import config, client
 from yaml import full_load
 
 root_path = pathlib.Path(__file__).parent
@@ -37,9 +36,6 @@ def get_services_list(v1, namespace="default"):
     return services_names
 
 
-config.kube_config.load_kube_config(config_file=monitor_config["kubernetes_path"])
-v1 = client.CoreV1Api()
-
 # pod_list = [
 #     pod
 #     for pod in get_pod_list(v1, namespace=monitor_config["namespace"])
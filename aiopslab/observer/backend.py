@@ -0,0 +1,321 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Where the observability actions read logs, metrics and traces from.
+
+`LiveBackend` queries the running cluster (pods or Loki, Prometheus, Jaeger).
+`RecordedBackend` serves a telemetry snapshot stored in SQLite, with indexed
+time-range lookups, so agents can be evaluated offline and every run sees the
+same incident. A recording is made from a `collect_snapshot` bundle with
+`record_snapshot`. Setting AIOPSLAB_TELEMETRY_DB to a recording selects the
+recorded backend; `set_backend` overrides the choice.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from aiopslab.observer.metric_api import PrometheusAPI
+from aiopslab.observer.metric_summary import summarize_frame
+from aiopslab.observer.trace_analysis import SPAN_COLUMNS
+from aiopslab.observer.trace_api import TraceAPI
+from aiopslab.observer.utils.frame_io import FrameWriter, iter_frame
+from aiopslab.paths import config
+from aiopslab.service.pod_logs import get_log_reader
+from aiopslab.service.telemetry.loki import POD_NAME_SUFFIX, get_loki
+
+TELEMETRY_DB_ENV = "AIOPSLAB_TELEMETRY_DB"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS metrics (
+    namespace TEXT, timestamp INTEGER, cmdb_id TEXT, pod TEXT, metric TEXT, value REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS metrics_key
+    ON metrics (namespace, timestamp, cmdb_id, metric);
+CREATE TABLE IF NOT EXISTS logs (
+    namespace TEXT, pod TEXT, timestamp REAL, date TEXT, message TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS logs_key
+    ON logs (namespace, pod, timestamp, message);
+CREATE TABLE IF NOT EXISTS spans (
+    namespace TEXT, trace_id TEXT, span_id TEXT, parent_span TEXT,
+    service_name TEXT, operation_name TEXT, start_time INTEGER, duration INTEGER,
+    has_error INTEGER, response TEXT
+);
+CREATE INDEX IF NOT EXISTS spans_time ON spans (namespace, start_time);
+CREATE UNIQUE INDEX IF NOT EXISTS spans_key ON spans (namespace, trace_id, span_id);
+"""
+
+
+class TelemetryBackend:
+    """Source of the telemetry returned by get_logs, get_metrics and get_traces."""
+
+    def now(self) -> datetime:
+        """The time "now" for windows ending now, e.g. the last 5 minutes."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def get_logs(self, namespace: str, service: str, timestamps: bool = False) -> str:
+        """Logs of a service's pods, with `==> pod <==` headers for several pods."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def summarize_metrics(self, namespace, start_time, end_time) -> pd.DataFrame:
+        """Per-pod metric summary with SUMMARY_COLUMNS, most anomalous first."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def export_metrics(self, namespace, start_time, end_time, save_path) -> str:
+        """Write the raw metrics to files; returns a description of them."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def get_spans(self, namespace, start_time, end_time) -> pd.DataFrame:
+        """Spans started in the window, with SPAN_COLUMNS."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+
+def label_selector(namespace: str, service: str) -> str:
+    """Label selector for the pods of a service of one of the applications."""
+    if namespace.startswith("test-social-network"):
+        return f"app={service}"
+    elif namespace.startswith("test-hotel-reservation"):
+        return f"io.kompose.service={service}"
+    elif namespace.startswith("astronomy-shop"):
+        return f"app.kubernetes.io/name={service}"
+    elif namespace == "default" and "wrk2-job" in service:
+        return f"job-name={service}"
+    raise ValueError(f"Unknown service {service} in {namespace}")
+
+
+class LiveBackend(TelemetryBackend):
+    """Telemetry of the running cluster."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def get_logs(self, namespace, service, timestamps=False):
+        selector = label_selector(namespace, service)
+        loki_url = config.get("loki_url")
+        if loki_url:
+            # Logs kept by Loki outlive restarted and deleted pods
+            return get_loki(loki_url).get_pod_logs(
+                namespace, service, timestamps=timestamps, label_selector=selector
+            )
+        # Only the part of each replica's log written since the last call is fetched
+        return get_log_reader().read_pods(namespace, selector, timestamps=timestamps)
+
+    def summarize_metrics(self, namespace, start_time, end_time):
+        # Reached through the session's shared port-forward
+        prometheus_api = PrometheusAPI(namespace=namespace)
+        return prometheus_api.summarize_metrics(start_time, end_time)
+
+    def export_metrics(self, namespace, start_time, end_time, save_path):
+        prometheus_api = PrometheusAPI(namespace=namespace)
+        return prometheus_api.export_all_metrics(
+            start_time=start_time, end_time=end_time, save_path=save_path, step=15
+        )
+
+    def get_spans(self, namespace, start_time, end_time):
+        trace_api = TraceAPI(namespace=namespace)
+        traces = trace_api.extract_traces(start_time=start_time, end_time=end_time)
+        return trace_api.process_traces(traces)
+
+
+def _epoch_column(series: pd.Series, unit: str) -> pd.Series:
+    """Epoch numbers from an exported time column (numbers in CSV, UTC in columnar)."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        delta = series - pd.Timestamp(0, tz="UTC")
+        return delta // pd.Timedelta(1, unit=unit)
+    return series
+
+
+def _frames(directory: Path):
+    for path in sorted(directory.rglob("*")):
+        if path.suffix in (".csv", ".parquet", ".arrow", ".feather"):
+            yield from iter_frame(str(path))
+
+
+def record_snapshot(bundle, db_path) -> str:
+    """Load a `collect_snapshot` bundle into a SQLite recording.
+
+    Several bundles can be recorded into the same database; the recording's
+    "now" is the latest end time among them. Rows already recorded, from the
+    same bundle or an overlapping one, are skipped.
+
+    Args:
+        bundle (str | Path): Snapshot bundle directory (with manifest.json).
+        db_path (str | Path): SQLite database to create or extend.
+
+    Returns:
+        str: The database path.
+    """
+    bundle = Path(bundle)
+    with open(bundle / "manifest.json") as f:
+        manifest = json.load(f)
+    namespace = manifest["namespace"]
+
+    with sqlite3.connect(db_path) as db:
+        db.executescript(SCHEMA)
+        for df in _frames(bundle / "metric"):
+            db.executemany(
+                "INSERT OR IGNORE INTO metrics VALUES (?, ?, ?, ?, ?, ?)",
+                zip(
+                    [namespace] * len(df),
+                    _epoch_column(df["timestamp"], "s").astype("int64").tolist(),
+                    df["cmdb_id"].astype(str).tolist(),
+                    df["cmdb_id"].astype(str).str.rsplit(".", n=1).str[-1].tolist(),
+                    df["kpi_name"].astype(str).tolist(),
+                    df["value"].astype(float).tolist(),
+                ),
+            )
+        for df in _frames(bundle / "log"):
+            namespaces = df["namespace"] if "namespace" in df else [namespace] * len(df)
+            db.executemany(
+                "INSERT OR IGNORE INTO logs VALUES (?, ?, ?, ?, ?)",
+                zip(
+                    [str(n) for n in namespaces],
+                    df["pod_name"].astype(str).tolist(),
+                    _epoch_column(df["timestamp"], "s").astype(float).tolist(),
+                    df["date"].astype(str).tolist(),
+                    df["message"].astype(str).tolist(),
+                ),
+            )
+        for df in _frames(bundle / "trace"):
+            df = df.assign(
+                start_time=_epoch_column(df["start_time"], "us").astype("int64"),
+                has_error=df["has_error"].astype(bool).astype(int),
+                response=df["response"].astype(str),
+            )
+            db.executemany(
+                "INSERT OR IGNORE INTO spans VALUES "
+                f"(?, {', '.join('?' * len(SPAN_COLUMNS))})",
+                (
+                    (namespace, *row)
+                    for row in df[SPAN_COLUMNS].itertuples(index=False, name=None)
+                ),
+            )
+
+        previous = db.execute(
+            "SELECT value FROM meta WHERE key = 'end_time'"
+        ).fetchone()
+        end_time = max(manifest["end_time"], previous[0] if previous else "")
+        db.execute("INSERT OR REPLACE INTO meta VALUES ('end_time', ?)", (end_time,))
+    return str(db_path)
+
+
+class RecordedBackend(TelemetryBackend):
+    """Telemetry replayed from a SQLite recording made by `record_snapshot`."""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"No telemetry recording at {self.db_path}")
+        with self._connect() as db:
+            end_time = db.execute(
+                "SELECT value FROM meta WHERE key = 'end_time'"
+            ).fetchone()[0]
+        self._now = datetime.fromisoformat(end_time)
+
+    def _connect(self):
+        # Read-only, and one connection per call so actions can run in threads
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def _query(self, sql, params) -> pd.DataFrame:
+        with self._connect() as db:
+            return pd.read_sql_query(sql, db, params=params)
+
+    def now(self) -> datetime:
+        return self._now
+
+    def get_logs(self, namespace, service, timestamps=False):
+        pattern = service.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        df = self._query(
+            "SELECT pod, date, message FROM logs WHERE namespace = ? "
+            "AND pod LIKE ? ESCAPE '\\' ORDER BY pod, timestamp",
+            (namespace, pattern + "-%"),
+        )
+        # The prefix narrows the indexed lookup; the generated suffix keeps the
+        # pods of e.g. `frontend-proxy` out of `frontend`
+        pod_name = re.compile(re.escape(service) + POD_NAME_SUFFIX)
+        df = df[[bool(pod_name.fullmatch(pod)) for pod in df["pod"]]]
+        if df.empty:
+            raise ValueError(f"No recorded logs for {service} in {namespace}")
+        if timestamps:
+            df["message"] = df["date"] + " " + df["message"]
+
+        logs = df.groupby("pod", sort=True)["message"].agg("\n".join)
+        if len(logs) == 1:
+            return logs.iloc[0]
+        return "\n\n".join(f"==> {pod} <==\n{log}" for pod, log in logs.items())
+
+    def _metrics(self, namespace, start_time, end_time, columns):
+        return self._query(
+            f"SELECT {columns} FROM metrics WHERE namespace = ? "
+            "AND timestamp BETWEEN ? AND ? ORDER BY metric, timestamp",
+            (namespace, int(start_time.timestamp()), int(end_time.timestamp())),
+        )
+
+    def summarize_metrics(self, namespace, start_time, end_time):
+        df = self._metrics(
+            namespace, start_time, end_time, "timestamp, pod, metric, value"
+        )
+        df = df[~df["metric"].str.contains("_spec_")]
+        return summarize_frame(df)
+
+    def export_metrics(self, namespace, start_time, end_time, save_path):
+        save_path = os.path.join(
+            save_path, f"metric_{datetime.now().strftime('%Y%m%d_%H%M%S')}", "container"
+        )
+        os.makedirs(save_path, exist_ok=True)
+        df = self._metrics(
+            namespace,
+            start_time,
+            end_time,
+            "timestamp, cmdb_id, metric AS kpi_name, value",
+        )
+        files = []
+        for metric, group in df.groupby("kpi_name", sort=True):
+            with FrameWriter(os.path.join(save_path, f"kpi_{metric}")) as writer:
+                writer.write(group)
+            files.append(os.path.basename(writer.path))
+        listing = "\n".join(f"    {name}" for name in files)
+        return f"Metrics data exported to directory: {save_path}\n\n{listing}"
+
+    def get_spans(self, namespace, start_time, end_time):
+        df = self._query(
+            f"SELECT {', '.join(SPAN_COLUMNS)} FROM spans WHERE namespace = ? "
+            "AND start_time BETWEEN ? AND ? ORDER BY start_time",
+            (
+                namespace,
+                int(start_time.timestamp() * 1e6),
+                int(end_time.timestamp() * 1e6),
+            ),
+        )
+        df["has_error"] = df["has_error"].astype(bool)
+        return df
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> TelemetryBackend:
+    """Return the telemetry backend: the recording in AIOPSLAB_TELEMETRY_DB if set,
+    the live cluster otherwise."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            db_path = os.getenv(TELEMETRY_DB_ENV)
+            _backend = RecordedBackend(db_path) if db_path else LiveBackend()
+        return _backend
+
+
+def set_backend(backend: TelemetryBackend = None):
+    """Use `backend` for all observability actions; None restores the default."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
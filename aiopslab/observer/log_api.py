@@ -3,19 +3,46 @@
 
 import json
 import os
+import queue
+import threading
 import time
 from datetime import datetime, timedelta, timezone
 from ssl import create_default_context
 from enum import Enum
 from typing import Union
-from kubernetes import client
 
 import pandas as pd
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import ConnectionTimeout
 
-from . import monitor_config, root_path, get_pod_list, get_services_list
-from .utils.extract import merge_csv
+from . import monitor_config, root_path
+from .topology import get_topology_cache
+from .utils.frame_io import FrameWriter
+from .utils.index_planner import IndexPlanner
+from .utils.log_histogram import LogHistogram, interval_seconds
+from .utils.log_normalize import (
+    HOTEL_RESERVATION_FIELDS,
+    ONLINE_BOUTIQUE_FIELDS,
+    normalize_hits,
+)
+
+# Hits per search_after page, number of parallel point-in-time slices, and how
+# long Elasticsearch keeps the point-in-time open between pages
+LOG_PAGE_SIZE = 5000
+LOG_SLICES = 4
+PIT_KEEP_ALIVE = "1m"
+# Attempts per page before a timing-out slice fails the whole search
+PAGE_ATTEMPTS = 3
+
+# Only the fields log_processing_hotel_reservation reads
+LOG_SOURCE_FIELDS = [
+    "@timestamp",
+    "message",
+    "kubernetes.pod.name",
+    "kubernetes.container.name",
+    "kubernetes.namespace",
+    "kubernetes.node.name",
+]
 
 
 class LogAPI:
@@ -39,166 +66,212 @@ class LogAPI:
                 max_retries=5,
                 retry_on_timeout=True,
             )
+        self.index_planner = IndexPlanner(
+            self.elastic, monitor_config["logstash_index"]
+        )
+        self.log_histogram = LogHistogram(self.elastic, self.index_planner)
         self.log_pod_list, self.service_list = self.initialize_pod_and_service_lists()
 
     def initialize_pod_and_service_lists(self, custom_namespace=None):
+        """Pod names (a set) and service names, from the shared topology cache."""
         namespace = custom_namespace or monitor_config["namespace"]
-        v1 = client.CoreV1Api()
-        pod_list = [
-            pod
-            for pod in get_pod_list(v1, namespace=namespace)
-            if not pod.startswith("loadgenerator-") and not pod.startswith("redis-cart")
-        ]
-        service_list = get_services_list(v1, namespace=namespace)
-        return pod_list, service_list
+        topology = get_topology_cache().get(namespace)
+        return topology.pod_names(), topology.service_names()
+
+    def log_extract(
+        self, start_time=None, end_time=None, path=None, fmt=None, namespace=None
+    ):
+        """Export all logs between two epoch timestamps to one file under `path`.
+
+        Only logs of `namespace` are exported if it is given.
 
-    def log_extract(self, start_time=None, end_time=None, path=None):
-        time_interval = 5 * 60
-        csv_list = []
+        Pages are written as they arrive from the parallel slices, so rows are in
+        time order within each slice but not globally.
+        """
         os.makedirs(path, exist_ok=True)
-        while start_time < end_time:
-            current_end_time = start_time + time_interval
-            if current_end_time > end_time:
-                current_end_time = end_time
-            data = self.log_extract_(start_time=start_time, end_time=current_end_time)
-            if len(data) != 0:
-                # Export
-                data.to_csv(
-                    f"{path}/log-{start_time}_{current_end_time}.csv", index=False
-                )
-                csv_list.append(f"{path}/log-{start_time}_{current_end_time}.csv")
-            start_time = current_end_time
-            time.sleep(1)
-
-        if not csv_list:
+        total_hits = 0
+        st_time = time.time()
+        with FrameWriter(f"{path}/log_{int(time.time())}", fmt) as writer:
+            for hits in self.search_hits(start_time, end_time, namespace=namespace):
+                total_hits += len(hits)
+                writer.write(log_processing_hotel_reservation(hits))
+
+        elapsed = max(time.time() - st_time, 1e-6)
+        print(
+            f"Extracted {total_hits} logs in {elapsed:.1f}s "
+            f"({total_hits / elapsed:.0f} hits/s)"
+        )
+        if writer.rows == 0:
             print("No logs found for the given time range.")
-        else:
-            merge_csv(path, csv_list, f"log_{int(time.time())}")
 
     # log data export
     def log_extract_(self, start_time=None, end_time=None):
-        quert_size = 7500
-
-        indices = self.elastic.indices.get(index="logstash-*")
-        indices = choose_index_template(indices, start_time, end_time)
-        print("indices", indices)
+        data = [
+            log_processing_hotel_reservation(hits)
+            for hits in self.search_hits(start_time, end_time)
+        ]
+        if not data:
+            return log_processing_hotel_reservation([])
+        return pd.concat(data, ignore_index=True)
+
+    def search_hits(
+        self,
+        start_time,
+        end_time,
+        page_size=LOG_PAGE_SIZE,
+        slices=LOG_SLICES,
+        namespace=None,
+    ):
+        """Yield every log hit between two epoch timestamps, one page at a time.
+
+        A point-in-time is opened over the hourly indices overlapping the range
+        (picked by the index planner) and split into
+        `slices` that are paged through concurrently with `search_after`, so no
+        hits are lost however many logs the range holds. Only LOG_SOURCE_FIELDS
+        are fetched, and only logs of `namespace` if it is given. A page that
+        times out is retried from the same position up to PAGE_ATTEMPTS times;
+        after that, or on any other error, the search raises instead of
+        returning a truncated result.
+        """
+        indices = self.index_planner.plan(start_time, end_time)
+        if not indices:
+            return
 
-        if isinstance(start_time, int):
-            # start_time = datetime.fromtimestamp(start_time)
-            start_time = datetime.fromtimestamp(start_time, tz=timezone.utc).strftime(
-                "%Y-%m-%dT%H:%M:%SZ"
-            )
-        if isinstance(end_time, int):
-            # end_time = datetime.fromtimestamp(end_time)
-            end_time = datetime.fromtimestamp(end_time, tz=timezone.utc).strftime(
-                "%Y-%m-%dT%H:%M:%SZ"
-            )
-        # print(start_time, end_time)
         query = {
-            "size": quert_size,
-            "query": {
-                "range": {"@timestamp": {"gte": start_time, "lte": end_time}}
-                # "bool": {
-                #     "must": [
-                #         {"range": {"@timestamp": {"gte": start_time, "lte": end_time}}}
-                #     ]
-                # }
-            },
-            # "sort": ["_doc"],
-            "sort": [{"@timestamp": {"order": "asc"}}],
+            "range": {
+                "@timestamp": {"gte": es_time(start_time), "lte": es_time(end_time)}
+            }
         }
-        data = []
-
-        st_time = time.time()
-        for index in indices:
+        if namespace:
+            query = {
+                "bool": {
+                    "filter": [
+                        query,
+                        {"match_phrase": {"kubernetes.namespace": namespace}},
+                    ]
+                }
+            }
+        pit_id = self.elastic.open_point_in_time(
+            index=",".join(indices), keep_alive=PIT_KEEP_ALIVE
+        )["id"]
+
+        # Bounded, so slow consumers throttle the slices instead of buffering all hits
+        pages = queue.Queue(maxsize=2 * slices)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        def scan(slice_id):
+            slice_pit = pit_id
+            search_after = None
             try:
-                page = self.elastic.search(index=index, body=query, scroll="15s")
-                # page = self.elastic.search(index="logstash-*", body=query, scroll="15s")
-                # print("Query being sent to Elasticsearch:")
-                # print(json.dumps(query, indent=2))
-                # print("Elasticsearch response:", page)
-                # print(query)
-                data.extend(page["hits"]["hits"])
-                # scroll_id = page["_scroll_id"]
-
-                # while True:
-                #     page = self.elastic.scroll(scroll_id=scroll_id, scroll="15s")
-                #     hits_len = len(page["hits"]["hits"])
-                #     data.extend(page["hits"]["hits"])
-                #     if hits_len < quert_size:
-                #         break
-                #     scroll_id = page["_scroll_id"]
-            except ConnectionTimeout as e:
-                print("Connection Timeout:", e)
-
-        print("search time: ", time.time() - st_time)
-        st_time = time.time()
+                while not stop.is_set():
+                    for attempt in range(1, PAGE_ATTEMPTS + 1):
+                        try:
+                            page = self.elastic.search(
+                                pit={"id": slice_pit, "keep_alive": PIT_KEEP_ALIVE},
+                                query=query,
+                                sort=[{"@timestamp": "asc"}, {"_shard_doc": "asc"}],
+                                size=page_size,
+                                source=LOG_SOURCE_FIELDS,
+                                search_after=search_after,
+                                slice=(
+                                    {"id": slice_id, "max": slices}
+                                    if slices > 1
+                                    else None
+                                ),
+                                track_total_hits=False,
+                            )
+                            break
+                        except ConnectionTimeout as e:
+                            if attempt == PAGE_ATTEMPTS:
+                                raise
+                            print(f"Slice {slice_id} timed out, retrying: {e}")
+                    hits = page["hits"]["hits"]
+                    if hits:
+                        put(hits)
+                    if len(hits) < page_size:
+                        break
+                    slice_pit = page.get("pit_id", slice_pit)
+                    search_after = hits[-1]["sort"]
+            except Exception as e:
+                put(e)
+            finally:
+                put(None)
+
+        workers = [
+            threading.Thread(target=scan, args=(i,), daemon=True) for i in range(slices)
+        ]
+        for worker in workers:
+            worker.start()
 
-        # TODO: extract data
-        # data = log_processing_online_boutique(data)
-        data = log_processing_hotel_reservation(data)
-        print("process time:", time.time() - st_time)
-        return data
+        try:
+            finished = 0
+            while finished < slices:
+                item = pages.get()
+                if item is None:
+                    finished += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+            try:
+                self.elastic.close_point_in_time(id=pit_id)
+            except Exception as e:
+                print(f"Failed to close point-in-time: {e}")
+
+    def get_log_number_by_day(self, time_select, interval=None):
+        """Count logs per hour over the last day, or per day over the last weeks.
+
+        The counts come from one `date_histogram` aggregation; buckets that have
+        ended are cached, so repeated calls only aggregate the current bucket.
+
+        Args:
+            time_select (TimeSelect): Period to count logs over.
+            interval (str): Bucket size such as "30m". Defaults to "1h" for one
+                day and "1d" for one or two weeks.
+
+        Returns:
+            list: {"date", "log_count"} per bucket, oldest first. Dates are UTC
+                datetimes for sub-day buckets and "%Y-%m-%d" strings otherwise.
+        """
+        periods = {
+            TimeSelect.ONE_DAY: (timedelta(days=1), "1h"),
+            TimeSelect.ONE_WEEK: (timedelta(days=7), "1d"),
+            TimeSelect.TWO_WEEK: (timedelta(days=14), "1d"),
+        }
+        if time_select not in periods:
+            print(f"Wrong input params: {time_select}")
+            return []
+        period, default_interval = periods[time_select]
+        interval = interval or default_interval
 
-    def get_log_number_by_day(self, time_select):
-        data = []
+        end_time = time.time()
         try:
-            indices = self.elastic.indices.get(index="logstash-*")
-
-            logs_per_day = {}  # store log per day
-
-            # ONE_DAY aggregate according to hour
-            if time_select == TimeSelect.ONE_DAY:
-                for index in indices:
-                    response = self.elastic.count(index=index)
-                    index_date_str = index.split("-")[-1]  # get the date
-                    index_date = datetime.strptime(index_date_str, "%Y.%m.%d.%H")
-                    # if within the last one day
-                    if index_date >= datetime.now() - timedelta(days=1):
-                        # day_key = index_date.strftime("%Y-%m-%d")
-
-                        if index_date not in logs_per_day:
-                            logs_per_day[index_date] = 0
-                        logs_per_day[index_date] += response["count"]
-            elif time_select == TimeSelect.ONE_WEEK:
-                for index in indices:
-                    response = self.elastic.count(index=index)
-                    index_date_str = index.split("-")[-1]
-                    index_date = datetime.strptime(index_date_str, "%Y.%m.%d.%H")
-
-                    # if within the last seven days
-                    if index_date >= datetime.now() - timedelta(days=7):
-                        day_key = index_date.strftime(
-                            "%Y-%m-%d"
-                        )  # transform the datetime to %Y-%m-%d format string as key
-
-                        if index_date not in logs_per_day:
-                            logs_per_day[day_key] = 0
-                        logs_per_day[day_key] += response["count"]
-            elif time_select == TimeSelect.TWO_WEEK:
-                for index in indices:
-                    response = self.elastic.count(index=index)
-                    index_date_str = index.split("-")[-1]  # get the date
-                    index_date = datetime.strptime(
-                        index_date_str, "%Y.%m.%d.%H"
-                    )  # transform to datetime
-
-                    # if within two weeks
-                    if index_date >= datetime.now() - timedelta(days=14):
-                        day_key = index_date.strftime(
-                            "%Y-%m-%d"
-                        )  # transform the datetime to %Y-%m-%d format string as key
-
-                        if index_date not in logs_per_day:
-                            logs_per_day[day_key] = 0
-                        logs_per_day[day_key] += response["count"]
-            else:
-                print(f"Wrong input params: {time_select}")
-                return data
-            for date_str, log_count in logs_per_day.items():
-                data.append({"date": date_str, "log_count": log_count})
+            counts = self.log_histogram.counts(
+                end_time - period.total_seconds(), end_time, interval
+            )
         except ConnectionTimeout as e:
             print("Connection Timeout:", e)
+            return []
+
+        daily = interval_seconds(interval) % 86400 == 0
+        data = []
+        for bucket, log_count in counts.items():
+            date = datetime.fromtimestamp(bucket, tz=timezone.utc).replace(tzinfo=None)
+            if daily:
+                date = date.strftime("%Y-%m-%d")
+            data.append({"date": date, "log_count": log_count})
         return data
 
     def query(
@@ -210,8 +283,7 @@ class LogAPI:
             end_time = int(end_time)
 
         # get the indices from the time span
-        indices = self.elastic.indices.get(index="logstash-*")
-        indices = choose_index_template(indices, start_time, end_time)
+        indices = self.index_planner.plan(start_time, end_time)
 
         start_time = datetime.fromtimestamp(start_time)
         end_time = datetime.fromtimestamp(end_time)
@@ -232,21 +304,22 @@ class LogAPI:
         # return Elasticsearch query result
         data = []
 
-        for index in indices:
-            try:
-                page = self.elastic.search(index=index, body=query, scroll="15s")
+        if not indices:
+            return data
+        try:
+            # One search over all selected indices
+            page = self.elastic.search(
+                index=",".join(indices), body=query, scroll="15s"
+            )
+            data.extend(page["hits"]["hits"])
+            scroll_id = page["_scroll_id"]
+
+            while len(page["hits"]["hits"]) == query_size:
+                page = self.elastic.scroll(scroll_id=scroll_id, scroll="15s")
                 data.extend(page["hits"]["hits"])
                 scroll_id = page["_scroll_id"]
-
-                while True:
-                    page = self.elastic.scroll(scroll_id=scroll_id, scroll="15s")
-                    hits_len = len(page["hits"]["hits"])
-                    data.extend(page["hits"]["hits"])
-                    if hits_len < query_size:
-                        break
-                    scroll_id = page["_scroll_id"]
-            except ConnectionTimeout as e:
-                print("Connection Timeout:", e)
+        except ConnectionTimeout as e:
+            print("Connection Timeout:", e)
         data = log_for_query_filter(data)
         print("len data", len(data))
         return data
@@ -270,95 +343,27 @@ def message_extract(json_str):
     return message
 
 
-def log_processing_hotel_reservation(logs):
-    log_id_list = []
-    ts_list = []
-    date_list = []
-    pod_list = []
-    ms_list = []
-    container_name_list = []
-    namespace_list = []
-    node_name_list = []
-
-    for log in logs:
-        try:
-            # Extract information from the log
-            log_id = log["_id"]
-            timestamp = log["_source"]["@timestamp"]
-            pod_name = log["_source"]["kubernetes"]["pod"]["name"]
-            container_name = log["_source"]["kubernetes"]["container"]["name"]
-            namespace = log["_source"]["kubernetes"]["namespace"]
-            node_name = log["_source"]["kubernetes"]["node"]["name"]
-            message = log["_source"]["message"]
-
-            # Convert timestamp to a readable format
-            timestamp_obj = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%fZ")
-            timestamp_unix = timestamp_obj.timestamp()
-
-        except KeyError as e:
-            print(f"KeyError encountered: {e}")
-            print(f"Skipping log due to missing fields: {log}")
-            continue
+def es_time(t):
+    """Format an epoch timestamp for an Elasticsearch range query."""
+    if isinstance(t, int):
+        return datetime.fromtimestamp(t, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return t
 
-        # Append to the respective lists
-        log_id_list.append(log_id)
-        ts_list.append(timestamp_unix)
-        date_list.append(timestamp)
-        pod_list.append(pod_name)
-        container_name_list.append(container_name)
-        namespace_list.append(namespace)
-        node_name_list.append(node_name)
-        ms_list.append(message)
-
-    # Create DataFrame
-    dt = pd.DataFrame(
-        {
-            "log_id": log_id_list,
-            "timestamp": ts_list,
-            "date": date_list,
-            "pod_name": pod_list,
-            "container_name": container_name_list,
-            "namespace": namespace_list,
-            "node_name": node_name_list,
-            "message": ms_list,
-        }
-    )
 
+def log_processing_hotel_reservation(logs):
+    dt, malformed = normalize_hits(logs, HOTEL_RESERVATION_FIELDS)
+    if malformed:
+        print(f"Skipped {malformed} logs with missing fields")
     return dt
 
 
-def log_processing_online_boutique(logs):
-    log_id_list = []
-    ts_list = []
-    date_list = []
-    pod_list = []
-    ms_list = []
-    for log in logs:
-        try:
-            cmdb_id = log["_source"]["kubernetes"]["pod"]["name"]
-            if cmdb_id not in self.log_pod_list:
-                continue
-            timestamp = log["_source"]["@timestamp"]
-            timestamp = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%fZ")
-            timestamp = timestamp.timestamp()
-            format_ts = log["_source"]["@timestamp"]
-            message = message_extract(log["_source"]["message"])
-        except Exception as e:
-            continue
-        log_id_list.append(log["_id"])
-        pod_list.append(cmdb_id)
-        date_list.append(format_ts)
-        ts_list.append(timestamp)
-        ms_list.append(message)
-    dt = pd.DataFrame(
-        {
-            "log_id": log_id_list,
-            "timestamp": ts_list,
-            "date": date_list,
-            "cmdb_id": pod_list,
-            "message": ms_list,
-        }
-    )
+def log_processing_online_boutique(logs, pod_list=None):
+    dt, malformed = normalize_hits(logs, ONLINE_BOUTIQUE_FIELDS)
+    if malformed:
+        print(f"Skipped {malformed} logs with missing fields")
+    if pod_list is not None:
+        dt = dt[dt["cmdb_id"].isin(pod_list)].reset_index(drop=True)
+    dt["message"] = dt["message"].map(message_extract)
     return dt
 
 
@@ -375,29 +380,6 @@ def log_for_query_filter(logs):
     return filtered_log
 
 
-def choose_index_template(indices, start_time, end_time):
-    indices_template = set()
-    for index in indices:
-        date_str = ".".join(index.split("-")[1].split(".")[:-1])
-        indices_template.add("logstash-" + date_str + "*")
-
-    start_datetime_utc = datetime.fromtimestamp(start_time)
-    end_datetime_utc = datetime.fromtimestamp(end_time)
-
-    dates_in_range = set()
-    current_datetime = start_datetime_utc
-
-    while current_datetime <= end_datetime_utc:
-        dates_in_range.add("logstash-" + current_datetime.strftime("%Y.%m.%d") + "*")
-        current_datetime += timedelta(days=1)
-
-    dates_in_range.add("logstash-" + end_datetime_utc.strftime("%Y.%m.%d") + "*")
-
-    selected_patterns = indices_template.intersection(dates_in_range)
-    print(f"selected_patterns: {selected_patterns}")
-    return selected_patterns
-
-
 class TimeSelect(Enum):
     ONE_DAY = 1
     ONE_WEEK = 2
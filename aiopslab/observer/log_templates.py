@@ -0,0 +1,223 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Online log template mining (Drain) to collapse repeated log lines.
+
+Lines are routed through a fixed-depth parse tree keyed by their token count
+and first tokens, and merged into the most similar template in the leaf, with
+differing tokens replaced by `<*>`. Each template keeps a count, the first and
+last timestamp it was seen at, and a few example parameter values.
+
+Reference: He et al., "Drain: An Online Log Parsing Approach with Fixed Depth
+Tree", ICWS 2017.
+"""
+
+import re
+import time
+
+import pandas as pd
+
+WILDCARD = "<*>"
+
+_has_digit = re.compile(r"\d").search
+
+
+class LogTemplate:
+    """A group of log lines sharing one template."""
+
+    __slots__ = ("id", "tokens", "count", "first_seen", "last_seen", "examples")
+
+    def __init__(self, template_id: int, tokens: list):
+        self.id = template_id
+        self.tokens = tokens
+        self.count = 0
+        self.first_seen = None
+        self.last_seen = None
+        self.examples = []
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: list) -> tuple[float, int]:
+        """Fraction of tokens equal to the template's constant tokens, and its wildcard count."""
+        same = wildcards = 0
+        for mine, token in zip(self.tokens, tokens):
+            if mine == WILDCARD:
+                wildcards += 1
+            elif mine == token:
+                same += 1
+        return same / len(tokens), wildcards
+
+
+class TemplateMiner:
+    """Drain-style log template miner; feed it lines with `add` or `add_lines`."""
+
+    def __init__(
+        self,
+        depth: int = 4,
+        sim_threshold: float = 0.4,
+        max_children: int = 100,
+        max_examples: int = 3,
+        cache_size: int = 100_000,
+    ):
+        """
+        Args:
+            depth (int): Depth of the parse tree; lines are routed by their
+                first `depth - 2` tokens.
+            sim_threshold (float): Minimum similarity to join an existing template.
+            max_children (int): Maximum children per tree node before tokens are
+                routed to the wildcard child.
+            max_examples (int): Example parameter lists kept per template.
+            cache_size (int): Number of distinct lines remembered for exact-match lookups.
+        """
+        self.depth = depth
+        self.sim_threshold = sim_threshold
+        self.max_children = max_children
+        self.max_examples = max_examples
+        self.cache_size = cache_size
+        self.templates = []
+        self.lines = 0
+        self._root = {}
+        self._cache = {}
+
+    def add(self, message: str, timestamp: str = None) -> LogTemplate:
+        """Add one log message and return the template it was assigned to."""
+        self.lines += 1
+        template = self._cache.get(message)
+        if template is None:
+            template = self._match(message)
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[message] = template
+
+        template.count += 1
+        if timestamp is not None:
+            if template.first_seen is None:
+                template.first_seen = timestamp
+            template.last_seen = timestamp
+        return template
+
+    def add_lines(self, text: str, timestamps: bool = False):
+        """Add every non-empty line of a log.
+
+        Args:
+            text (str): The log.
+            timestamps (bool): Lines start with a timestamp followed by a space,
+                as returned by the Kubernetes API with `timestamps=True`.
+        """
+        for line in text.splitlines():
+            if not line:
+                continue
+            if timestamps:
+                timestamp, _, message = line.partition(" ")
+                self.add(message, timestamp)
+            else:
+                self.add(line)
+
+    def _match(self, message: str) -> LogTemplate:
+        tokens = message.split()
+        if not tokens:
+            tokens = [message]
+        leaf = self._leaf(tokens)
+
+        best, best_key = None, (-1.0, -1)
+        for template in leaf:
+            key = template.similarity(tokens)
+            if key > best_key:
+                best, best_key = template, key
+
+        if best is None or best_key[0] < self.sim_threshold:
+            best = LogTemplate(len(self.templates), tokens)
+            self.templates.append(best)
+            leaf.append(best)
+        elif best.tokens != tokens:
+            merged = [
+                mine if mine == token else WILDCARD
+                for mine, token in zip(best.tokens, tokens)
+            ]
+            if merged != best.tokens:
+                # Earlier examples no longer line up with the wildcards
+                best.tokens = merged
+                best.examples = []
+
+        if len(best.examples) < self.max_examples:
+            params = [
+                token
+                for mine, token in zip(best.tokens, tokens)
+                if mine == WILDCARD
+            ]
+            if params and params not in best.examples:
+                best.examples.append(params)
+        return best
+
+    def _leaf(self, tokens: list) -> list:
+        """Find (or create) the list of templates for a tokenized line."""
+        node = self._root.setdefault(len(tokens), {})
+        for token in tokens[: self.depth - 2]:
+            if _has_digit(token):
+                token = WILDCARD
+            child = node.get(token)
+            if child is None:
+                if len(node) >= self.max_children:
+                    token = WILDCARD
+                child = node.setdefault(token, {})
+            node = child
+        return node.setdefault(None, [])
+
+    def to_frame(self) -> pd.DataFrame:
+        """All templates, most frequent first."""
+        df = pd.DataFrame(
+            [
+                {
+                    "count": t.count,
+                    "first_seen": t.first_seen,
+                    "last_seen": t.last_seen,
+                    "template": t.template,
+                    "examples": t.examples,
+                }
+                for t in self.templates
+            ],
+            columns=["count", "first_seen", "last_seen", "template", "examples"],
+        )
+        return df.sort_values(by="count", ascending=False, kind="stable")
+
+    def summary(self, max_templates: int = 50) -> str:
+        """A compact table of the most frequent templates."""
+        df = self.to_frame()
+        header = f"{self.lines} log lines, {len(df)} templates"
+        if df.empty:
+            return header
+        if len(df) > max_templates:
+            header += f" (showing the {max_templates} most frequent)"
+        if df["first_seen"].isna().all():
+            df = df.drop(columns=["first_seen", "last_seen"])
+        return header + "\n" + df.head(max_templates).to_string(index=False)
+
+
+if __name__ == "__main__":
+    import random
+
+    # Lines/s on a synthetic, mostly-unique log
+    random.seed(0)
+    patterns = [
+        "INF cmd/geo/main.go:{a} Reading config for geo {b}",
+        "TRC Request {a} from 10.244.0.{b} took {a}ms",
+        "ERR failed to connect to mongodb-geo:{b}: connection refused",
+        "DBG user {b} logged in with session {a}",
+        "WRN cache miss for key hotel_{a} retrying in {b}ms",
+    ]
+    lines = [
+        random.choice(patterns).format(
+            a=random.randint(0, 10**6), b=random.randint(0, 255)
+        )
+        for _ in range(200_000)
+    ]
+
+    miner = TemplateMiner()
+    start = time.time()
+    for line in lines:
+        miner.add(line)
+    elapsed = time.time() - start
+    print(f"{len(lines) / elapsed:.0f} lines/s, {len(miner.templates)} templates")
+    print(miner.summary(10))
@@ -3,20 +3,29 @@
 
 import os
 import time
-import subprocess
-import socket
-import select
-import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Union
 from datetime import datetime, timedelta
-from kubernetes import client
 
+import numpy as np
 import pandas as pd
 import pytz
 from prometheus_api_client import PrometheusConnect
 
-from aiopslab.observer import monitor_config, root_path, get_pod_list, get_services_list
+from aiopslab.observer import monitor_config, root_path
+from aiopslab.observer.metric_summary import (
+    SUMMARY_COLUMNS,
+    SUMMARY_POINTS,
+    pod_rollup_query,
+    rollup_queries,
+    summarize_series,
+)
+from aiopslab.observer.port_forward import get_port_forward_manager
+from aiopslab.observer.query_cache import RangeQueryCache, get_range_cache
+from aiopslab.observer.topology import get_topology_cache
+from aiopslab.observer.utils.frame_io import FrameWriter, get_export_format
 
 normal_metrics = [
     # cpu
@@ -40,7 +49,7 @@ normal_metrics = [
     "container_spec_cpu_shares",
     # threads
     "container_threads",
-    "container_threads_max"
+    "container_threads_max",
     # network
     "container_network_receive_errors_total",
     "container_network_receive_packets_dropped_total",
@@ -104,6 +113,44 @@ def time_format_transform(time):
     return cmdb_id
 
 
+def series_to_frame(metric, data_raw, pod_list):
+    """Convert a Prometheus range-query result into KPI rows.
+
+    The `values` arrays of all series are converted at once with NumPy instead of
+    per point. Returns None if no series belongs to a pod in `pod_list`, which
+    should be a set.
+    """
+    pods = pod_list
+    cmdb_ids, kpi_names, values = [], [], []
+    for data in data_raw:
+        if data["metric"].get("pod") not in pods:
+            continue
+        cmdb_id = data["metric"]["instance"] + "." + data["metric"]["pod"]
+        kpi_name = metric
+        if metric in network_metrics:
+            kpi_name = network_kpi_name_format(data["metric"])
+        cmdb_ids.append(cmdb_id)
+        kpi_names.append(kpi_name)
+        values.append(data["values"])
+
+    if not values:
+        return None
+
+    counts = [len(v) for v in values]
+    points = np.array([point for series in values for point in series], dtype=object)
+    if points.size == 0:
+        return None
+    dt = pd.DataFrame(
+        {
+            "timestamp": points[:, 0].astype(np.float64).astype(np.int64),
+            "cmdb_id": np.repeat(cmdb_ids, counts),
+            "kpi_name": np.repeat(kpi_names, counts),
+            "value": np.round(points[:, 1].astype(np.float64), 3),
+        }
+    )
+    return dt.sort_values(by="timestamp", kind="stable")
+
+
 def network_kpi_name_format(metric):
     kpi_name = metric["__name__"]
 
@@ -135,126 +182,35 @@ def network_kpi_name_format(metric):
 
 
 class PrometheusAPI:
-    # disable_ssl – (bool) if True, will skip prometheus server's http requests' SSL certificate
-    def __init__(self, url: str, namespace: str):
-        self.namespace = namespace
-        self.output_threads = []
-        self.port = self.find_free_port()
-        self.port_forward_process = None
-        self.stop_event = threading.Event()
-        self.start_port_forward()
+    def __init__(
+        self, url: str = None, namespace: str = None, cache: RangeQueryCache = None
+    ):
+        """
+        Args:
+            url (str): URL of the Prometheus server. By default, Prometheus in the
+                `observe` namespace is reached through a shared port-forward.
+            namespace (str): Namespace whose metrics are queried.
+            cache (RangeQueryCache): Cache for range queries. Defaults to the one
+                shared by all PrometheusAPI instances of the process.
+        """
+        self.namespace = namespace or monitor_config["namespace"]
+        self.cache = cache or get_range_cache()
+        if url is None:
+            url = get_port_forward_manager().get_url(
+                "svc/prometheus-server", 80, "observe", health_path="/-/healthy"
+            )
+        self.url = url
+        # disable_ssl skips verifying the Prometheus server's SSL certificate
         self.client = PrometheusConnect(url, disable_ssl=True)
-        self.namespace = namespace
         self.pod_list, self.service_list = self.initialize_pod_and_service_lists(
-            namespace
+            self.namespace
         )
-    
-    def is_port_in_use(self, port):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            return s.connect_ex(("127.0.0.1", port)) == 0
-    
-    def find_free_port(self, start=32000, end=32100):
-        for port in range(start, end):
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                if s.connect_ex(("127.0.0.1", port)) != 0:
-                    return port
-        raise RuntimeError("No free ports available in the range.")
-
-    def print_output(self, stream):
-        """Thread function to print output from a subprocess stream non-blockingly."""
-        while not self.stop_event.is_set():
-            ready, _, _ = select.select([stream], [], [], 0.1)
-            if ready:
-                try:
-                    line = stream.readline()
-                    if line:
-                        print(line, end="")
-                    else:
-                        break
-                except ValueError:
-                    break
-
-    def start_port_forward(self):
-        """Starts port-forwarding to access Prometheus."""
-        if self.port_forward_process and self.port_forward_process.poll() is None:
-            print("Port-forwarding already active.")
-            return
-        
-        for attempt in range(3):
-            if self.is_port_in_use(self.port):
-                print(
-                    f"Port {self.port} is already in use. Attempt {attempt + 1} of 3. Retrying in 3 seconds..."
-                )
-                time.sleep(3)
-                continue
-
-            command = f"kubectl port-forward svc/prometheus-server {self.port}:80 -n observe"
-            self.port_forward_process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-
-            thread_out = threading.Thread(
-                target=self.print_output, args=(self.port_forward_process.stdout,)
-            )
-            thread_err = threading.Thread(
-                target=self.print_output, args=(self.port_forward_process.stderr,)
-            )
-            thread_out.start()
-            thread_err.start()
-            self.output_threads.extend([thread_out, thread_err])
-
-            time.sleep(3)  # Wait a bit for the port-forward to establish
-
-            if self.port_forward_process.poll() is None:
-                print("Port forwarding established successfully.")
-                break
-            else:
-                print("Port forwarding failed. Retrying...")
-        else:
-            print("Failed to establish port forwarding after multiple attempts.")
-
-    def stop_port_forward(self):
-        """Stops the kubectl port-forward command and cleans up resources."""
-        if self.port_forward_process:
-            self.port_forward_process.terminate()
-            try:
-                self.port_forward_process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                print("Port-forward process did not terminate in time, killing...")
-                self.port_forward_process.kill()
-
-            self.stop_event.set()
-
-            if self.port_forward_process.stdout:
-                self.port_forward_process.stdout.close()
-            if self.port_forward_process.stderr:
-                self.port_forward_process.stderr.close()
-
-            print("Port forwarding stopped.")
-
-        for thread in self.output_threads:
-            thread.join(timeout=5)
-            if thread.is_alive():
-                print(f"Warning: Thread {thread.name} did not terminate cleanly.")
-
-    def cleanup(self):
-        """Cleanup resources like port-forwarding."""
-        self.stop_port_forward()
 
     def initialize_pod_and_service_lists(self, custom_namespace=None):
+        """Pod names (a set) and service names, from the shared topology cache."""
         namespace = custom_namespace or monitor_config["namespace"]
-        v1 = client.CoreV1Api()
-        pod_list = [
-            pod
-            for pod in get_pod_list(v1, namespace=namespace)
-            if not pod.startswith("loadgenerator-") and not pod.startswith("redis-cart")
-        ]
-        service_list = get_services_list(v1, namespace=namespace)
-        return pod_list, service_list
+        topology = get_topology_cache().get(namespace)
+        return topology.pod_names(), topology.service_names()
 
     # start_time: Union[int, datetime]
     # The start_time can be either int or datetime or string
@@ -303,7 +259,17 @@ class PrometheusAPI:
                 data.append({"time": date_time, "value": float_value})
             return data
 
-    def export_all_metrics(self, start_time, end_time, save_path, step=15):
+    def export_all_metrics(
+        self, start_time, end_time, save_path, step=15, max_workers=8, fmt=None
+    ):
+        """Export all container metrics of the namespace to one file per metric.
+
+        Queries for every (metric, 2-hour window) pair are fanned out over a bounded
+        thread pool. Results are written as soon as they (and every earlier window of
+        the same metric) are available, so rows stay in time order and at most a
+        few windows are held in memory. `fmt` selects CSV, Parquet or Arrow
+        (default: `export_format` in the monitor config).
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         save_path = os.path.join(save_path, f"metric_{timestamp}")
         if not os.path.exists(save_path):
@@ -318,94 +284,52 @@ class PrometheusAPI:
 
         # interval_time = 2 * 60 * 60
         interval_time = timedelta(seconds=2 * 60 * 60)
+        windows = []
         while start_time < end_time:
-            if start_time + interval_time > end_time:
-                current_et = end_time
-            else:
-                current_et = start_time + interval_time
-            for metric in normal_metrics:
-                data_raw = self.client.custom_query_range(
-                    f"{metric}{{namespace='{self.namespace}'}}",
-                    time_format_transform(start_time),
-                    time_format_transform(current_et),
-                    step=step,
-                )
-                # Debugging print statements
-                # print(f"Query: {metric}{{namespace='{self.namespace}'}}")
-                # print(f"Start Time: {start_time}, End Time: {current_et}")
-                # print(f"Data Raw Length: {len(data_raw)}")
-                # print(f"Data Raw: {data_raw}")
-                if len(data_raw) == 0:
-                    continue
-                timestamp_list = []
-                cmdb_id_list = []
-                kpi_list = []
-                value_list = []
-                for data in data_raw:
-                    if data["metric"]["pod"] not in self.pod_list:
-                        continue
-                    cmdb_id = data["metric"]["instance"] + "." + data["metric"]["pod"]
-                    if cmdb_id == "":
-                        continue
-                    kpi_name = metric
-                    if metric in network_metrics:
-                        kpi_name = network_kpi_name_format(data["metric"])
-                    for d in data["values"]:
-                        timestamp_list.append(int(d[0]))
-                        cmdb_id_list.append(cmdb_id)
-                        kpi_list.append(kpi_name)
-                        value_list.append(round(float(d[1]), 3))
-                dt = pd.DataFrame(
-                    {
-                        "timestamp": timestamp_list,
-                        "cmdb_id": cmdb_id_list,
-                        "kpi_name": kpi_list,
-                        "value": value_list,
-                    }
-                )
-                dt = dt.sort_values(by="timestamp")
-                file_path = os.path.join(container_save_path, "kpi_" + metric + ".csv")
-                if os.path.exists(file_path):
-                    with open(file_path, "a", encoding="utf-8", newline="") as f:
-                        dt.to_csv(f, header=False, index=False)
-                else:
-                    dt.to_csv(file_path, index=False)
-            self.cleanup() # Stop port-forwarding after metrics are exported
-
-            # # for metric in istio_metrics:
-            #     data_raw = self.client.custom_query_range(f"{metric}{{namespace='{namespace}'}}", time_format_transform(start_time), time_format_transform(current_et), step=step)
-            #     if len(data_raw) == 0:
-            #         continue
-            #     timestamp_list = []
-            #     cmdb_id_list = []
-            #     kpi_list = []
-            #     value_list = []
-            #     for data in data_raw:
-            #         cmdb_id = istio_cmdb_id_format(data['metric'])
-            #         pod_name = cmdb_id.split('.')[0]
-            #         if cmdb_id == '' or pod_name not in pod_list:
-            #             continue
-            #         kpi_name = istio_kpi_name_format(data['metric'])
-            #         for d in data['values']:
-            #             timestamp_list.append(int(d[0]))
-            #             cmdb_id_list.append(cmdb_id)
-            #             kpi_list.append(kpi_name)
-            #             value_list.append(round(float(d[1]), 3))
-            #     dt = pd.DataFrame({
-            #         'timestamp': timestamp_list,
-            #         'cmdb_id': cmdb_id_list,
-            #         'kpi_name': kpi_list,
-            #         'value': value_list
-            #     })
-            #     dt = dt.sort_values(by='timestamp')
-            #     file_path = os.path.join(istio_save_path, 'kpi_'+metric+'.csv')
-            #     if os.path.exists(file_path):
-            #         with open(file_path, 'a', encoding='utf-8', newline='') as f:
-            #             dt.to_csv(f, header=False, index=False)
-            #     else:
-            #         dt.to_csv(file_path, index=False)
+            current_et = min(start_time + interval_time, end_time)
+            windows.append((start_time, current_et))
             start_time = current_et
-            
+
+        tasks = [(metric, st, et) for st, et in windows for metric in normal_metrics]
+        fmt = get_export_format(fmt)
+        writers = {}
+        export_start = time.time()
+
+        def write(metric, dt):
+            if dt is None or dt.empty:
+                return
+            if metric not in writers:
+                writers[metric] = FrameWriter(
+                    os.path.join(container_save_path, "kpi_" + metric), fmt
+                )
+            writers[metric].write(dt)
+
+        # Keep a bounded number of queries in flight; write results in task order
+        max_in_flight = max_workers * 2
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for metric, st, et in tasks:
+                future = pool.submit(self._query_metric_window, metric, st, et, step)
+                pending.append((metric, future))
+                if len(pending) >= max_in_flight:
+                    metric_done, done = pending.popleft()
+                    write(metric_done, done.result())
+            while pending:
+                metric_done, done = pending.popleft()
+                write(metric_done, done.result())
+
+        for writer in writers.values():
+            writer.close()
+
+        points = sum(writer.rows for writer in writers.values())
+        elapsed = max(time.time() - export_start, 1e-6)
+        stats = self.cache.stats()
+        print(
+            f"Exported {points} metric points from {len(tasks)} queries in "
+            f"{elapsed:.1f}s ({points / elapsed:.0f} points/s, cache hit rate "
+            f"{stats['hit_rate']:.0%})"
+        )
+
         # Print the folder structure
         export_msg = f"Metrics data exported to directory: {save_path}\n\nFolder structure of exported metrics:\n"
         for root, dirs, files in os.walk(save_path):
@@ -418,6 +342,87 @@ class PrometheusAPI:
         # print(export_msg)
         return export_msg
 
+    def _query_metric_window(self, metric, start_time, end_time, step):
+        """Query one metric over one window and return it as a DataFrame (or None)."""
+        data_raw = self.cache.query_range(
+            self.client,
+            f"{metric}{{namespace='{self.namespace}'}}",
+            time_format_transform(start_time),
+            time_format_transform(end_time),
+            step,
+        )
+        return series_to_frame(metric, data_raw, self.pod_list)
+
+    def summarize_metrics(
+        self, start_time, end_time, metrics=None, top_k=20, max_workers=8
+    ) -> pd.DataFrame:
+        """Summarize container metrics per pod instead of exporting raw samples.
+
+        The average, maximum and p95 of every (pod, metric) series over the time
+        range are computed by Prometheus. A coarse per-pod series is fetched to find
+        its change point and anomaly score, and the `top_k` highest-scoring series
+        are returned.
+
+        Args:
+            start_time (datetime): Start of the time range.
+            end_time (datetime): End of the time range.
+            metrics (list): Metrics to summarize. Defaults to all non-spec
+                container metrics.
+            top_k (int): Number of series to return.
+            max_workers (int): Number of metrics queried concurrently.
+
+        Returns:
+            pd.DataFrame: One row per series with SUMMARY_COLUMNS, most anomalous first.
+        """
+        if metrics is None:
+            metrics = [m for m in normal_metrics if "_spec_" not in m]
+        window = max(int((end_time - start_time).total_seconds()), 1)
+        step = max(15, window // SUMMARY_POINTS)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(
+                lambda m: self._summarize_metric(m, start_time, end_time, window, step),
+                metrics,
+            )
+            rows = [row for metric_rows in results for row in metric_rows]
+
+        df = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+        df = df.sort_values(by="score", ascending=False, kind="stable").head(top_k)
+        df["change_at"] = pd.to_datetime(df["change_at"], unit="s")
+        return df.reset_index(drop=True)
+
+    def _summarize_metric(self, metric, start_time, end_time, window, step):
+        """Per-pod rollups and anomaly scores of one metric."""
+        pods = self.pod_list
+        stats = {}
+        for name, query in rollup_queries(metric, self.namespace, window, step).items():
+            result = self.client.custom_query(
+                query, params={"time": end_time.timestamp()}
+            )
+            for series in result:
+                pod = series["metric"].get("pod")
+                if pod in pods:
+                    value = round(float(series["value"][1]), 3)
+                    stats.setdefault(pod, {})[name] = value
+
+        data_raw = self.cache.query_range(
+            self.client,
+            pod_rollup_query(metric, self.namespace),
+            start_time,
+            end_time,
+            step,
+        )
+        rows = []
+        for series in data_raw:
+            pod = series["metric"].get("pod")
+            if pod not in pods or not series["values"]:
+                continue
+            points = np.array(series["values"], dtype=np.float64)
+            row = {"pod": pod, "metric": metric, **stats.get(pod, {})}
+            row.update(summarize_series(points[:, 0], points[:, 1]))
+            rows.append(row)
+        return rows
+
     def get_all_metrics(self):
         """Get all of the metrics"""
         all_metrics = self.client.all_metrics()
@@ -428,7 +433,7 @@ class PrometheusAPI:
 
 
 if __name__ == "__main__":
-    prom = PrometheusAPI(monitor_config["prometheusApi"], monitor_config["namespace"])
+    prom = PrometheusAPI(namespace=monitor_config["namespace"])
 
     # Define time range for exporting metrics
     end_time = datetime.now()
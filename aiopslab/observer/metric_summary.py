@@ -0,0 +1,145 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Summaries of container metrics that fit in an agent's context.
+
+Per-pod rollups (average, maximum, 95th percentile) are computed by Prometheus
+itself with `*_over_time` subqueries. Only a coarse per-pod time series is
+fetched to find change points and rank the most anomalous series locally.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Points per series fetched for change-point detection
+SUMMARY_POINTS = 120
+
+SUMMARY_COLUMNS = ["pod", "metric", "avg", "max", "p95", "change_at", "shift", "score"]
+
+
+def pod_rollup_query(metric: str, namespace: str) -> str:
+    """PromQL for one value per pod and timestamp.
+
+    Counters are turned into per-second rates. cAdvisor reports a pod-level
+    series next to the per-container ones, so the pod value is their maximum
+    rather than their sum.
+    """
+    selector = f"{metric}{{namespace='{namespace}'}}"
+    if metric.endswith("_total"):
+        selector = f"rate({selector}[1m])"
+    return f"max by (pod) ({selector})"
+
+
+def rollup_queries(metric: str, namespace: str, window: int, step: int) -> dict:
+    """Instant queries for the per-pod average, maximum and p95 over `window` seconds."""
+    inner = f"{pod_rollup_query(metric, namespace)}[{window}s:{step}s]"
+    return {
+        "avg": f"avg_over_time({inner})",
+        "max": f"max_over_time({inner})",
+        "p95": f"quantile_over_time(0.95, {inner})",
+    }
+
+
+def change_point(values, min_size: int = 3):
+    """Find the single split of a series with the most significant mean shift.
+
+    Args:
+        values (array-like): The series, oldest first.
+        min_size (int): Minimum number of points on each side of the split.
+
+    Returns:
+        tuple: (index of the first point after the change, mean shift, t-like
+            score). The index is None if the series is too short or flat.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    if n < 2 * min_size:
+        return None, 0.0, 0.0
+
+    # Means of x[:k] and x[k:] for every split k, from cumulative sums
+    csum = np.cumsum(x)
+    k = np.arange(min_size, n - min_size + 1)
+    before = csum[k - 1] / k
+    after = (csum[-1] - csum[k - 1]) / (n - k)
+    shift = after - before
+
+    std = x.std()
+    if std == 0:
+        return None, 0.0, 0.0
+    scores = np.abs(shift) / std * np.sqrt(k * (n - k) / n)
+    best = int(np.argmax(scores))
+    return int(k[best]), float(shift[best]), float(scores[best])
+
+
+def anomaly_score(values) -> float:
+    """Robust z-score of the point furthest from the series median."""
+    x = np.asarray(values, dtype=np.float64)
+    if len(x) == 0:
+        return 0.0
+    median = np.median(x)
+    mad = np.median(np.abs(x - median)) * 1.4826
+    # Keep tiny relative noise on otherwise constant series from scoring high
+    scale = max(mad, 1e-3 * abs(median), 1e-9)
+    return float(np.max(np.abs(x - median)) / scale)
+
+
+def summarize_series(timestamps, values) -> dict:
+    """Change point and anomaly score of one per-pod series.
+
+    The score is the larger of the change-point and robust z-scores, so both
+    level shifts and spikes rank high.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    timestamps, values = timestamps[finite], values[finite]
+
+    index, shift, cp_score = change_point(values)
+    return {
+        "change_at": int(timestamps[index]) if index is not None else None,
+        "shift": round(shift, 3),
+        "score": round(max(cp_score, anomaly_score(values)), 3),
+    }
+
+
+def summarize_frame(df, top_k: int = 20):
+    """Summarize raw samples locally, like `PrometheusAPI.summarize_metrics`.
+
+    Used for recorded metrics, where there is no Prometheus to compute the
+    rollups. As in `pod_rollup_query`, a pod's value at each timestamp is the
+    maximum over its series, and counters are turned into per-second rates.
+
+    Args:
+        df (pd.DataFrame): Samples with timestamp (epoch seconds), pod, metric
+            and value columns.
+        top_k (int): Number of series to return.
+
+    Returns:
+        pd.DataFrame: One row per series with SUMMARY_COLUMNS, most anomalous first.
+    """
+    rows = []
+    for (pod, metric), group in df.groupby(["pod", "metric"], sort=False):
+        series = group.groupby("timestamp")["value"].max().sort_index()
+        if metric.split(".")[0].endswith("_total"):
+            seconds = np.diff(series.index.to_numpy(dtype=np.float64))
+            # Counter resets show up as negative increases
+            rates = np.clip(np.diff(series.to_numpy()), 0, None) / seconds
+            series = pd.Series(rates, index=series.index[1:])
+        if series.empty:
+            continue
+        values = series.to_numpy(dtype=np.float64)
+        row = {
+            "pod": pod,
+            "metric": metric,
+            "avg": round(float(values.mean()), 3),
+            "max": round(float(values.max()), 3),
+            "p95": round(float(np.percentile(values, 95)), 3),
+        }
+        row.update(summarize_series(series.index, values))
+        rows.append(row)
+
+    summary = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+    summary = summary.sort_values(by="score", ascending=False, kind="stable")
+    summary = summary.head(top_k)
+    summary["change_at"] = pd.to_datetime(summary["change_at"], unit="s")
+    return summary.reset_index(drop=True)
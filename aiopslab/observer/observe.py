@@ -1,9 +1,13 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 
+import hashlib
+import json
 import os
-import threading
 import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -13,95 +17,157 @@ from aiopslab.observer.metric_api import PrometheusAPI
 from aiopslab.observer import monitor_config, root_path
 
 
-def collect_traces(start_time, end_time):
-    tracer = TraceAPI(namespace=monitor_config["namespace"])
+def collect_traces(start_time, end_time, save_path=None, namespace=None):
+    tracer = TraceAPI(namespace=namespace or monitor_config["namespace"])
     traces = tracer.extract_traces(start_time, end_time)
     df_traces = tracer.process_traces(traces)
-    save_path = root_path / "trace_output"
+    save_path = save_path or root_path / "trace_output"
     tracer.save_traces(df_traces, save_path)
 
 
-def collect_logs(start_time, end_time):
+def collect_logs(start_time, end_time, save_path=None, namespace=None):
     logger = LogAPI(
         monitor_config["api"], monitor_config["username"], monitor_config["password"]
     )
-    save_path = root_path / "log_output"
+    save_path = save_path or root_path / "log_output"
     os.makedirs(save_path, exist_ok=True)
     logger.log_extract(
         start_time=int(start_time.timestamp()),
         end_time=int(end_time.timestamp()),
         path=save_path,
+        namespace=namespace,
     )
 
 
-def collect_metrics(start_time, end_time):
-    prom = PrometheusAPI(
-        namespace=monitor_config["namespace"], url=monitor_config["prometheusApi"]
-    )
-    save_path = root_path / "metrics_output"
+def collect_metrics(start_time, end_time, save_path=None, namespace=None):
+    prom = PrometheusAPI(namespace=namespace or monitor_config["namespace"])
+    save_path = save_path or root_path / "metrics_output"
     prom.export_all_metrics(
         start_time=start_time, end_time=end_time, save_path=str(save_path), step=10
     )
 
 
-def organize_collected_data():
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    final_save_path = root_path / f"telemetry_data_{timestamp}"
-
-    # Create the final directory
-    os.makedirs(final_save_path, exist_ok=True)
-
-    # Define source and destination paths
-    log_src = root_path / "log_output"
-    trace_src = root_path / "trace_output"
-    metrics_src = root_path / "metrics_output"
-
-    log_dest = final_save_path / "log"
-    trace_dest = final_save_path / "trace"
-    metrics_dest = final_save_path / "metric"
-
-    def copy_latest_file(src_dir, dest_dir):
-        os.makedirs(dest_dir, exist_ok=True)
-        items = list(Path(src_dir).glob("*"))
-        if not items:
-            print(f"No files or directories found in {src_dir}")
-            return
-        # Sort items by modified time and pick the latest
-        latest_item = max(items, key=os.path.getmtime)
-
-        if latest_item.is_dir():
-            shutil.copytree(latest_item, dest_dir / latest_item.name)
-            print(f"Copied directory {latest_item} to {dest_dir}")
-        else:
-            shutil.copy2(latest_item, dest_dir / latest_item.name)
-            print(f"Copied file {latest_item} to {dest_dir}")
-
-    if log_src.exists():
-        copy_latest_file(log_src, log_dest)
-    if trace_src.exists():
-        copy_latest_file(trace_src, trace_dest)
-    if metrics_src.exists():
-        copy_latest_file(metrics_src, metrics_dest)
+# Bundle subdirectory -> collector writing that signal into it
+SIGNAL_COLLECTORS = {
+    "metric": collect_metrics,
+    "log": collect_logs,
+    "trace": collect_traces,
+}
+
+
+def _signal_files(path: Path) -> list:
+    return sorted(p for p in path.rglob("*") if p.is_file())
+
+
+def _collect_signal(signal, start_time, end_time, path, namespace) -> dict:
+    """Run one collector into `path`; its latency, volume and error, if any."""
+    os.makedirs(path, exist_ok=True)
+    started = time.time()
+    error = None
+    try:
+        SIGNAL_COLLECTORS[signal](start_time, end_time, path, namespace)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        print(f"Collecting {signal} data failed: {error}")
+    files = _signal_files(path)
+    return {
+        "seconds": round(time.time() - started, 3),
+        "files": len(files),
+        "bytes": sum(f.stat().st_size for f in files),
+        "error": error,
+    }
+
+
+def _content_hash(path: Path, window: str) -> str:
+    """Hash of the window (namespace and times) and of the collected files."""
+    digest = hashlib.sha256(window.encode())
+    for file in _signal_files(path):
+        digest.update(file.relative_to(path).parts[0].encode())
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def collect_snapshot(
+    start_time, end_time, namespace=None, signals=None, save_root=None
+) -> Path:
+    """Collect metrics, logs and traces for one time window into a single bundle.
+
+    The signals are collected concurrently, each writing straight into its
+    subdirectory of the bundle, so a snapshot takes as long as the slowest
+    signal. The bundle is named after a hash of the namespace, the window and
+    the collected data, and its `manifest.json` records the window and each
+    signal's latency, file count, size and error (a failing signal does not
+    fail the snapshot). A bundle with the same name is reused only if no signal
+    failed; otherwise it is replaced.
+
+    Args:
+        start_time (datetime): Start of the window.
+        end_time (datetime): End of the window.
+        namespace (str): Namespace to observe. Defaults to the monitor config's.
+        signals (list): Subset of SIGNAL_COLLECTORS to collect. Defaults to all.
+        save_root (Path): Directory for the bundles.
+
+    Returns:
+        Path: The bundle directory.
+    """
+    namespace = namespace or monitor_config["namespace"]
+    signals = list(signals or SIGNAL_COLLECTORS)
+    save_root = Path(save_root or root_path / "snapshots")
+    staging = save_root / f".staging-{uuid.uuid4().hex}"
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=len(signals)) as pool:
+        futures = {
+            signal: pool.submit(
+                _collect_signal,
+                signal,
+                start_time,
+                end_time,
+                staging / signal,
+                namespace,
+            )
+            for signal in signals
+        }
+        stats = {signal: future.result() for signal, future in futures.items()}
+
+    window = f"{namespace}|{start_time.isoformat()}|{end_time.isoformat()}"
+    content_hash = _content_hash(staging, window)
+    bundle = save_root / f"snapshot_{content_hash[:16]}"
+    manifest = {
+        "namespace": namespace,
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat(),
+        "collected_at": datetime.now().isoformat(),
+        "content_hash": content_hash,
+        "seconds": round(time.time() - started, 3),
+        "signals": stats,
+    }
+    with open(staging / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    failed = any(s["error"] for s in stats.values())
+    if bundle.exists() and not failed:
+        # The same data was already collected for the same window
+        shutil.rmtree(staging)
+    else:
+        if bundle.exists():
+            shutil.rmtree(bundle)
+        os.replace(staging, bundle)
+
+    summary = ", ".join(
+        f"{signal} {s['seconds']:.1f}s/{s['bytes'] / 2**20:.1f}MB"
+        for signal, s in stats.items()
+    )
+    print(f"Snapshot {bundle} in {manifest['seconds']:.1f}s ({summary})")
+    return bundle
 
 
 if __name__ == "__main__":
     end_time = datetime.now()
     start_time = end_time - timedelta(minutes=10)
 
-    trace_thread = threading.Thread(target=collect_traces, args=(start_time, end_time))
-    log_thread = threading.Thread(target=collect_logs, args=(start_time, end_time))
-    metric_thread = threading.Thread(
-        target=collect_metrics, args=(start_time, end_time)
-    )
-
-    trace_thread.start()
-    log_thread.start()
-    metric_thread.start()
-
-    trace_thread.join()
-    log_thread.join()
-    metric_thread.join()
-
-    organize_collected_data()
+    collect_snapshot(start_time, end_time)
 
     print("Telemetry data collection completed successfully.")
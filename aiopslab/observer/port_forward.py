@@ -0,0 +1,177 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Shared `kubectl port-forward` tunnels for the observer APIs.
+
+Each (namespace, target, port) tunnel is started once, on a free local port,
+and reused by every PrometheusAPI/TraceAPI built during the session. A tunnel
+is health-checked before it is handed out and restarted if kubectl exited or
+stopped accepting connections.
+"""
+
+import atexit
+import socket
+import subprocess
+import threading
+
+import requests
+
+from aiopslab.utils.convergence import wait_until
+
+START_ATTEMPTS = 3
+START_TIMEOUT = 10
+HEALTH_TIMEOUT = 2
+
+
+def free_local_port() -> int:
+    """Ask the OS for a currently unused local port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def is_port_open(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.settimeout(HEALTH_TIMEOUT)
+        return s.connect_ex(("127.0.0.1", port)) == 0
+
+
+class PortForward:
+    """One kubectl port-forward subprocess."""
+
+    def __init__(self, target: str, remote_port: int, namespace: str, health_path=None):
+        """
+        Args:
+            target (str): What to forward to, e.g. "svc/jaeger" or "pod/<name>".
+            remote_port (int): Port on the target.
+            namespace (str): Namespace of the target.
+            health_path (str): HTTP path that answers 2xx when the backend is
+                reachable. Without it only the local port is checked.
+        """
+        self.target = target
+        self.remote_port = remote_port
+        self.namespace = namespace
+        self.health_path = health_path
+        self.local_port = None
+        self.process = None
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.local_port}"
+
+    def start(self) -> bool:
+        """Start kubectl on a free local port; True once the tunnel accepts connections."""
+        self.local_port = free_local_port()
+        command = [
+            "kubectl",
+            "port-forward",
+            self.target,
+            f"{self.local_port}:{self.remote_port}",
+            "-n",
+            self.namespace,
+        ]
+        print("Starting port-forward with command:", " ".join(command))
+        self.process = subprocess.Popen(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        threading.Thread(target=self._drain_stderr, daemon=True).start()
+
+        wait_until(
+            lambda: self.process.poll() is not None or is_port_open(self.local_port),
+            timeout=START_TIMEOUT,
+            initial=0.1,
+            description=f"port-forward to {self.target}",
+        )
+        return self.is_healthy()
+
+    def _drain_stderr(self):
+        process = self.process
+        for line in process.stderr:
+            print(f"[port-forward {self.target}] {line}", end="")
+
+    def is_healthy(self) -> bool:
+        if self.process is None or self.process.poll() is not None:
+            return False
+        if not is_port_open(self.local_port):
+            return False
+        if self.health_path is None:
+            return True
+        try:
+            response = requests.get(self.url + self.health_path, timeout=HEALTH_TIMEOUT)
+            return response.ok
+        except requests.RequestException:
+            return False
+
+    def stop(self):
+        if self.process is None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.process = None
+
+
+class PortForwardManager:
+    """Hands out the local URL of shared, self-healing port-forwards."""
+
+    def __init__(self):
+        self._forwards = {}
+        self._lock = threading.Lock()
+
+    def get_url(
+        self, target: str, remote_port: int, namespace: str, health_path: str = None
+    ) -> str:
+        """Return the local URL of a tunnel to `target`, (re)starting it if needed.
+
+        Raises:
+            RuntimeError: If the tunnel could not be established.
+        """
+        key = (namespace, target, remote_port)
+        with self._lock:
+            forward = self._forwards.get(key)
+            if forward is not None and forward.is_healthy():
+                return forward.url
+
+            if forward is not None:
+                print(f"Port-forward to {target} is unhealthy, reconnecting...")
+                forward.stop()
+            forward = PortForward(target, remote_port, namespace, health_path)
+            for attempt in range(START_ATTEMPTS):
+                if forward.start():
+                    self._forwards[key] = forward
+                    return forward.url
+                print(f"Port-forward attempt {attempt + 1} of {START_ATTEMPTS} failed.")
+                forward.stop()
+
+        raise RuntimeError(f"Could not port-forward to {target} in {namespace}")
+
+    def close_namespace(self, namespace: str):
+        """Stop the tunnels into one namespace."""
+        with self._lock:
+            for key in [k for k in self._forwards if k[0] == namespace]:
+                self._forwards.pop(key).stop()
+
+    def close_all(self):
+        with self._lock:
+            for forward in self._forwards.values():
+                forward.stop()
+            self._forwards.clear()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_port_forward_manager() -> PortForwardManager:
+    """Return the process-wide port-forward manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = PortForwardManager()
+            atexit.register(_manager.close_all)
+        return _manager
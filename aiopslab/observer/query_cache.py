@@ -0,0 +1,187 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Cache of Prometheus range-query results split into aligned time buckets.
+
+Range queries are evaluated at multiples of `step`, and their results are cut
+into buckets of BUCKET_POINTS steps. A bucket is cached once it is older than
+FRESHNESS_SECONDS, so later queries over overlapping windows only fetch the
+buckets they are missing (typically the newest one) and stitch the rest from
+the cache. Buckets are evicted least-recently-used first once the estimated
+size of the cache exceeds its budget.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+BUCKET_POINTS = 60
+# Samples this recent may still change (late scrapes, open rate windows)
+FRESHNESS_SECONDS = 60
+MAX_CACHE_BYTES = 64 * 2**20
+# Rough size of one [timestamp, "value"] sample in the parsed JSON result
+SAMPLE_BYTES = 160
+
+
+def _epoch(t) -> float:
+    return t.timestamp() if isinstance(t, datetime) else float(t)
+
+
+def _series_key(metric: dict) -> tuple:
+    return tuple(sorted(metric.items()))
+
+
+class RangeQueryCache:
+    """Bucketed, memory-bounded LRU cache in front of `custom_query_range`."""
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # (query, step, bucket index) -> (series key -> (metric, values), size)
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def query_range(self, client, query: str, start_time, end_time, step: int) -> list:
+        """Run a range query through the cache.
+
+        The range is aligned to multiples of `step`, so sample timestamps may
+        differ by less than one step from an uncached query over the same range.
+
+        Args:
+            client (PrometheusConnect): Client used for the missing buckets.
+            query (str): PromQL expression.
+            start_time (datetime | float): Start of the range.
+            end_time (datetime | float): End of the range.
+            step (int): Resolution in seconds.
+
+        Returns:
+            list: The result in Prometheus' format, one dict per series with
+                `metric` and `values`.
+        """
+        step = int(step)
+        start = -(-int(_epoch(start_time)) // step) * step
+        end = int(_epoch(end_time)) // step * step
+        if end < start:
+            return []
+        bucket_span = step * BUCKET_POINTS
+        first, last = start // bucket_span, end // bucket_span
+
+        buckets = {}
+        missing = []
+        with self._lock:
+            for index in range(first, last + 1):
+                entry = self._buckets.get((query, step, index))
+                if entry is None:
+                    self.misses += 1
+                    missing.append(index)
+                else:
+                    self.hits += 1
+                    self._buckets.move_to_end((query, step, index))
+                    buckets[index] = entry[0]
+
+        for run_first, run_last in _runs(missing):
+            buckets.update(
+                self._fetch(client, query, step, run_first, run_last, end)
+            )
+
+        series = {}
+        for index in range(first, last + 1):
+            for key, (metric, values) in buckets.get(index, {}).items():
+                if key not in series:
+                    series[key] = {"metric": metric, "values": []}
+                series[key]["values"].extend(
+                    v for v in values if start <= v[0] <= end
+                )
+        return [s for s in series.values() if s["values"]]
+
+    def _fetch(self, client, query, step, first, last, end) -> dict:
+        """Fetch buckets `first`..`last` in one query and cache the closed ones."""
+        bucket_span = step * BUCKET_POINTS
+        closed_before = int(time.time()) - FRESHNESS_SECONDS
+        # Whole buckets, so they can be cached, unless they reach past now
+        fetch_end = max(end, min((last + 1) * bucket_span - step, closed_before))
+        result = client.custom_query_range(
+            query,
+            datetime.fromtimestamp(first * bucket_span),
+            datetime.fromtimestamp(fetch_end),
+            step=step,
+        )
+
+        buckets = {index: {} for index in range(first, last + 1)}
+        for series in result:
+            key = _series_key(series["metric"])
+            for sample in series["values"]:
+                ts = int(float(sample[0]))
+                index = ts // bucket_span
+                if index in buckets:
+                    bucket = buckets[index]
+                    if key not in bucket:
+                        bucket[key] = (series["metric"], [])
+                    bucket[key][1].append((ts, sample[1]))
+
+        with self._lock:
+            for index, bucket in buckets.items():
+                if (index + 1) * bucket_span - step <= min(fetch_end, closed_before):
+                    self._store((query, step, index), bucket)
+        return buckets
+
+    def _store(self, key, bucket):
+        size = sum(
+            SAMPLE_BYTES * len(values) + sum(len(k) + len(v) for k, v in metric.items())
+            for metric, values in bucket.values()
+        ) + len(key[0])
+        old = self._buckets.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._buckets[key] = (bucket, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and self._buckets:
+            _, (_, evicted) = self._buckets.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        """Bucket hits and misses, evictions and the current size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "buckets": len(self._buckets),
+                "bytes": self.bytes,
+            }
+
+
+def _runs(indices: list) -> list:
+    """Group sorted bucket indices into (first, last) runs of consecutive indices."""
+    runs = []
+    for index in indices:
+        if runs and runs[-1][1] == index - 1:
+            runs[-1][1] = index
+        else:
+            runs.append([index, index])
+    return runs
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_range_cache() -> RangeQueryCache:
+    """Return the process-wide range-query cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RangeQueryCache()
+        return _cache
@@ -0,0 +1,206 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Pods and services of a namespace, shared by the observer APIs.
+
+A namespace is listed once when it is first asked for; after that a watch per
+resource applies the add/modify/delete events, so observers read the current
+inventory from memory instead of listing pods and services on every call. If a
+watch expires (410 Gone) or fails, the resource is listed again and watched
+from the new resourceVersion.
+"""
+
+import atexit
+import threading
+
+from kubernetes import client, watch
+from kubernetes.client.rest import ApiException
+
+from aiopslab.service.k8s_client import get_api_client
+
+# Pods the observers leave out of metric and log inventories
+EXCLUDED_POD_PREFIXES = ("loadgenerator-", "redis-cart")
+WATCH_TIMEOUT_SECONDS = 300
+RETRY_SECONDS = 5
+
+
+def _pod_record(pod) -> dict:
+    owners = pod.metadata.owner_references or []
+    return {
+        "labels": dict(pod.metadata.labels or {}),
+        "owner": f"{owners[0].kind}/{owners[0].name}" if owners else None,
+        "node": pod.spec.node_name if pod.spec else None,
+        "phase": pod.status.phase if pod.status else None,
+    }
+
+
+def _service_record(service) -> dict:
+    return {
+        "labels": dict(service.metadata.labels or {}),
+        "selector": dict(service.spec.selector or {}) if service.spec else {},
+    }
+
+
+class NamespaceTopology:
+    """Pod and service inventory of one namespace, kept current by watches."""
+
+    def __init__(self, namespace: str, api: client.CoreV1Api = None):
+        self.namespace = namespace
+        self.api = api or client.CoreV1Api(get_api_client())
+        self._resources = {
+            "pods": (self.api.list_namespaced_pod, _pod_record),
+            "services": (self.api.list_namespaced_service, _service_record),
+        }
+        self._items = {kind: {} for kind in self._resources}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._watches = []
+
+    def start(self, watch_changes: bool = True):
+        """List pods and services, then follow their changes in the background."""
+        versions = {kind: self._relist(kind) for kind in self._resources}
+        if not watch_changes:
+            return
+        for kind, version in versions.items():
+            threading.Thread(
+                target=self._watch,
+                args=(kind, version),
+                name=f"topology-{self.namespace}-{kind}",
+                daemon=True,
+            ).start()
+
+    def stop(self):
+        self._stopped.set()
+        for w in list(self._watches):
+            w.stop()
+
+    def _relist(self, kind: str) -> str:
+        list_fn, record = self._resources[kind]
+        result = list_fn(self.namespace)
+        items = {item.metadata.name: record(item) for item in result.items}
+        with self._lock:
+            self._items[kind] = items
+        return result.metadata.resource_version
+
+    def _watch(self, kind: str, resource_version: str):
+        list_fn = self._resources[kind][0]
+        while not self._stopped.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._relist(kind)
+                w = watch.Watch()
+                self._watches.append(w)
+                try:
+                    for event in w.stream(
+                        list_fn,
+                        self.namespace,
+                        resource_version=resource_version,
+                        timeout_seconds=WATCH_TIMEOUT_SECONDS,
+                    ):
+                        if event["type"] == "ERROR":
+                            resource_version = None
+                            break
+                        self.apply_event(kind, event["type"], event["object"])
+                        resource_version = event["object"].metadata.resource_version
+                finally:
+                    w.stop()
+                    self._watches.remove(w)
+            except ApiException as e:
+                # 410 Gone: the resourceVersion is too old, list again
+                resource_version = None
+                if e.status != 410:
+                    print(f"Watch on {kind} in {self.namespace} failed: {e.reason}")
+                    self._stopped.wait(RETRY_SECONDS)
+            except Exception as e:
+                resource_version = None
+                print(f"Watch on {kind} in {self.namespace} failed: {e}")
+                self._stopped.wait(RETRY_SECONDS)
+
+    def apply_event(self, kind: str, event_type: str, obj):
+        """Apply one watch event (ADDED, MODIFIED or DELETED) to the inventory."""
+        name = obj.metadata.name
+        with self._lock:
+            items = self._items[kind]
+            if event_type == "DELETED":
+                items.pop(name, None)
+            else:
+                items[name] = self._resources[kind][1](obj)
+
+    def pod_names(self, exclude_prefixes: tuple = EXCLUDED_POD_PREFIXES) -> frozenset:
+        """Names of the pods, without those starting with `exclude_prefixes`."""
+        with self._lock:
+            names = list(self._items["pods"])
+        return frozenset(n for n in names if not n.startswith(exclude_prefixes))
+
+    def service_names(self) -> list:
+        with self._lock:
+            return list(self._items["services"])
+
+    def pod(self, name: str) -> dict | None:
+        """Labels, owner ("Kind/name"), node and phase of a pod."""
+        with self._lock:
+            return self._items["pods"].get(name)
+
+    def service(self, name: str) -> dict | None:
+        """Labels and selector of a service."""
+        with self._lock:
+            return self._items["services"].get(name)
+
+    def services_of_pod(self, name: str) -> list:
+        """Services whose selector matches the labels of a pod."""
+        with self._lock:
+            pod = self._items["pods"].get(name)
+            if pod is None:
+                return []
+            labels = pod["labels"].items()
+            return [
+                service
+                for service, record in self._items["services"].items()
+                if record["selector"] and record["selector"].items() <= labels
+            ]
+
+
+class TopologyCache:
+    """One watched NamespaceTopology per namespace."""
+
+    def __init__(self):
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str) -> NamespaceTopology:
+        """Return the topology of a namespace, listing and watching it on first use."""
+        with self._lock:
+            topology = self._namespaces.get(namespace)
+            if topology is None:
+                topology = NamespaceTopology(namespace)
+                topology.start()
+                self._namespaces[namespace] = topology
+            return topology
+
+    def stop(self, namespace: str):
+        """Stop watching a namespace, e.g. before it is deleted."""
+        with self._lock:
+            topology = self._namespaces.pop(namespace, None)
+        if topology is not None:
+            topology.stop()
+
+    def stop_all(self):
+        with self._lock:
+            topologies = list(self._namespaces.values())
+            self._namespaces.clear()
+        for topology in topologies:
+            topology.stop()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_topology_cache() -> TopologyCache:
+    """Return the process-wide topology cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TopologyCache()
+            atexit.register(_cache.stop_all)
+        return _cache
@@ -0,0 +1,175 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Span tables, service dependency graphs and suspicious-service rankings for traces.
+
+All functions work on the span table built by `flatten_spans`, one row per span
+with the columns of SPAN_COLUMNS. Durations from Jaeger are in microseconds;
+the summary views report milliseconds.
+"""
+
+import numpy as np
+import pandas as pd
+
+SPAN_COLUMNS = [
+    "trace_id",
+    "span_id",
+    "parent_span",
+    "service_name",
+    "operation_name",
+    "start_time",
+    "duration",
+    "has_error",
+    "response",
+]
+
+# Tags read from the spans; the last of the response tags present wins
+RESPONSE_TAGS = ("http.status_code", "response_class")
+
+
+def flatten_spans(traces: list) -> pd.DataFrame:
+    """Turn Jaeger traces into one row per span.
+
+    Scalar fields are gathered in bulk. References and tags are exploded into
+    their own tables and joined back, instead of being scanned span by span.
+    """
+    spans = [span for trace in traces for span in trace["spans"]]
+    if not spans:
+        return pd.DataFrame(columns=SPAN_COLUMNS)
+
+    df = pd.DataFrame(
+        {
+            "trace_id": [t["traceID"] for t in traces for _ in t["spans"]],
+            "span_id": [s["spanID"] for s in spans],
+            "service_name": [
+                t["processes"][s["processID"]]["serviceName"]
+                for t in traces
+                for s in t["spans"]
+            ],
+            "operation_name": [s["operationName"] for s in spans],
+            "start_time": np.array([s["startTime"] for s in spans], dtype=np.int64),
+            "duration": np.array([s["duration"] for s in spans], dtype=np.int64),
+        }
+    )
+
+    refs = pd.DataFrame(
+        [
+            (i, ref["spanID"])
+            for i, s in enumerate(spans)
+            for ref in s.get("references", ())
+            if ref["refType"] == "CHILD_OF"
+        ],
+        columns=["row", "parent_span"],
+    ).drop_duplicates("row", keep="first")
+    df["parent_span"] = refs.set_index("row")["parent_span"].reindex(df.index)
+    df["parent_span"] = df["parent_span"].fillna("ROOT")
+
+    tags = pd.DataFrame(
+        [
+            (i, tag["key"], tag["value"])
+            for i, s in enumerate(spans)
+            for tag in s.get("tags", ())
+            if tag["key"] == "error" or tag["key"] in RESPONSE_TAGS
+        ],
+        columns=["row", "key", "value"],
+    )
+    errors = tags[(tags["key"] == "error") & (tags["value"] == True)]["row"]
+    df["has_error"] = df.index.isin(errors)
+    responses = tags[tags["key"].isin(RESPONSE_TAGS)]
+    responses = responses.drop_duplicates("row", keep="last").set_index("row")["value"]
+    response = responses.reindex(df.index).astype(object)
+    df["response"] = response.where(response.notna(), "Unknown")
+
+    return df[SPAN_COLUMNS]
+
+
+def add_self_time(spans: pd.DataFrame) -> pd.DataFrame:
+    """Add `self_time`: a span's duration minus the time spent in its direct children.
+
+    Concurrent children can add up to more than their parent; self-time is
+    clipped at zero.
+    """
+    child_time = (
+        spans.groupby(["trace_id", "parent_span"])["duration"]
+        .sum()
+        .rename("child_time")
+    )
+    spans = spans.join(child_time, on=["trace_id", "span_id"])
+    self_time = spans["duration"] - spans["child_time"].fillna(0)
+    spans["self_time"] = self_time.clip(lower=0)
+    return spans.drop(columns="child_time")
+
+
+def _percentiles_ms(group, column):
+    return group[column].quantile([0.5, 0.95, 0.99]).unstack() / 1000.0
+
+
+def dependency_graph(spans: pd.DataFrame) -> pd.DataFrame:
+    """Service call graph: one row per (caller, callee) service pair.
+
+    Returns:
+        pd.DataFrame: parent_service, child_service, calls, error_rate and the
+            callee spans' p50/p95/p99 latency in milliseconds.
+    """
+    parents = spans[["trace_id", "span_id", "service_name"]].rename(
+        columns={"span_id": "parent_span", "service_name": "parent_service"}
+    )
+    edges = spans.merge(parents, on=["trace_id", "parent_span"])
+    edges = edges[edges["parent_service"] != edges["service_name"]]
+    edges = edges.rename(columns={"service_name": "child_service"})
+    columns = ["parent_service", "child_service", "calls", "error_rate"]
+    if edges.empty:
+        return pd.DataFrame(columns=columns + ["p50_ms", "p95_ms", "p99_ms"])
+
+    group = edges.groupby(["parent_service", "child_service"])
+    graph = pd.DataFrame(
+        {"calls": group.size(), "error_rate": group["has_error"].mean()}
+    )
+    latency = _percentiles_ms(group, "duration")
+    latency.columns = ["p50_ms", "p95_ms", "p99_ms"]
+    graph = graph.join(latency).reset_index()
+    graph = graph.sort_values(by="calls", ascending=False, kind="stable")
+    return graph.reset_index(drop=True)
+
+
+def suspicious_services(spans: pd.DataFrame, top_k: int = 10) -> pd.DataFrame:
+    """Rank services by how likely they are to be the source of a problem.
+
+    The score adds a service's error rate to its p95 self-time relative to the
+    slowest service, so services failing or spending time in their own code
+    (rather than waiting on callees) rank first.
+    """
+    columns = ["service_name", "spans", "error_rate", "p95_ms", "self_p95_ms", "score"]
+    if spans.empty:
+        return pd.DataFrame(columns=columns)
+
+    spans = add_self_time(spans)
+    group = spans.groupby("service_name")
+    ranking = pd.DataFrame(
+        {
+            "spans": group.size(),
+            "error_rate": group["has_error"].mean(),
+            "p95_ms": group["duration"].quantile(0.95) / 1000.0,
+            "self_p95_ms": group["self_time"].quantile(0.95) / 1000.0,
+        }
+    )
+    slowest = ranking["self_p95_ms"].max()
+    relative = ranking["self_p95_ms"] / slowest if slowest > 0 else 0.0
+    ranking["score"] = ranking["error_rate"] + relative
+    ranking = ranking.reset_index().round(3)
+    ranking = ranking.sort_values(by="score", ascending=False, kind="stable")
+    return ranking[columns].head(top_k).reset_index(drop=True)
+
+
+def summarize_traces(spans: pd.DataFrame, top_k: int = 10) -> str:
+    """Suspicious services and the busiest service calls as one compact text."""
+    if spans.empty:
+        return "No traces found."
+    graph = dependency_graph(spans).round(3).head(2 * top_k)
+    return (
+        f"{spans['trace_id'].nunique()} traces, {len(spans)} spans\n\n"
+        "Suspicious services:\n"
+        f"{suspicious_services(spans, top_k).to_string(index=False)}\n\n"
+        "Service calls:\n"
+        f"{graph.to_string(index=False)}"
+    )
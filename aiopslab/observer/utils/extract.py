@@ -2,11 +2,26 @@
 # Licensed under the MIT License.
 
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import heapq
 import os
 import pandas as pd
 import shutil
 import zipfile
+import zlib
+
+from aiopslab.observer.utils.frame_io import (
+    FrameWriter,
+    frame_columns,
+    frame_schema,
+    get_export_format,
+    iter_frame,
+    unify_frame_schemas,
+)
+
+# Rows held in memory at a time while merging
+MERGE_CHUNK_ROWS = 100_000
 
 
 def get_dates_and_timestamps(start, end):
@@ -30,15 +45,98 @@ def get_dates_and_timestamps(start, end):
     return dates, timestamps
 
 
-def merge_csv(path, csv_list, data_type):
-    data_list = []
-    for i, folder_path in enumerate(csv_list):
-        data = pd.read_csv(folder_path)
-        data_list.append(data)
-        os.remove(folder_path)
-    all_data = pd.concat(data_list)
-    all_data = all_data.reset_index(drop=True)
-    all_data.to_csv(f"{path}/{data_type}.csv")
+def _union_columns(paths):
+    columns = []
+    for path in paths:
+        columns.extend(c for c in frame_columns(path) if c not in columns)
+    return columns
+
+
+def _merge_sorted(paths, columns, sort_by, chunk_rows=MERGE_CHUNK_ROWS):
+    """K-way merge of files that are each sorted by `sort_by`, in chunks."""
+    key = columns.index(sort_by)
+
+    def rows(path):
+        for chunk in iter_frame(path, chunk_rows):
+            yield from chunk.reindex(columns=columns).itertuples(index=False, name=None)
+
+    batch = []
+    for row in heapq.merge(*(rows(p) for p in paths), key=lambda r: r[key]):
+        batch.append(row)
+        if len(batch) == chunk_rows:
+            yield pd.DataFrame(batch, columns=columns)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=columns)
+
+
+def _merge_chunks(paths, columns, sort_by=None):
+    if sort_by is not None:
+        return _merge_sorted(paths, columns, sort_by)
+    return (
+        chunk.reindex(columns=columns)
+        for path in paths
+        for chunk in iter_frame(path, MERGE_CHUNK_ROWS)
+    )
+
+
+def merge_csv(path, csv_list, data_type, sort_by=None):
+    """Concatenate per-window CSVs into `{path}/{data_type}.csv` and delete them.
+
+    The inputs are streamed in chunks, so memory use does not grow with their
+    size. The output keeps a leading 0..n-1 index column.
+
+    Args:
+        path (str): Output directory.
+        csv_list (list): CSV files to merge, in order.
+        data_type (str): Name of the merged file.
+        sort_by (str): If given, the inputs are each sorted by this column (e.g.
+            "timestamp") and are merged into one sorted output.
+    """
+    columns = _union_columns(csv_list)
+    offset = 0
+    with open(f"{path}/{data_type}.csv", "w", newline="") as out:
+        for chunk in _merge_chunks(csv_list, columns, sort_by):
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            chunk.to_csv(out, header=offset == 0)
+            offset += len(chunk)
+        if offset == 0:
+            pd.DataFrame(columns=columns).to_csv(out)
+    for csv_path in csv_list:
+        os.remove(csv_path)
+
+
+def merge_frames(path, files, data_type, fmt=None, sort_by=None):
+    """Merge exports of any format into one `{path}/{data_type}` file.
+
+    Parquet inputs are read one row group at a time and written as they are
+    read, so memory use stays constant. Columnar output gets one schema unified
+    over all inputs up front, so a column missing from (or empty in) the first
+    file still takes its type from the files that hold it. The inputs are
+    deleted once the merged file is written.
+
+    Args:
+        path (str): Output directory.
+        files (list): CSV, Parquet or Arrow files to merge, in order.
+        data_type (str): Name of the merged file, without extension.
+        fmt (str): Output format (default: `export_format` in the config).
+        sort_by (str): Merge inputs that are each sorted by this column into a
+            sorted output.
+
+    Returns:
+        str: Path of the merged file, or None if the inputs held no rows.
+    """
+    columns = _union_columns(files)
+    fmt = get_export_format(fmt)
+    schema = None
+    if fmt != "csv":
+        schema = unify_frame_schemas([frame_schema(file) for file in files])
+    with FrameWriter(os.path.join(path, data_type), fmt, schema) as writer:
+        for chunk in _merge_chunks(files, columns, sort_by):
+            writer.write(chunk)
+    for file in files:
+        os.remove(file)
+    return writer.close()
 
 
 def delete_folder(folder_path):
@@ -59,3 +157,61 @@ def zip_dir(path):
             for file in files:
                 file_path = os.path.join(root, file)
                 zip_file.write(file_path, os.path.relpath(file_path, path))
+
+
+def _deflate(file_path, compresslevel):
+    """Raw-deflate one file; returns (data, crc32, uncompressed size)."""
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    chunks, crc, size = [], 0, 0
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            crc = zlib.crc32(block, crc)
+            size += len(block)
+            chunks.append(compressor.compress(block))
+    chunks.append(compressor.flush())
+    return b"".join(chunks), crc, size
+
+
+def zip_dir_parallel(path, max_workers=4, compresslevel=6):
+    """Like `zip_dir`, but deflate-compressed, with files compressed in parallel.
+
+    zlib releases the GIL, so files are compressed concurrently in threads; the
+    compressed members are then appended to the archive in order. At most
+    `2 * max_workers` compressed files are held in memory.
+
+    Returns:
+        str: Path of the zip file.
+    """
+    zip_path = f"{path}.zip"
+    files = [
+        os.path.join(root, file) for root, _, names in os.walk(path) for file in names
+    ]
+    with zipfile.ZipFile(zip_path, "w") as zip_file, ThreadPoolExecutor(
+        max_workers=max_workers
+    ) as pool:
+        pending = []
+        for file_path in files:
+            pending.append(
+                (file_path, pool.submit(_deflate, file_path, compresslevel))
+            )
+            if len(pending) >= 2 * max_workers:
+                _write_deflated(zip_file, path, *pending.pop(0))
+        for item in pending:
+            _write_deflated(zip_file, path, *item)
+    return zip_path
+
+
+def _write_deflated(zip_file, root, file_path, future):
+    """Append an already deflated member, as ZipFile.writestr would write it."""
+    data, crc, size = future.result()
+    zinfo = zipfile.ZipInfo.from_file(file_path, os.path.relpath(file_path, root))
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.CRC = crc
+    zinfo.file_size = size
+    zinfo.compress_size = len(data)
+    zinfo.header_offset = zip_file.fp.tell()
+    zip_file.fp.write(zinfo.FileHeader())
+    zip_file.fp.write(data)
+    zip_file.filelist.append(zinfo)
+    zip_file.NameToInfo[zinfo.filename] = zinfo
+    zip_file.start_dir = zip_file.fp.tell()
@@ -0,0 +1,144 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Pick the Elasticsearch indices that can hold logs of a time window.
+
+Logstash writes each event to the index named after the (UTC) hour of its
+`@timestamp`, e.g. `logstash-2024.11.05.10`, so an hourly index only holds
+events of that hour. The planner keeps, per index, the time range it covers
+and its document count, and selects the non-empty indices overlapping a
+window. Index ranges are read from the name; for indices not named by hour they
+come from a min/max `@timestamp` aggregation. Document counts of all indices
+come from one `indices.stats` call and are refreshed at most every
+STATS_TTL_SECONDS, or sooner when a window reaches past the newest known index.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+INDEX_HOUR_FORMAT = "%Y.%m.%d.%H"
+STATS_TTL_SECONDS = 30
+MIN_REFRESH_SECONDS = 5
+
+
+def hour_range(index: str) -> tuple[float, float] | None:
+    """Epoch range [start, end) of an hourly index, or None if not named by hour."""
+    try:
+        hour = datetime.strptime(index.rsplit("-", 1)[-1], INDEX_HOUR_FORMAT)
+    except ValueError:
+        return None
+    start = hour.replace(tzinfo=timezone.utc)
+    return start.timestamp(), (start + timedelta(hours=1)).timestamp()
+
+
+def _epoch(t) -> float:
+    if isinstance(t, datetime):
+        return t.timestamp()
+    return float(t)
+
+
+class IndexPlanner:
+    """Cached index metadata and the indices a log query has to search."""
+
+    def __init__(self, elastic, pattern: str = "logstash-*"):
+        """
+        Args:
+            elastic (Elasticsearch): Client for the cluster.
+            pattern (str): Index pattern the logs are written to.
+        """
+        self.elastic = elastic
+        self.pattern = pattern
+        # index -> {"start": epoch, "end": epoch, "docs": count}
+        self._stats = {}
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Re-read document counts, and the time ranges of indices not named by hour."""
+        response = self.elastic.indices.stats(index=self.pattern, metric="docs")
+        counts = {
+            name: index["primaries"]["docs"]["count"]
+            for name, index in response["indices"].items()
+        }
+
+        stats = {}
+        unnamed = []
+        for name, docs in counts.items():
+            bounds = hour_range(name)
+            if bounds is None:
+                unnamed.append(name)
+            else:
+                stats[name] = {"start": bounds[0], "end": bounds[1], "docs": docs}
+        if unnamed:
+            for name, bounds in self._timestamp_ranges(unnamed).items():
+                stats[name] = {**bounds, "docs": counts[name]}
+
+        with self._lock:
+            self._stats = stats
+            self._refreshed_at = time.time()
+
+    def _timestamp_ranges(self, indices: list) -> dict:
+        """Min/max `@timestamp` of several indices in one aggregation."""
+        response = self.elastic.search(
+            index=",".join(indices),
+            size=0,
+            aggs={
+                "per_index": {
+                    "terms": {"field": "_index", "size": len(indices)},
+                    "aggs": {
+                        "first": {"min": {"field": "@timestamp"}},
+                        "last": {"max": {"field": "@timestamp"}},
+                    },
+                }
+            },
+        )
+        ranges = {}
+        for bucket in response["aggregations"]["per_index"]["buckets"]:
+            if bucket["first"]["value"] is None:
+                continue
+            ranges[bucket["key"]] = {
+                "start": bucket["first"]["value"] / 1000.0,
+                # Inclusive max; keep `end` exclusive like the hourly ranges
+                "end": bucket["last"]["value"] / 1000.0 + 0.001,
+            }
+        return ranges
+
+    def _ensure_fresh(self, end: float = None):
+        with self._lock:
+            if self._refreshed_at is None:
+                stale = True
+            else:
+                age = time.time() - self._refreshed_at
+                newest = max((s["end"] for s in self._stats.values()), default=0.0)
+                # The window reaches into an hour no index was known for
+                stale = age > STATS_TTL_SECONDS or (
+                    end is not None and end >= newest and age > MIN_REFRESH_SECONDS
+                )
+        if stale:
+            self.refresh()
+
+    def index_stats(self) -> dict:
+        """Index name -> {"start", "end", "docs"}, refreshed if stale."""
+        self._ensure_fresh()
+        with self._lock:
+            return dict(self._stats)
+
+    def plan(self, start_time, end_time) -> list:
+        """Indices with logs overlapping [start_time, end_time], sorted by name.
+
+        Args:
+            start_time (int | float | datetime): Start of the window (epoch seconds).
+            end_time (int | float | datetime): End of the window (epoch seconds).
+        """
+        start, end = _epoch(start_time), _epoch(end_time)
+        self._ensure_fresh(end)
+        with self._lock:
+            # Indices still being written to may have been empty at the refresh
+            return sorted(
+                name
+                for name, s in self._stats.items()
+                if (s["docs"] or s["end"] > self._refreshed_at)
+                and s["start"] <= end
+                and s["end"] > start
+            )
@@ -0,0 +1,107 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Log counts per time bucket from one `date_histogram` aggregation.
+
+Buckets that ended more than FRESHNESS_SECONDS ago no longer change, so their
+counts are cached per interval. A later request only aggregates from its first
+uncached bucket on, which for a refreshing dashboard is just the current one.
+"""
+
+import re
+import threading
+import time
+
+# Logs still being shipped can land in a bucket this long after it ended
+FRESHNESS_SECONDS = 60
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def interval_seconds(interval: str) -> int:
+    """Length of an interval such as "30m", "1h" or "1d" in seconds."""
+    match = re.fullmatch(r"(\d+)([smhd])", interval)
+    if not match:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+class LogHistogram:
+    """Log counts per bucket, with closed buckets cached."""
+
+    def __init__(self, elastic, index_planner):
+        """
+        Args:
+            elastic (Elasticsearch): Client for the cluster.
+            index_planner (IndexPlanner): Picks the indices for a time range.
+        """
+        self.elastic = elastic
+        self.index_planner = index_planner
+        # interval (s) -> {bucket start (epoch s) -> count}
+        self._closed = {}
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def counts(self, start_time: float, end_time: float, interval: str = "1h") -> dict:
+        """Number of logs per bucket between two epoch timestamps.
+
+        Buckets are aligned to multiples of the interval since the epoch (UTC).
+
+        Returns:
+            dict: Bucket start (epoch seconds) -> log count, for every bucket that
+                overlaps the range, in time order.
+        """
+        step = interval_seconds(interval)
+        first = int(start_time) // step * step
+        buckets = list(range(first, int(end_time) + 1, step))
+
+        with self._lock:
+            cached = dict(self._closed.get(step, {}))
+        missing = [b for b in buckets if b not in cached]
+        if missing:
+            cached.update(self._aggregate(missing[0], end_time, step, interval))
+        return {b: cached.get(b, 0) for b in buckets}
+
+    def _aggregate(self, start: int, end_time: float, step: int, interval: str) -> dict:
+        indices = self.index_planner.plan(start, end_time)
+        if not indices:
+            return {}
+        self.queries += 1
+        response = self.elastic.search(
+            index=",".join(indices),
+            size=0,
+            query={
+                "range": {
+                    "@timestamp": {
+                        "gte": int(start * 1000),
+                        "lte": int(end_time * 1000),
+                        "format": "epoch_millis",
+                    }
+                }
+            },
+            aggs={
+                "logs": {
+                    "date_histogram": {
+                        "field": "@timestamp",
+                        "fixed_interval": interval,
+                        "min_doc_count": 0,
+                        "extended_bounds": {
+                            "min": int(start * 1000),
+                            "max": int(end_time * 1000),
+                        },
+                    }
+                }
+            },
+        )
+        counts = {
+            int(bucket["key"]) // 1000: bucket["doc_count"]
+            for bucket in response["aggregations"]["logs"]["buckets"]
+        }
+
+        closed_before = time.time() - FRESHNESS_SECONDS
+        with self._lock:
+            closed = self._closed.setdefault(step, {})
+            for bucket, count in counts.items():
+                if bucket + step <= closed_before:
+                    closed[bucket] = count
+        return counts
@@ -0,0 +1,130 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Turn batches of Elasticsearch log hits into DataFrames.
+
+Each field is pulled out of all hits of a page with one precompiled getter, and
+the timestamps are parsed with a single vectorized call instead of `strptime`
+per record. Hits missing a required field (or with an unparsable timestamp) are
+dropped and counted rather than printed one by one.
+"""
+
+import time
+from datetime import datetime
+
+import pandas as pd
+
+ES_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+# Output column -> dotted path in the hit, in output order
+HOTEL_RESERVATION_FIELDS = {
+    "log_id": "_id",
+    "date": "_source.@timestamp",
+    "pod_name": "_source.kubernetes.pod.name",
+    "container_name": "_source.kubernetes.container.name",
+    "namespace": "_source.kubernetes.namespace",
+    "node_name": "_source.kubernetes.node.name",
+    "message": "_source.message",
+}
+
+ONLINE_BOUTIQUE_FIELDS = {
+    "log_id": "_id",
+    "date": "_source.@timestamp",
+    "cmdb_id": "_source.kubernetes.pod.name",
+    "message": "_source.message",
+}
+
+
+def field_getter(path: str):
+    """Compile a dotted path into a function returning that field of a hit, or None."""
+    keys = path.split(".")
+
+    def get(hit):
+        try:
+            for key in keys:
+                hit = hit[key]
+            return hit
+        except (KeyError, TypeError):
+            return None
+
+    return get
+
+
+def normalize_hits(hits: list, fields: dict) -> tuple[pd.DataFrame, int]:
+    """Flatten log hits into one row per hit.
+
+    Args:
+        hits (list): Elasticsearch hits.
+        fields (dict): Output column -> dotted path of the field in the hit. The
+            "date" column is parsed into an epoch "timestamp" column placed
+            before it.
+
+    Returns:
+        tuple: The DataFrame and the number of malformed hits that were dropped.
+    """
+    columns = ["log_id", "timestamp"] + [c for c in fields if c != "log_id"]
+    if not hits:
+        return pd.DataFrame(columns=columns), 0
+
+    data = {}
+    for column, path in fields.items():
+        get = field_getter(path)
+        data[column] = [get(hit) for hit in hits]
+    df = pd.DataFrame(data)
+
+    parsed = pd.to_datetime(df["date"], format=ES_TIME_FORMAT, utc=True, errors="coerce")
+    valid = df.notna().all(axis=1) & parsed.notna()
+    malformed = int((~valid).sum())
+
+    epoch = (parsed - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)
+    df = df[valid].assign(timestamp=epoch[valid])
+    return df[columns].reset_index(drop=True), malformed
+
+
+if __name__ == "__main__":
+    # Records/s of the per-record loop this replaces vs. the batch normalizer
+    num_hits = 200_000
+    hits = [
+        {
+            "_id": f"log-{i}",
+            "_source": {
+                "@timestamp": f"2024-11-05T10:{i // 3600 % 60:02d}:{i % 60:02d}.123Z",
+                "message": f"request {i} handled",
+                "kubernetes": {
+                    "pod": {"name": f"geo-{i % 7}"},
+                    "container": {"name": "hotel-reserv-geo"},
+                    "namespace": "test-hotel-reservation",
+                    "node": {"name": "node-1"},
+                },
+            },
+        }
+        for i in range(num_hits)
+    ]
+
+    start = time.time()
+    rows = []
+    for log in hits:
+        source = log["_source"]
+        rows.append(
+            {
+                "log_id": log["_id"],
+                "timestamp": datetime.strptime(
+                    source["@timestamp"], ES_TIME_FORMAT
+                ).timestamp(),
+                "date": source["@timestamp"],
+                "pod_name": source["kubernetes"]["pod"]["name"],
+                "container_name": source["kubernetes"]["container"]["name"],
+                "namespace": source["kubernetes"]["namespace"],
+                "node_name": source["kubernetes"]["node"]["name"],
+                "message": source["message"],
+            }
+        )
+    pd.DataFrame(rows)
+    per_record = time.time() - start
+
+    start = time.time()
+    normalize_hits(hits, HOTEL_RESERVATION_FIELDS)
+    batch = time.time() - start
+
+    print(f"per-record: {num_hits / per_record:10.0f} records/s")
+    print(f"     batch: {num_hits / batch:10.0f} records/s")
@@ -4,15 +4,16 @@
 """Base class for task actions."""
 
 import os
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import timedelta
 from aiopslab.utils.actions import action, read, write
-from aiopslab.service.kubectl import KubeCtl
 from aiopslab.service.shell import Shell
 
 # from aiopslab.observer import initialize_pod_and_service_lists
-from aiopslab.observer.metric_api import PrometheusAPI
+from aiopslab.observer.backend import get_backend
+from aiopslab.observer.log_templates import TemplateMiner
 from aiopslab.observer.trace_api import TraceAPI
+from aiopslab.observer.trace_analysis import summarize_traces
+from aiopslab.observer.utils.frame_io import read_frame
 
 
 class TaskActions:
@@ -20,37 +21,35 @@ class TaskActions:
 
     @staticmethod
     @read
-    def get_logs(namespace: str, service: str) -> str:
+    def get_logs(namespace: str, service: str, compact: bool = False) -> str:
         """
-        Collects relevant log data from a pod using Kubectl.
+        Collects relevant log data from a pod using Kubectl, or from Loki when
+        `loki_url` is set in the config, or from the telemetry recording when
+        replaying one.
 
         Args:
             namespace (str): The namespace in which the service is running.
             service (str): The name of the service.
+            compact (bool): Collapse repeated log lines into templates with counts,
+                first/last timestamps and example parameters.
 
         Returns:
             str | dict | list[dicts]: Log data as a structured object or a string.
         """
-        kubectl = KubeCtl()
         try:
-            if namespace == "test-social-network":
-                user_service_pod = kubectl.get_pod_name(namespace, f"app={service}")
-            elif namespace == "test-hotel-reservation":
-                user_service_pod = kubectl.get_pod_name(
-                    namespace, f"io.kompose.service={service}"
-                )
-            elif namespace == "astronomy-shop":
-                user_service_pod = kubectl.get_pod_name(
-                    namespace, f"app.kubernetes.io/name={service}"
-                )
-            elif namespace == "default" and "wrk2-job" in service:
-                user_service_pod = kubectl.get_pod_name(namespace, f"job-name=wrk2-job")
-            else:
-                raise Exception
-            logs = kubectl.get_pod_logs(user_service_pod, namespace)
+            logs = get_backend().get_logs(namespace, service, timestamps=compact)
         except Exception as e:
             return "Error: Your service/namespace does not exist. Use kubectl to check."
 
+        if compact:
+            miner = TemplateMiner()
+            for line in logs.splitlines():
+                # skip per-pod headers and omitted-lines markers
+                if line and not line.startswith(("==> ", "... ")):
+                    timestamp, _, message = line.partition(" ")
+                    miner.add(message, timestamp)
+            return miner.summary()
+
         logs = "\n".join(logs.split("\n"))
 
         return logs
@@ -76,42 +75,50 @@ class TaskActions:
 
     @staticmethod
     @read
-    def get_metrics(namespace: str, duration: int = 5) -> str:
+    def get_metrics(namespace: str, duration: int = 5, raw: bool = False) -> str:
         """
         Collects metrics data from the service using Prometheus.
 
+        By default, returns a summary table of the most anomalous per-pod metrics
+        (average, maximum, p95, change point and anomaly score). Set raw=True to
+        export every raw sample to files instead.
+
         Args:
             namespace (str): The namespace in which the service is running.
             duration (int): The number of minutes from now to start collecting metrics until now.
+            raw (bool): Export raw metrics to files instead of summarizing them.
 
         Returns:
-            str: Path to the directory where metrics are saved.
+            str: The metrics summary, or the path to the directory where raw metrics are saved.
         """
-        prometheus_url = (
-            "http://localhost:32000"  # Replace with your Prometheus server URL
-        )
-        prometheus_api = PrometheusAPI(prometheus_url, namespace)
-        prometheus_api.initialize_pod_and_service_lists(namespace)
-
-        end_time = datetime.now()
+        backend = get_backend()
+        end_time = backend.now()
         start_time = end_time - timedelta(minutes=duration)
+
+        if not raw:
+            summary = backend.summarize_metrics(namespace, start_time, end_time)
+            if summary.empty:
+                return f"No metrics found for namespace '{namespace}'."
+            return summary.to_string(index=False)
+
         save_path = os.path.join(os.getcwd(), "metrics_output")
 
         # Export all metrics and save to the specified path
-        save_dir_str = prometheus_api.export_all_metrics(
-            start_time=start_time, end_time=end_time, save_path=save_path, step=15
+        save_dir_str = backend.export_metrics(
+            namespace, start_time, end_time, save_path
         )
 
         return save_dir_str
     
     @staticmethod
     @read
-    def read_metrics(file_path: str) -> str:
+    def read_metrics(file_path: str, columns: list = None) -> str:
         """
-        Reads and returns metrics from a specified CSV file.
+        Reads and returns metrics from a specified file.
 
         Args:
-            file_path (str): Path to the metrics file (CSV format).
+            file_path (str): Path to the metrics file (CSV, Parquet or Arrow format).
+            columns (list): Optional list of columns to read. Defaults to all columns.
 
         Returns:
             str: The requested metrics or an error message.
@@ -120,7 +127,7 @@ class TaskActions:
             return f"error: Metrics file '{file_path}' not found."
 
         try:
-            df_metrics = pd.read_csv(file_path)
+            df_metrics = read_frame(file_path, columns=columns)
 
             return df_metrics.to_string(index=False)
 
@@ -129,39 +136,46 @@ class TaskActions:
 
     @staticmethod
     @read
-    def get_traces(namespace: str, duration: int = 5) -> str:
+    def get_traces(namespace: str, duration: int = 5, raw: bool = False) -> str:
         """
         Collects trace data from the service using Jaeger.
 
+        By default, returns a ranking of suspicious services (error rate, latency and
+        self-time) and the service call graph with per-call error rates and latency
+        percentiles. Set raw=True to export every span to a file instead.
+
         Args:
             namespace (str): The namespace in which the service is running.
             duration (int): The number of minutes from now to start collecting traces until now.
+            raw (bool): Export raw spans to a file instead of summarizing them.
 
         Returns:
-            str: Path to the directory where traces are saved.
+            str: The traces summary, or the path to the file where raw traces are saved.
         """
         # jaeger_url = "http://localhost:16686"
         print(namespace)
-        trace_api = TraceAPI(namespace=namespace)
-
-        end_time = datetime.now()
+        backend = get_backend()
+        end_time = backend.now()
         start_time = end_time - timedelta(minutes=duration)
 
-        traces = trace_api.extract_traces(start_time=start_time, end_time=end_time)
-        df_traces = trace_api.process_traces(traces)
+        df_traces = backend.get_spans(namespace, start_time, end_time)
+        if not raw:
+            return summarize_traces(df_traces)
+
         save_path = os.path.join(os.getcwd(), "trace_output")
 
-        return trace_api.save_traces(df_traces, save_path)
+        return TraceAPI.save_traces(df_traces, save_path)
         # return f"Trace data exported to: {save_path}"
 
     @staticmethod
     @read
-    def read_traces(file_path: str) -> str:
+    def read_traces(file_path: str, columns: list = None) -> str:
         """
-        Reads and returns traces from a specified CSV file.
+        Reads and returns traces from a specified file.
 
         Args:
-            file_path (str): Path to the traces file (CSV format).
+            file_path (str): Path to the traces file (CSV, Parquet or Arrow format).
+            columns (list): Optional list of columns to read. Defaults to all columns.
 
         Returns:
             str: The requested traces or an error message.
@@ -170,7 +184,7 @@ class TaskActions:
             return f"error: Traces file '{file_path}' not found."
 
         try:
-            df_traces = pd.read_csv(file_path)
+            df_traces = read_frame(file_path, columns=columns)
 
             return df_traces.to_string(index=False)
 
@@ -5,21 +5,28 @@
 
 from aiopslab.service.helm import Helm
 from aiopslab.service.kubectl import KubeCtl
+from aiopslab.service.pod_logs import get_log_reader
+from aiopslab.observer.port_forward import get_port_forward_manager
+from aiopslab.observer.topology import get_topology_cache
 from aiopslab.session import Session
 from aiopslab.orchestrator.problems.registry import ProblemRegistry
 from aiopslab.orchestrator.parser import ResponseParser
 from aiopslab.utils.status import *
 from aiopslab.utils.critical_section import CriticalSection
 from aiopslab.service.telemetry.prometheus import Prometheus
+from aiopslab.orchestrator.warm_env import WarmEnvironment, fingerprint, fingerprint_app
 import time
 import inspect
 import asyncio
 import atexit
+import functools
 import os
 
+OPENEBS_MANIFEST = "https://openebs.github.io/charts/openebs-operator.yaml"
+
 
 class Orchestrator:
-    def __init__(self):
+    def __init__(self, warm_cluster: bool | None = None):
         self.agent = None
         self.session = None
         self.parser = ResponseParser()
@@ -30,6 +37,12 @@ class Orchestrator:
         self.kubectl = KubeCtl()
         self.use_wandb = os.getenv("USE_WANDB", "false").lower() == "true"
 
+        # Warm-cluster mode keeps OpenEBS, Prometheus and the app deployed across problems
+        if warm_cluster is None:
+            warm_cluster = os.getenv("WARM_CLUSTER", "false").lower() == "true"
+        self.warm_env = WarmEnvironment(self.kubectl) if warm_cluster else None
+        self.setup_time_saved = 0.0
+
     def init_problem(self, problem_id: str):
         """Initialize a problem instance for the agent to solve.
 
@@ -45,35 +58,23 @@ class Orchestrator:
         self.session = Session()
         print(f"Session ID: {self.session.session_id}")
         prob = self.probs.get_problem_instance(problem_id)
+        # Logs remembered from the previous problem's pods are no longer needed;
+        # other workers' namespaces keep theirs
+        get_log_reader().reset(prob.app.namespace)
         self.session.set_problem(prob, pid=problem_id)
         self.session.set_agent(self.agent_name)
 
-        print("Setting up OpenEBS...")
-
-        # Install OpenEBS
-        self.kubectl.exec_command(
-            "kubectl apply -f https://openebs.github.io/charts/openebs-operator.yaml"
-        )
-        self.kubectl.exec_command(
-            "kubectl patch storageclass openebs-hostpath -p '{\"metadata\": {\"annotations\":{\"storageclass.kubernetes.io/is-default-class\":\"true\"}}}'"
-        )
-        self.kubectl.wait_for_ready("openebs")
-        print("OpenEBS setup completed.")
-
-        # Setup and deploy Prometheus
         self.prometheus = Prometheus()
-        self.prometheus.deploy()
-
-        # deploy service
-        prob.app.delete()
-        prob.app.deploy()
+        self.setup_time_saved = self.setup_environment(prob)
 
         # make sure is_fault_injected is correct to apply appropriate
         # function with atexit to recover fault
         with CriticalSection():
             # inject fault
             prob.inject_fault()
-            atexit.register(exit_cleanup_fault, prob=prob)
+            # bind to this problem so concurrent orchestrators only unregister their own
+            self.exit_cleanup = functools.partial(exit_cleanup_fault, prob=prob)
+            atexit.register(self.exit_cleanup)
 
         # Check if start_workload is async or sync
         if inspect.iscoroutinefunction(prob.start_workload):
@@ -174,7 +175,7 @@ class Orchestrator:
             with CriticalSection():
                 print("Some exception happened. Recovering the injected fault...")
                 self.session.problem.recover_fault()
-                atexit.unregister(exit_cleanup_fault)
+                atexit.unregister(self.exit_cleanup)
             raise e
 
         self.session.end()
@@ -193,20 +194,20 @@ class Orchestrator:
 
         with CriticalSection():
             self.session.problem.recover_fault()
-            atexit.unregister(exit_cleanup_fault)
+            atexit.unregister(self.exit_cleanup)
             
         # Beyond recovering from fault,
         # I feel sometimes it is safer to delete the whole namespace.
         # But this will take more time.
         # if not self.session.problem.sys_status_after_recovery():
-        self.session.problem.app.cleanup()
-        self.prometheus.teardown()
-        print("Uninstalling OpenEBS...")
-        self.kubectl.exec_command("kubectl delete sc openebs-hostpath openebs-device --ignore-not-found")
-        self.kubectl.exec_command(
-            "kubectl delete -f https://openebs.github.io/charts/openebs-operator.yaml"
-        )
-        self.kubectl.wait_for_namespace_deletion("openebs")
+        if self.warm_env:
+            self.warm_env.reset(self.session.problem)
+        else:
+            self.teardown_environment(self.session.problem)
+
+        # Tunnels into the app namespace (Jaeger) are done; Prometheus' stays shared
+        get_port_forward_manager().close_namespace(self.session.problem.app.namespace)
+        get_topology_cache().stop(self.session.problem.app.namespace)
 
         self.execution_end_time = time.time()
         total_execution_time = self.execution_end_time - self.execution_start_time
@@ -216,14 +217,87 @@ class Orchestrator:
             total_execution_time - results[key]
         )  # Time spent doing everything besides running the agent
         print(f"Framework overhead: {framework_overhead}")
+        if self.warm_env:
+            print(f"Setup time saved by warm cluster: {self.setup_time_saved:.1f}s")
+        stats = self.kubectl.client_stats()
+        print(
+            f"K8s API calls: {stats['api_calls']}, connections opened: "
+            f"{stats['connections_opened']}, reused: {stats['connections_reused']}"
+        )
 
         return {
             "history": self.session.history,
             "final_state": env_response,
             "results": results,
             "framework_overhead": framework_overhead,
+            "setup_time_saved": self.setup_time_saved,
         }
 
+    def setup_environment(self, prob) -> float:
+        """Deploy OpenEBS, Prometheus and the problem's application.
+
+        In warm-cluster mode, components that are already deployed with the same
+        configuration and are healthy are reused.
+
+        Returns:
+            float: Setup time (in seconds) saved by reusing components.
+        """
+        if not self.warm_env:
+            self._setup_openebs()
+            self.prometheus.deploy()
+            self._redeploy_app(prob.app)
+            return 0.0
+
+        saved = self.warm_env.ensure(
+            "openebs",
+            fingerprint(OPENEBS_MANIFEST),
+            self._is_openebs_ready,
+            self._setup_openebs,
+        )
+        saved += self.warm_env.ensure(
+            "prometheus",
+            fingerprint(self.prometheus.helm_configs),
+            self.prometheus._is_prometheus_running,
+            self.prometheus.deploy,
+        )
+        saved += self.warm_env.ensure(
+            f"app:{prob.app.namespace}",
+            fingerprint_app(prob.app),
+            lambda: self.kubectl.is_namespace_ready(prob.app.namespace),
+            lambda: self._redeploy_app(prob.app),
+        )
+        return saved
+
+    def teardown_environment(self, prob):
+        """Remove the problem's application, Prometheus and OpenEBS from the cluster."""
+        prob.app.cleanup()
+        self.prometheus.teardown()
+        print("Uninstalling OpenEBS...")
+        self.kubectl.exec_command("kubectl delete sc openebs-hostpath openebs-device --ignore-not-found")
+        self.kubectl.exec_command(f"kubectl delete -f {OPENEBS_MANIFEST}")
+        self.kubectl.wait_for_namespace_deletion("openebs")
+
+    def _setup_openebs(self):
+        print("Setting up OpenEBS...")
+
+        # Install OpenEBS
+        self.kubectl.exec_command(f"kubectl apply -f {OPENEBS_MANIFEST}")
+        self.kubectl.exec_command(
+            "kubectl patch storageclass openebs-hostpath -p '{\"metadata\": {\"annotations\":{\"storageclass.kubernetes.io/is-default-class\":\"true\"}}}'"
+        )
+        self.kubectl.wait_for_ready("openebs")
+        print("OpenEBS setup completed.")
+
+    def _is_openebs_ready(self) -> bool:
+        storage_class = self.kubectl.exec_command(
+            "kubectl get storageclass openebs-hostpath -o name --ignore-not-found"
+        )
+        return bool(storage_class.strip()) and self.kubectl.is_namespace_ready("openebs")
+
+    def _redeploy_app(self, app):
+        app.delete()
+        app.deploy()
+
 
 def exit_cleanup_fault(prob):
     print("Recovering fault before exit...")
@@ -0,0 +1,168 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Run several problems concurrently on one cluster.
+
+Each problem gets its own Orchestrator (and so its own Session), and its
+application is deployed into a namespace suffixed with the worker slot it runs
+on, e.g. `test-social-network-w3`, so that warm namespaces are reused by the
+next problem on the same slot. Shared infrastructure (OpenEBS, Prometheus) is kept
+warm and deployed once. Problems whose faults touch cluster-scoped state run
+exclusively, while no other problem is running.
+"""
+
+import json
+import time
+import queue
+import asyncio
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from aiopslab.orchestrator.orchestrator import Orchestrator
+from aiopslab.orchestrator.warm_env import WarmEnvironment
+from aiopslab.service.apps.base import namespace_suffix
+from aiopslab.paths import RESULTS_DIR
+
+# Problems that install cluster-wide components (Chaos Mesh, cluster roles of
+# the OpenTelemetry demo chart, the TiDB operator and its CRDs in `tidb-admin`)
+# or touch nodes/PVs cannot share the cluster.
+CLUSTER_SCOPED_PROBLEMS = (
+    "assign_to_non_existent_node",
+    "container_kill",
+    "pod_failure",
+    "pod_kill",
+    "network_loss",
+    "network_delay",
+    "kernel_fault",
+    "disk_woreout",
+    "operator_",
+    "redeploy_without_PV",
+    "astronomy_shop",
+    "noop_detection_astronomy_shop",
+)
+
+
+def is_cluster_scoped(problem_id: str) -> bool:
+    """Check if a problem must run without any other problem on the cluster."""
+    return problem_id.startswith(CLUSTER_SCOPED_PROBLEMS)
+
+
+class ClusterLock:
+    """Shared/exclusive lock: namespaced problems share it, cluster-scoped ones own it."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._waiting_exclusive = 0
+
+    @contextmanager
+    def hold(self, exclusive: bool = False):
+        with self._cond:
+            if exclusive:
+                self._waiting_exclusive += 1
+                self._cond.wait_for(lambda: not self._exclusive and self._shared == 0)
+                self._waiting_exclusive -= 1
+                self._exclusive = True
+            else:
+                # Waiting exclusive holders go first so they are not starved
+                self._cond.wait_for(
+                    lambda: not self._exclusive and self._waiting_exclusive == 0
+                )
+                self._shared += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                if exclusive:
+                    self._exclusive = False
+                else:
+                    self._shared -= 1
+                self._cond.notify_all()
+
+
+class ParallelRunner:
+    """Schedule problems over a bounded pool of concurrent sessions."""
+
+    def __init__(
+        self,
+        agent_factory,
+        agent_name: str = "agent",
+        max_workers: int = 4,
+        max_steps: int = 30,
+    ):
+        """
+        Args:
+            agent_factory (callable): Returns a fresh agent for each problem.
+            agent_name (str): Name the agents are registered with.
+            max_workers (int): Number of problems to run at once.
+            max_steps (int): Maximum number of agent steps per problem.
+        """
+        self.agent_factory = agent_factory
+        self.agent_name = agent_name
+        self.max_workers = max_workers
+        self.max_steps = max_steps
+        self.warm_env = WarmEnvironment()
+        self.cluster_lock = ClusterLock()
+        self._slots = queue.Queue()
+        for slot in range(max_workers):
+            self._slots.put(slot)
+        self._results_lock = threading.Lock()
+        self.results_file = RESULTS_DIR / f"parallel_{int(time.time())}.jsonl"
+
+    def run(self, problem_ids: list[str]) -> dict:
+        """Run all problems and return their results keyed by problem ID."""
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        results = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._run_one, pid): pid for pid in problem_ids
+            }
+            for future in as_completed(futures):
+                pid = futures[future]
+                try:
+                    results[pid] = future.result()
+                except Exception as e:
+                    print(f"Problem {pid} failed: {e}")
+                    results[pid] = {"error": str(e)}
+                self._record(pid, results[pid])
+
+        print(f"Results written to: {self.results_file}")
+        return results
+
+    def _run_one(self, problem_id: str) -> dict:
+        exclusive = is_cluster_scoped(problem_id)
+        slot = self._slots.get()
+        try:
+            with self.cluster_lock.hold(exclusive=exclusive):
+                # Cluster-scoped problems run alone, so they keep the default namespace
+                suffix = "" if exclusive else f"-w{slot}"
+                with namespace_suffix(suffix):
+                    return asyncio.run(self._solve(problem_id))
+        finally:
+            self._slots.put(slot)
+
+    async def _solve(self, problem_id: str) -> dict:
+        agent = self.agent_factory()
+        orchestrator = Orchestrator(warm_cluster=False)
+        orchestrator.warm_env = self.warm_env
+        orchestrator.register_agent(agent, name=self.agent_name)
+
+        problem_desc, instructions, apis = orchestrator.init_problem(problem_id)
+        agent.init_context(problem_desc, instructions, apis)
+        return await orchestrator.start_problem(max_steps=self.max_steps)
+
+    def _record(self, problem_id: str, result: dict):
+        """Append a finished problem's summary to the results file."""
+        summary = {
+            "problem_id": problem_id,
+            "results": result.get("results"),
+            "framework_overhead": result.get("framework_overhead"),
+            "setup_time_saved": result.get("setup_time_saved"),
+            "error": result.get("error"),
+        }
+        with self._results_lock:
+            with open(self.results_file, "a") as f:
+                f.write(json.dumps(summary, default=str) + "\n")
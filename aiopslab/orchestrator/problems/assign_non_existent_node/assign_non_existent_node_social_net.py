@@ -4,7 +4,6 @@
 """Assign pods to non existent node problem for the SocialNetwork application."""
 
 from typing import Any
-import time
 
 from aiopslab.orchestrator.tasks import *
 from aiopslab.orchestrator.evaluators.quantitative import is_exact_match, is_subset
@@ -47,7 +46,6 @@ class AssignNonExistentNodeSocialNetBaseTask:
             fault_type="assign_to_non_existent_node",
             microservices=[self.faulty_service],
         )
-        time.sleep(25)
         print(f"Service: {self.faulty_service} | Namespace: {self.namespace}\n")
 
     def recover_fault(self):
@@ -47,6 +47,7 @@ class ChaosFaultBaseTask:
         self.symptom_injector.inject_container_kill(
             self.faulty_service, self.faulty_container
         )
+        self.symptom_injector._wait_for_effect("container_kill")
         print(
             f"Service: {self.faulty_service} | Container: {self.faulty_container} | Namespace: {self.namespace}\n"
         )
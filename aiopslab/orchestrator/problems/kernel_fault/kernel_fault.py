@@ -46,7 +46,10 @@ class KernelFaultBaseTask:
 
     def inject_fault(self):
         print("== Fault Injection ==")
-        self.injector.inject_kernel_fault([self.faulty_service])
+        self.injector._inject(
+            fault_type="kernel_fault",
+            microservices=[self.faulty_service],
+        )
         print(f"Service: {self.faulty_service} | Namespace: {self.namespace}\n")
 
     def recover_fault(self):
@@ -38,7 +38,10 @@ class NetworkDelayBaseTask:
 
     def inject_fault(self):
         print("== Fault Injection ==")
-        self.injector.inject_network_delay([self.faulty_service])
+        self.injector._inject(
+            fault_type="network_delay",
+            microservices=[self.faulty_service],
+        )
         print(f"Service: {self.faulty_service} | Namespace: {self.namespace}\n")
 
     def recover_fault(self):
@@ -4,7 +4,6 @@
 """Scale pod replica to zero problem for the SocialNetwork application."""
 
 from typing import Any
-import time
 
 from aiopslab.orchestrator.tasks import *
 from aiopslab.orchestrator.evaluators.quantitative import is_exact_match, is_subset
@@ -49,8 +48,6 @@ class ScalePodSocialNetBaseTask:
             fault_type="scale_pods_to_zero",
             microservices=[self.faulty_service],
         )
-        # Terminating the pod may take long time when scaling
-        time.sleep(30)
         print(f"Service: {self.faulty_service} | Namespace: {self.namespace}\n")
 
     def recover_fault(self):
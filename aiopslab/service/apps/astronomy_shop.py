@@ -1,10 +1,9 @@
 """Interface to the OpenTelemetry Astronomy Shop application"""
 
-import time
-
 from aiopslab.service.helm import Helm
 from aiopslab.service.kubectl import KubeCtl
 from aiopslab.service.apps.base import Application
+from aiopslab.utils.convergence import wait_until
 from aiopslab.paths import ASTRONOMY_SHOP_METADATA
 
 
@@ -35,7 +34,12 @@ class AstronomyShop(Application):
         """Delete the Helm configurations."""
         Helm.uninstall(**self.helm_configs)
         self.kubectl.delete_namespace(self.helm_configs["namespace"])
-        time.sleep(30)
+        # Give the storage provisioner time to reclaim the app's volumes
+        wait_until(
+            lambda: not self.kubectl.get_namespace_volumes(self.helm_configs["namespace"]),
+            timeout=30,
+            description="persistent volumes to be reclaimed",
+        )
 
     def cleanup(self):
         Helm.uninstall(**self.helm_configs)
@@ -2,8 +2,29 @@
 # Licensed under the MIT License.
 
 import json
+from contextlib import contextmanager
+from contextvars import ContextVar
 from aiopslab.paths import TARGET_MICROSERVICES
 
+# Suffix appended to every application namespace created in the current context.
+# Lets several problems run side by side on one cluster (see orchestrator/parallel.py).
+_namespace_suffix: ContextVar[str] = ContextVar("namespace_suffix", default="")
+
+
+@contextmanager
+def namespace_suffix(suffix: str):
+    """Deploy applications created within this context into `<namespace><suffix>`."""
+    token = _namespace_suffix.set(suffix)
+    try:
+        yield
+    finally:
+        _namespace_suffix.reset(token)
+
+
+def get_namespace_suffix() -> str:
+    """Return the namespace suffix of the current context ("" if none)."""
+    return _namespace_suffix.get()
+
 
 class Application:
     """Base class for all microservice applications."""
@@ -25,9 +46,11 @@ class Application:
             metadata = json.load(file)
 
         self.name = metadata["Name"]
-        self.namespace = metadata["Namespace"]
+        self.namespace = metadata["Namespace"] + get_namespace_suffix()
         if "Helm Config" in metadata:
             self.helm_configs = metadata["Helm Config"]
+            if "namespace" in self.helm_configs:
+                self.helm_configs["namespace"] += get_namespace_suffix()
             chart_path = self.helm_configs.get("chart_path")
             
             if chart_path and not self.helm_configs.get("remote_chart", False):
@@ -55,7 +78,7 @@ class Application:
         """
         app_json = self.get_app_json()
         app_name = app_json.get("Name", "")
-        namespace = app_json.get("Namespace", "")
+        namespace = self.namespace or app_json.get("Namespace", "")
         desc = app_json.get("Desc", "")
         supported_operations = app_json.get("Supported Operations", [])
         operations_str = "\n".join([f"  - {op}" for op in supported_operations])
@@ -66,7 +89,9 @@ class Application:
 
     def create_namespace(self):
         """Create the namespace for the application if it doesn't exist."""
-        result = self.kubectl.exec_command(f"kubectl get namespace {self.namespace}")
+        result = self.kubectl.exec_command(
+            f"kubectl get namespace {self.namespace} -o name"
+        )
         if "notfound" in result.lower():
             print(f"Namespace {self.namespace} not found. Creating namespace.")
             create_namespace_command = f"kubectl create namespace {self.namespace}"
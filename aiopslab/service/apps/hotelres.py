@@ -86,9 +86,8 @@ class HotelReservation(Application):
         """Delete the entire namespace for the hotel reservation application."""
         self.kubectl.delete_namespace(self.namespace)
         time.sleep(10)
-        pvs = self.kubectl.exec_command(
-            "kubectl get pv --no-headers | grep 'test-hotel-reservation' | awk '{print $1}'"
-        ).splitlines()
+        # Only PVs claimed from this namespace, not those of `<namespace>-wN` workers
+        pvs = self.kubectl.get_namespace_volumes(self.namespace)
 
         for pv in pvs:
             # Check if the PV is in a 'Terminating' state and remove the finalizers if necessary
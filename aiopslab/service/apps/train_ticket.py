@@ -1,9 +1,9 @@
 """Interface to the Train Ticket application"""
-import time
 
 from aiopslab.service.helm import Helm
 from aiopslab.service.kubectl import KubeCtl
 from aiopslab.service.apps.base import Application
+from aiopslab.utils.convergence import wait_until
 from aiopslab.paths import TARGET_MICROSERVICES
 from aiopslab.paths import TRAIN_TICKET_METADATA
 
@@ -31,7 +31,12 @@ class TrainTicket(Application):
         """Delete the Helm configurations."""
         # Helm.uninstall(**self.helm_configs) # Don't helm uninstall until cleanup job is fixed on train-ticket
         self.kubectl.delete_namespace(self.namespace)
-        time.sleep(30)
+        # Give the storage provisioner time to reclaim the app's volumes
+        wait_until(
+            lambda: not self.kubectl.get_namespace_volumes(self.namespace),
+            timeout=30,
+            description="persistent volumes to be reclaimed",
+        )
 
     def cleanup(self):
         # Helm.uninstall(**self.helm_configs)
@@ -0,0 +1,94 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Process-wide Kubernetes API client shared by all KubeCtl instances.
+
+The kubeconfig is loaded once and every API object is built on the same
+ApiClient, so HTTP keep-alive connections are reused instead of opening a new
+TLS connection pool per `KubeCtl()`.
+"""
+
+import threading
+from kubernetes import client, config
+
+# Enough connections for the parallel runner's worker threads
+CONNECTION_POOL_MAXSIZE = 16
+
+_lock = threading.Lock()
+_api_client = None
+_kubeconfig_loads = 0
+
+
+class CountingApiClient(client.ApiClient):
+    """ApiClient that counts the API calls made through it."""
+
+    def __init__(self, configuration=None):
+        super().__init__(configuration)
+        self.api_calls = 0
+        self._calls_lock = threading.Lock()
+
+    def call_api(self, *args, **kwargs):
+        with self._calls_lock:
+            self.api_calls += 1
+        return super().call_api(*args, **kwargs)
+
+
+def get_api_client() -> CountingApiClient:
+    """Return the shared ApiClient, loading the kubeconfig on first use."""
+    global _api_client, _kubeconfig_loads
+
+    if _api_client is not None:
+        return _api_client
+
+    with _lock:
+        if _api_client is None:
+            configuration = client.Configuration()
+            config.load_kube_config(client_configuration=configuration)
+            configuration.connection_pool_maxsize = CONNECTION_POOL_MAXSIZE
+            _kubeconfig_loads += 1
+
+            # Keep `client.CoreV1Api()` without an explicit client working
+            client.Configuration.set_default(configuration)
+            _api_client = CountingApiClient(configuration)
+    return _api_client
+
+
+def reset_api_client():
+    """Drop the shared client, e.g. after the kubeconfig changed."""
+    global _api_client
+    with _lock:
+        if _api_client is not None:
+            _api_client.close()
+        _api_client = None
+
+
+def get_client_stats() -> dict:
+    """Counters showing how much the shared client saves.
+
+    Returns:
+        dict: kubeconfig loads, API calls, HTTP requests sent, connections
+            opened, and requests that reused an existing connection.
+    """
+    stats = {
+        "kubeconfig_loads": _kubeconfig_loads,
+        "api_calls": 0,
+        "http_requests": 0,
+        "connections_opened": 0,
+        "connections_reused": 0,
+    }
+    if _api_client is None:
+        return stats
+
+    stats["api_calls"] = _api_client.api_calls
+    pools = _api_client.rest_client.pool_manager.pools
+    for key in pools.keys():
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        stats["http_requests"] += pool.num_requests
+        stats["connections_opened"] += pool.num_connections
+
+    stats["connections_reused"] = max(
+        0, stats["http_requests"] - stats["connections_opened"]
+    )
+    return stats
@@ -3,20 +3,98 @@
 
 """Interface to K8S controller service."""
 
+import os
 import json
 import time
 import subprocess
 from rich.console import Console
-from kubernetes import client, config
+from kubernetes import client, watch
 from kubernetes.client.rest import ApiException
+from urllib3.exceptions import HTTPError
+from aiopslab.service.k8s_client import get_api_client, get_client_stats
+from aiopslab.service.kubectl_native import UnsupportedCommand, get_native_kubectl
+
+# A watch ending sooner than this counts as failed; waits back off after each
+# failed watch and poll instead after MAX_WATCH_FAILURES in a row
+WATCH_MIN_SECONDS = 5
+MAX_WATCH_FAILURES = 3
+
+
+def is_pod_ready(pod) -> bool:
+    """Check if all containers of a pod are ready."""
+    statuses = pod.status.container_statuses if pod.status else None
+    return bool(statuses) and all(cs.ready for cs in statuses)
+
+
+class ReadinessTracker:
+    """Incrementally tracks pod readiness from list results and watch events.
+
+    `timeline` maps each pod name to the seconds (since the tracker was created)
+    at which it was first seen and at which it turned Ready, e.g.
+    `{"geo-5d8f": {"seen": 0.0, "ready": 12.4}}`.
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.pods = {}
+        self.timeline = {}
+
+    def reset(self, pods):
+        """Replace the tracked pods with the result of a fresh list."""
+        self.pods = {}
+        for pod in pods:
+            self.update("ADDED", pod)
+
+    def update(self, event_type: str, pod):
+        name = pod.metadata.name
+        if event_type == "DELETED":
+            self.pods.pop(name, None)
+            return
+
+        ready = is_pod_ready(pod)
+        self.pods[name] = ready
+
+        now = round(time.time() - self.start, 3)
+        entry = self.timeline.setdefault(name, {"seen": now, "ready": None})
+        if ready and entry["ready"] is None:
+            entry["ready"] = now
+        elif not ready:
+            entry["ready"] = None
+
+    def all_ready(self) -> bool:
+        return bool(self.pods) and all(self.pods.values())
+
+    def pending(self) -> list[str]:
+        return sorted(name for name, ready in self.pods.items() if not ready)
+
+    def slowest(self, n: int = 3) -> list[tuple[str, float]]:
+        """Pods that took the longest to turn Ready."""
+        ready = [
+            (name, entry["ready"])
+            for name, entry in self.timeline.items()
+            if name in self.pods and entry["ready"] is not None
+        ]
+        return sorted(ready, key=lambda item: item[1], reverse=True)[:n]
 
 
 class KubeCtl:
     def __init__(self):
-        """Initialize the KubeCtl object and load the Kubernetes configuration."""
-        config.load_kube_config()
-        self.core_v1_api = client.CoreV1Api()
-        self.apps_v1_api = client.AppsV1Api()
+        """Initialize the KubeCtl object on the shared Kubernetes API client.
+
+        The kubeconfig is only loaded by the first instance in the process; later
+        instances reuse its client and connection pool.
+        """
+        self.api_client = get_api_client()
+        self.core_v1_api = client.CoreV1Api(self.api_client)
+        self.apps_v1_api = client.AppsV1Api(self.api_client)
+        self.readiness_timeline = {}
+        # Run common kubectl commands in-process instead of forking kubectl
+        self.native = os.getenv("NATIVE_KUBECTL", "true").lower() == "true"
+
+    @staticmethod
+    def client_stats() -> dict:
+        """API call and connection reuse counters of the shared client."""
+        return get_client_stats()
 
     def list_namespaces(self):
         """Return a list of all namespaces in the cluster."""
@@ -52,9 +130,37 @@ class KubeCtl:
         )
         return pod_info.items[0].metadata.name
 
-    def get_pod_logs(self, pod_name, namespace):
-        """Retrieve the logs of a specified pod within a namespace."""
-        return self.core_v1_api.read_namespaced_pod_log(pod_name, namespace)
+    def get_pod_logs(
+        self,
+        pod_name,
+        namespace,
+        container=None,
+        tail_lines=None,
+        since_seconds=None,
+        limit_bytes=None,
+        timestamps=False,
+    ):
+        """Retrieve the logs of a specified pod within a namespace.
+
+        Args:
+            container (str): Container to read; required for multi-container pods.
+            tail_lines (int): Only return the last lines of the log.
+            since_seconds (int): Only return lines newer than this many seconds.
+            limit_bytes (int): Stop after this many bytes of log.
+            timestamps (bool): Prefix each line with its RFC 3339 timestamp.
+        """
+        options = {
+            "container": container,
+            "tail_lines": tail_lines,
+            "since_seconds": since_seconds,
+            "limit_bytes": limit_bytes,
+        }
+        return self.core_v1_api.read_namespaced_pod_log(
+            pod_name,
+            namespace,
+            timestamps=timestamps,
+            **{k: v for k, v in options.items() if v is not None},
+        )
 
     def get_service_json(self, service_name, namespace, deserialize=True):
         """Retrieve the JSON description of a specified service within a namespace."""
@@ -67,56 +173,180 @@ class KubeCtl:
         """Fetch the deployment configuration."""
         return self.apps_v1_api.read_namespaced_deployment(name, namespace)
 
+    def is_namespace_ready(self, namespace) -> bool:
+        """Check (without waiting) whether a namespace has pods and all of them are Ready."""
+        try:
+            pod_list = self.list_pods(namespace)
+        except ApiException:
+            return False
+
+        if not pod_list.items:
+            return False
+
+        return all(is_pod_ready(pod) for pod in pod_list.items)
+
     def wait_for_ready(self, namespace, sleep=2, max_wait=300):
-        """Wait for all pods in a namespace to be in a Ready state before proceeding."""
+        """Wait for all pods in a namespace to be in a Ready state before proceeding.
+
+        Pod changes are followed through the watch API starting at the resourceVersion
+        of an initial list, so the wait returns as soon as the last pod turns Ready.
+        A watch dropped by the connection is resumed by relisting, with a growing
+        delay. Falls back to polling every `sleep` seconds if the pods cannot be
+        listed or watched, or if the watch fails MAX_WATCH_FAILURES times in a row.
+
+        Returns:
+            dict: Per-pod readiness timeline (see `ReadinessTracker.timeline`),
+                also kept in `self.readiness_timeline`.
+        """
 
         console = Console()
         console.log(f"[bold green]Waiting for all pods in namespace '{namespace}' to be ready...")
 
-        with console.status("[bold green]Waiting for pods to be ready...") as status:
-            wait = 0
+        tracker = ReadinessTracker()
+        self.readiness_timeline = tracker.timeline
+        deadline = time.time() + max_wait
 
-            while wait < max_wait:
-                try:
+        with console.status("[bold green]Waiting for pods to be ready...") as status:
+            try:
+                failures = 0
+                while time.time() < deadline:
+                    # (Re)list to seed the tracker and get a resourceVersion to watch from
                     pod_list = self.list_pods(namespace)
-                    
-                    if pod_list.items:
-                        ready_pods = [
-                            pod for pod in pod_list.items
-                            if pod.status.container_statuses and
-                            all(cs.ready for cs in pod.status.container_statuses)
-                        ]
+                    tracker.reset(pod_list.items)
+                    if tracker.all_ready():
+                        break
+
+                    if failures >= MAX_WATCH_FAILURES:
+                        console.log("[yellow]Watch keeps failing, polling pod statuses instead.")
+                        self._poll_until_ready(namespace, tracker, sleep, deadline, max_wait, console)
+                        break
+                    started = time.time()
+                    if self._watch_until_ready(namespace, tracker, pod_list, deadline):
+                        break
+                    failures = self._watch_backoff(failures, started, sleep, deadline)
+                else:
+                    self._raise_not_ready(namespace, max_wait, tracker)
+            except (ApiException, HTTPError) as e:
+                reason = e.status if isinstance(e, ApiException) else type(e).__name__
+                console.log(f"[yellow]Watch unavailable ({reason}), polling pod statuses instead.")
+                self._poll_until_ready(namespace, tracker, sleep, deadline, max_wait, console)
+
+            console.log(f"[bold green]All pods in namespace '{namespace}' are ready.")
+            for name, elapsed in tracker.slowest(3):
+                console.log(f"  {name} ready after {elapsed:.1f}s")
+            return tracker.timeline
+
+    def _watch_until_ready(self, namespace, tracker, pod_list, deadline) -> bool:
+        """Follow pod events until all pods are Ready. Returns False if the watch ended early."""
+        w = watch.Watch()
+        try:
+            for event in w.stream(
+                self.core_v1_api.list_namespaced_pod,
+                namespace,
+                resource_version=pod_list.metadata.resource_version,
+                timeout_seconds=max(1, int(deadline - time.time())),
+            ):
+                if event["type"] == "ERROR":
+                    # e.g. 410 Gone: resourceVersion too old, relist
+                    return False
+                tracker.update(event["type"], event["object"])
+                if tracker.all_ready():
+                    return True
+        except ApiException as e:
+            if e.status == 410:
+                return False
+            raise
+        except HTTPError:
+            # Connection reset or read timeout (urllib3 ProtocolError,
+            # ReadTimeoutError): relist and watch again
+            return False
+        finally:
+            w.stop()
+        return False
+
+    def _watch_backoff(self, failures, started, sleep, deadline) -> int:
+        """Count a watch that ended early as failed and wait before the next one.
+
+        Returns:
+            int: Consecutive failed watches, 0 if this one ran long enough.
+        """
+        if time.time() - started >= WATCH_MIN_SECONDS:
+            return 0
+        failures += 1
+        delay = min(sleep * 2 ** (failures - 1), deadline - time.time())
+        time.sleep(max(0, delay))
+        return failures
+
+    def _poll_until_ready(self, namespace, tracker, sleep, deadline, max_wait, console):
+        while time.time() < deadline:
+            try:
+                tracker.reset(self.list_pods(namespace).items)
+                if tracker.all_ready():
+                    return
+            except Exception as e:
+                console.log(f"[red]Error checking pod statuses: {e}")
 
-                        if len(ready_pods) == len(pod_list.items):
-                            console.log(f"[bold green]All pods in namespace '{namespace}' are ready.")
-                            return
+            time.sleep(sleep)
 
-                except Exception as e:
-                    console.log(f"[red]Error checking pod statuses: {e}")
+        self._raise_not_ready(namespace, max_wait, tracker)
 
-                time.sleep(sleep)
-                wait += sleep
+    def _raise_not_ready(self, namespace, max_wait, tracker):
+        pending = ", ".join(tracker.pending()) or "no pods found"
+        raise Exception(
+            f"[red]Timeout: Not all pods in namespace '{namespace}' reached the Ready state "
+            f"within {max_wait} seconds. Pending: {pending}"
+        )
 
-            raise Exception(f"[red]Timeout: Not all pods in namespace '{namespace}' reached the Ready state within {max_wait} seconds.")
-    
     def wait_for_namespace_deletion(self, namespace, sleep=2, max_wait=300):
-        """Wait for a namespace to be fully deleted before proceeding."""
+        """Wait for a namespace to be fully deleted before proceeding.
+
+        The namespace is watched from a list, relisting when the watch ends or
+        its connection drops, like `wait_for_ready`.
+        """
 
         console = Console()
         console.log(f"[bold green]Waiting for namespace '{namespace}' to be deleted...")
 
         with console.status("[bold green]Waiting for namespace deletion...") as status:
-            wait = 0
+            deadline = time.time() + max_wait
+            failures = 0
 
-            while wait < max_wait:
+            while time.time() < deadline:
+                started = time.time()
                 try:
-                    self.core_v1_api.read_namespace(name=namespace)
-                except Exception as e:
-                    console.log(f"[bold green]Namespace '{namespace}' has been deleted.")
-                    return
-
-                time.sleep(sleep)
-                wait += sleep
+                    ns_list = self.core_v1_api.list_namespace(
+                        field_selector=f"metadata.name={namespace}"
+                    )
+                    if not ns_list.items:
+                        console.log(f"[bold green]Namespace '{namespace}' has been deleted.")
+                        return
+                    if failures >= MAX_WATCH_FAILURES:
+                        # Watching keeps failing: poll the list instead
+                        time.sleep(sleep)
+                        continue
+
+                    w = watch.Watch()
+                    try:
+                        for event in w.stream(
+                            self.core_v1_api.list_namespace,
+                            field_selector=f"metadata.name={namespace}",
+                            resource_version=ns_list.metadata.resource_version,
+                            timeout_seconds=max(1, int(deadline - time.time())),
+                        ):
+                            if event["type"] == "DELETED":
+                                console.log(f"[bold green]Namespace '{namespace}' has been deleted.")
+                                return
+                            if event["type"] == "ERROR":
+                                break
+                    finally:
+                        w.stop()
+                except ApiException as e:
+                    if e.status != 410:
+                        console.log(f"[red]Error watching namespace: {e}")
+                except HTTPError as e:
+                    # Connection reset or read timeout: relist and watch again
+                    console.log(f"[yellow]Namespace watch dropped ({type(e).__name__}).")
+                failures = self._watch_backoff(failures, started, sleep, deadline)
 
             raise Exception(f"[red]Timeout: Namespace '{namespace}' was not deleted within {max_wait} seconds.")
 
@@ -238,6 +468,14 @@ class KubeCtl:
             else:
                 print(f"Error deleting namespace '{namespace}': {e}")
 
+    def get_namespace_volumes(self, namespace: str) -> list[str]:
+        """Names of PersistentVolumes still bound to claims from a namespace."""
+        return [
+            pv.metadata.name
+            for pv in self.core_v1_api.list_persistent_volume().items
+            if pv.spec.claim_ref and pv.spec.claim_ref.namespace == namespace
+        ]
+
     def create_namespace_if_not_exist(self, namespace: str):
         """Create a namespace if it doesn't exist."""
         try:
@@ -253,7 +491,18 @@ class KubeCtl:
                 print(f"Error checking/creating namespace '{namespace}': {e}")
 
     def exec_command(self, command: str, input_data=None):
-        """Execute an arbitrary kubectl command."""
+        """Execute an arbitrary kubectl command.
+
+        Common get/delete/patch/scale/rollout restart/apply commands are executed
+        through the Python client (see `kubectl_native`); everything else, and any
+        command with input data, runs the kubectl binary.
+        """
+        if self.native and input_data is None:
+            try:
+                return get_native_kubectl().execute(command)
+            except UnsupportedCommand:
+                pass
+
         if input_data is not None:
             input_data = input_data.encode("utf-8")
         try:
@@ -291,3 +540,8 @@ if __name__ == "__main__":
     user_service_pod = kubectl.get_pod_name(namespace, f"app={user_service}")
     logs = kubectl.get_pod_logs(user_service_pod, namespace)
     print(logs)
+
+    # Further instances share the first one's client and connections
+    for _ in range(10):
+        KubeCtl().list_pods(namespace)
+    print(KubeCtl.client_stats())
@@ -0,0 +1,557 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""In-process execution of common kubectl commands.
+
+`KubeCtl.exec_command` forks a shell and a kubectl binary for every call. The
+commands the framework itself issues most often (get/delete/patch/scale,
+`rollout restart`, `create namespace` and `apply -f` of a single manifest) are
+translated here into calls on the shared Python client, with output and error
+messages shaped like kubectl's. Anything else raises `UnsupportedCommand` and
+is run through the subprocess as before.
+"""
+
+import os
+import json
+import time
+import shlex
+import threading
+from datetime import datetime, timezone
+
+import yaml
+from kubernetes import config
+from kubernetes.dynamic import DynamicClient
+from kubernetes.dynamic.exceptions import (
+    DynamicApiError,
+    NotFoundError,
+    ResourceNotFoundError,
+)
+
+from aiopslab.service.k8s_client import get_api_client
+
+# CLI resource names -> (apiVersion, kind) of the built-in types we translate
+RESOURCE_ALIASES = {}
+for _names, _api_version, _kind in [
+    (("pods", "pod", "po"), "v1", "Pod"),
+    (("services", "service", "svc"), "v1", "Service"),
+    (("configmaps", "configmap", "cm"), "v1", "ConfigMap"),
+    (("secrets", "secret"), "v1", "Secret"),
+    (("namespaces", "namespace", "ns"), "v1", "Namespace"),
+    (("nodes", "node", "no"), "v1", "Node"),
+    (("endpoints", "ep"), "v1", "Endpoints"),
+    (("persistentvolumeclaims", "persistentvolumeclaim", "pvc"), "v1", "PersistentVolumeClaim"),
+    (("persistentvolumes", "persistentvolume", "pv"), "v1", "PersistentVolume"),
+    (("deployments", "deployment", "deploy"), "apps/v1", "Deployment"),
+    (("statefulsets", "statefulset", "sts"), "apps/v1", "StatefulSet"),
+    (("daemonsets", "daemonset", "ds"), "apps/v1", "DaemonSet"),
+    (("replicasets", "replicaset", "rs"), "apps/v1", "ReplicaSet"),
+    (("jobs", "job"), "batch/v1", "Job"),
+    (("storageclasses", "storageclass", "sc"), "storage.k8s.io/v1", "StorageClass"),
+]:
+    for _name in _names:
+        RESOURCE_ALIASES[_name] = (_api_version, _kind)
+
+RESTARTABLE_KINDS = ("Deployment", "StatefulSet", "DaemonSet")
+
+LAST_APPLIED_ANNOTATION = "kubectl.kubernetes.io/last-applied-configuration"
+
+# Fields set by the server that must not be sent when creating an object
+SERVER_FIELDS = ("resourceVersion", "uid", "creationTimestamp", "generation",
+                 "managedFields", "selfLink")
+
+SHELL_OPERATORS = {"|", "||", "&&", ";", ">", ">>", "<", "&", "2>&1"}
+
+FLAGS_WITH_VALUE = {
+    "-n": "namespace", "--namespace": "namespace",
+    "-o": "output", "--output": "output",
+    "-p": "patch", "--patch": "patch",
+    "--type": "patch_type",
+    "-f": "filename", "--filename": "filename",
+    "--replicas": "replicas",
+    "-l": "selector", "--selector": "selector",
+    "--timeout": "timeout",
+}
+BOOL_FLAGS = {"--ignore-not-found": "ignore_not_found", "--wait": "wait"}
+
+PATCH_CONTENT_TYPES = {
+    "strategic": "application/strategic-merge-patch+json",
+    "merge": "application/merge-patch+json",
+    "json": "application/json-patch+json",
+}
+
+
+class UnsupportedCommand(Exception):
+    """The command has to be run by the kubectl binary."""
+
+
+class KubectlError(Exception):
+    """A translated command failed; the message is what kubectl prints on stderr."""
+
+
+class KubectlCommand:
+    """A parsed kubectl invocation."""
+
+    def __init__(self, verb: str, args: list[str], flags: dict):
+        self.verb = verb
+        self.args = args
+        self.namespace = flags.get("namespace")
+        self.output = flags.get("output")
+        self.patch = flags.get("patch")
+        self.patch_type = flags.get("patch_type", "strategic")
+        self.filename = flags.get("filename")
+        self.replicas = flags.get("replicas")
+        self.selector = flags.get("selector")
+        self.timeout = parse_duration(flags.get("timeout", "0"))
+        self.ignore_not_found = flags.get("ignore_not_found", False)
+        self.wait = flags.get("wait", True)
+
+
+def parse_duration(value: str) -> float:
+    """Parse a kubectl duration such as "10s", "2m" or "0" into seconds."""
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    for unit in ("ms", "s", "m", "h"):
+        if value.endswith(unit) and value[: -len(unit)].replace(".", "", 1).isdigit():
+            return float(value[: -len(unit)]) * units[unit]
+    if value.replace(".", "", 1).isdigit():
+        return float(value)
+    raise UnsupportedCommand(f"Unknown duration: {value}")
+
+
+def _parse_bool(value: str) -> bool:
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    raise UnsupportedCommand(f"Unknown boolean: {value}")
+
+
+def parse_command(command: str) -> KubectlCommand:
+    """Parse a plain kubectl command line.
+
+    Raises:
+        UnsupportedCommand: For shell pipelines/redirections, other programs and
+            flags the translation does not understand.
+    """
+    if "$(" in command or "`" in command:
+        raise UnsupportedCommand("Shell substitution")
+    try:
+        tokens = shlex.split(command)
+    except ValueError as e:
+        raise UnsupportedCommand(str(e))
+
+    if not tokens or tokens[0] != "kubectl" or SHELL_OPERATORS & set(tokens):
+        raise UnsupportedCommand("Not a plain kubectl command")
+
+    args, flags = [], {}
+    i = 1
+    while i < len(tokens):
+        token = tokens[i]
+        if token.startswith("-") and token != "-":
+            name, eq, value = token.partition("=")
+            if name in FLAGS_WITH_VALUE:
+                if not eq:
+                    i += 1
+                    if i >= len(tokens):
+                        raise UnsupportedCommand(f"Missing value for {name}")
+                    value = tokens[i]
+                flags[FLAGS_WITH_VALUE[name]] = value
+            elif name in BOOL_FLAGS:
+                flags[BOOL_FLAGS[name]] = _parse_bool(value) if eq else True
+            else:
+                raise UnsupportedCommand(f"Unsupported flag: {name}")
+        else:
+            args.append(token)
+        i += 1
+
+    if not args:
+        raise UnsupportedCommand("No verb")
+
+    if "replicas" in flags:
+        if not flags["replicas"].isdigit():
+            raise UnsupportedCommand("Invalid replicas")
+        flags["replicas"] = int(flags["replicas"])
+    if flags.get("output") not in (None, "json", "yaml", "name"):
+        raise UnsupportedCommand(f"Unsupported output: {flags['output']}")
+    if flags.get("patch_type", "strategic") not in PATCH_CONTENT_TYPES:
+        raise UnsupportedCommand(f"Unsupported patch type: {flags['patch_type']}")
+
+    return KubectlCommand(args[0], args[1:], flags)
+
+
+def clean_manifest(obj: dict) -> dict:
+    """Drop server-populated fields so a manifest from `get -o yaml` can be created."""
+    obj = dict(obj)
+    obj.pop("status", None)
+    metadata = dict(obj.get("metadata") or {})
+    for field in SERVER_FIELDS:
+        metadata.pop(field, None)
+    obj["metadata"] = metadata
+    return obj
+
+
+class NativeKubectl:
+    """Executes parsed kubectl commands through the dynamic client."""
+
+    def __init__(self, api_client=None):
+        self.api_client = api_client or get_api_client()
+        self._dynamic = None
+        self._default_namespace = None
+        self._lock = threading.Lock()
+
+    @property
+    def dynamic(self) -> DynamicClient:
+        with self._lock:
+            if self._dynamic is None:
+                self._dynamic = DynamicClient(self.api_client)
+            return self._dynamic
+
+    @property
+    def default_namespace(self) -> str:
+        if self._default_namespace is None:
+            try:
+                _, context = config.list_kube_config_contexts()
+                self._default_namespace = context["context"].get("namespace", "default")
+            except Exception:
+                self._default_namespace = "default"
+        return self._default_namespace
+
+    def execute(self, command: str) -> str:
+        """Run a command in-process and return what kubectl would have returned.
+
+        Like `KubeCtl.exec_command`, stdout is returned on success and the error
+        message on failure.
+
+        Raises:
+            UnsupportedCommand: The command must be run by the kubectl binary.
+        """
+        cmd = parse_command(command)
+        handler = {
+            "get": self._get,
+            "delete": self._delete,
+            "patch": self._patch,
+            "scale": self._scale,
+            "rollout": self._rollout,
+            "apply": self._apply,
+            "create": self._create,
+        }.get(cmd.verb)
+        if handler is None:
+            raise UnsupportedCommand(f"Unsupported verb: {cmd.verb}")
+
+        try:
+            return handler(cmd)
+        except KubectlError as e:
+            return f"{e}\n"
+        except DynamicApiError as e:
+            return f"{format_api_error(e)}\n"
+        except UnsupportedCommand:
+            raise
+        except Exception as e:
+            # exec_command never raises; report like a failed kubectl call
+            return f"error: {e}\n"
+
+    ############# Resource helpers ################
+
+    def _resource(self, api_version: str, kind: str):
+        dynamic = self.dynamic
+        try:
+            with self._lock:
+                return dynamic.resources.get(api_version=api_version, kind=kind)
+        except ResourceNotFoundError:
+            # e.g. a CRD that is not installed; let kubectl report it
+            raise UnsupportedCommand(f"Unknown kind: {api_version}/{kind}")
+
+    def _resolve(self, type_name: str):
+        """Resolve a CLI resource name such as "deploy" or "deployments.apps"."""
+        name, _, group = type_name.lower().partition(".")
+        if name not in RESOURCE_ALIASES:
+            raise UnsupportedCommand(f"Unknown resource type: {type_name}")
+        api_version, kind = RESOURCE_ALIASES[name]
+        if group and not api_version.startswith(group + "/"):
+            raise UnsupportedCommand(f"Unknown resource type: {type_name}")
+        return self._resource(api_version, kind)
+
+    def _targets(self, cmd: KubectlCommand) -> list:
+        """(resource, name) pairs from `TYPE NAME...` or `TYPE/NAME...` arguments."""
+        if not cmd.args:
+            raise UnsupportedCommand("No resource type")
+        if all("/" in arg for arg in cmd.args):
+            return [
+                (self._resolve(arg.split("/", 1)[0]), arg.split("/", 1)[1])
+                for arg in cmd.args
+            ]
+        if any("/" in arg for arg in cmd.args) or "," in cmd.args[0]:
+            raise UnsupportedCommand("Mixed resource arguments")
+        resource = self._resolve(cmd.args[0])
+        return [(resource, name) for name in cmd.args[1:]] or [(resource, None)]
+
+    def _namespace(self, resource, cmd: KubectlCommand, obj: dict | None = None):
+        if not resource.namespaced:
+            return None
+        if obj and obj.get("metadata", {}).get("namespace"):
+            return obj["metadata"]["namespace"]
+        return cmd.namespace or self.default_namespace
+
+    def _load_manifests(self, filename: str) -> list[dict]:
+        if filename == "-" or "://" in filename or not os.path.isfile(filename):
+            raise UnsupportedCommand("Only single local manifest files are translated")
+        with open(filename, "r") as f:
+            docs = [doc for doc in yaml.safe_load_all(f) if doc]
+        if any(doc.get("kind", "").endswith("List") for doc in docs):
+            raise UnsupportedCommand("List manifests")
+        return docs
+
+    ############# Verbs ################
+
+    def _get(self, cmd: KubectlCommand) -> str:
+        if cmd.output is None or cmd.filename:
+            # Table output is kubectl's printer; leave it to kubectl
+            raise UnsupportedCommand("Table output")
+
+        objects = []
+        for resource, name in self._targets(cmd):
+            namespace = self._namespace(resource, cmd)
+            try:
+                if name is None:
+                    result = resource.get(
+                        namespace=namespace, label_selector=cmd.selector
+                    ).to_dict()
+                    for item in result.get("items", []):
+                        item.setdefault("apiVersion", resource.group_version)
+                        item.setdefault("kind", resource.kind)
+                        objects.append((resource, item))
+                else:
+                    obj = resource.get(name=name, namespace=namespace).to_dict()
+                    objects.append((resource, obj))
+            except NotFoundError as e:
+                if not cmd.ignore_not_found:
+                    raise KubectlError(format_api_error(e))
+
+        single = len(cmd.args) == 1 and "/" in cmd.args[0] or len(cmd.args) == 2
+        if cmd.output == "name":
+            return "".join(
+                f"{qualified_kind(resource)}/{obj['metadata']['name']}\n"
+                for resource, obj in objects
+            )
+
+        if single and len(objects) == 1:
+            payload = objects[0][1]
+        elif single and not objects:
+            return ""
+        else:
+            payload = {
+                "apiVersion": "v1",
+                "items": [obj for _, obj in objects],
+                "kind": "List",
+                "metadata": {"resourceVersion": ""},
+            }
+
+        if cmd.output == "json":
+            return json.dumps(payload, indent=4) + "\n"
+        return yaml.safe_dump(payload, default_flow_style=False)
+
+    def _delete(self, cmd: KubectlCommand) -> str:
+        if cmd.filename:
+            targets = []
+            for doc in self._load_manifests(cmd.filename):
+                resource = self._resource(doc["apiVersion"], doc["kind"])
+                targets.append(
+                    (resource, doc["metadata"]["name"], self._namespace(resource, cmd, doc))
+                )
+        elif cmd.selector:
+            resource = self._resolve(cmd.args[0]) if len(cmd.args) == 1 else None
+            if resource is None:
+                raise UnsupportedCommand("Selector with names")
+            namespace = self._namespace(resource, cmd)
+            items = resource.get(namespace=namespace, label_selector=cmd.selector).items
+            targets = [(resource, item.metadata.name, namespace) for item in items]
+        else:
+            targets = [
+                (resource, name, self._namespace(resource, cmd))
+                for resource, name in self._targets(cmd)
+            ]
+            if any(name is None for _, name, _ in targets):
+                raise UnsupportedCommand("Delete without names")
+
+        out, errors = [], []
+        for resource, name, namespace in targets:
+            try:
+                resource.delete(name=name, namespace=namespace)
+                out.append(f'{qualified_kind(resource)} "{name}" deleted')
+            except NotFoundError as e:
+                if not cmd.ignore_not_found:
+                    errors.append(format_api_error(e))
+
+        if cmd.wait:
+            deadline = time.time() + (cmd.timeout or 300)
+            for resource, name, namespace in targets:
+                self._wait_deleted(resource, name, namespace, deadline)
+
+        if errors:
+            raise KubectlError("\n".join(errors))
+        return "".join(line + "\n" for line in out)
+
+    def _wait_deleted(self, resource, name, namespace, deadline):
+        """Block until an object is gone, like `kubectl delete --wait`."""
+        while time.time() < deadline:
+            try:
+                resource.get(name=name, namespace=namespace)
+            except NotFoundError:
+                return
+            time.sleep(0.5)
+        raise KubectlError(
+            f'error: timed out waiting for the condition on {resource.name}/{name}'
+        )
+
+    def _patch(self, cmd: KubectlCommand) -> str:
+        targets = self._targets(cmd)
+        if len(targets) != 1 or targets[0][1] is None or cmd.patch is None:
+            raise UnsupportedCommand("Patch needs exactly one object and -p")
+        resource, name = targets[0]
+        namespace = self._namespace(resource, cmd)
+
+        try:
+            body = json.loads(cmd.patch)
+        except json.JSONDecodeError:
+            body = yaml.safe_load(cmd.patch)
+
+        before = resource.get(name=name, namespace=namespace)
+        after = resource.patch(
+            body=body,
+            name=name,
+            namespace=namespace,
+            content_type=PATCH_CONTENT_TYPES[cmd.patch_type],
+        )
+        unchanged = (
+            before.metadata.resourceVersion == after.metadata.resourceVersion
+        )
+        return f"{qualified_kind(resource)}/{name} patched{' (no change)' if unchanged else ''}\n"
+
+    def _scale(self, cmd: KubectlCommand) -> str:
+        if cmd.replicas is None:
+            raise UnsupportedCommand("Scale without --replicas")
+        out = []
+        for resource, name in self._targets(cmd):
+            if name is None:
+                raise UnsupportedCommand("Scale without names")
+            resource.patch(
+                body={"spec": {"replicas": cmd.replicas}},
+                name=name,
+                namespace=self._namespace(resource, cmd),
+                content_type=PATCH_CONTENT_TYPES["merge"],
+            )
+            out.append(f"{qualified_kind(resource)}/{name} scaled\n")
+        return "".join(out)
+
+    def _rollout(self, cmd: KubectlCommand) -> str:
+        if not cmd.args or cmd.args[0] != "restart":
+            raise UnsupportedCommand("Only `rollout restart` is translated")
+        cmd.args = cmd.args[1:]
+
+        restarted_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        body = {
+            "spec": {
+                "template": {
+                    "metadata": {
+                        "annotations": {
+                            "kubectl.kubernetes.io/restartedAt": restarted_at
+                        }
+                    }
+                }
+            }
+        }
+        out = []
+        for resource, name in self._targets(cmd):
+            if name is None or resource.kind not in RESTARTABLE_KINDS:
+                raise UnsupportedCommand("Restart of a whole type or non-workload")
+            resource.patch(
+                body=body,
+                name=name,
+                namespace=self._namespace(resource, cmd),
+                content_type=PATCH_CONTENT_TYPES["strategic"],
+            )
+            out.append(f"{qualified_kind(resource)}/{name} restarted\n")
+        return "".join(out)
+
+    def _apply(self, cmd: KubectlCommand) -> str:
+        if not cmd.filename or cmd.args:
+            raise UnsupportedCommand("Only `apply -f <file>` is translated")
+
+        docs = [clean_manifest(doc) for doc in self._load_manifests(cmd.filename)]
+        targets = []
+        for doc in docs:
+            resource = self._resource(doc["apiVersion"], doc["kind"])
+            namespace = self._namespace(resource, cmd, doc)
+            try:
+                resource.get(name=doc["metadata"]["name"], namespace=namespace)
+                # Updating needs kubectl's three-way merge; leave it to kubectl
+                raise UnsupportedCommand("Object already exists")
+            except NotFoundError:
+                targets.append((resource, namespace, doc))
+
+        out = []
+        for resource, namespace, doc in targets:
+            # Record the manifest like kubectl does, so later applies can diff against it
+            applied = json.dumps(doc, sort_keys=True, separators=(",", ":")) + "\n"
+            metadata = doc["metadata"]
+            metadata["annotations"] = dict(metadata.get("annotations") or {})
+            metadata["annotations"][LAST_APPLIED_ANNOTATION] = applied
+            resource.create(body=doc, namespace=namespace)
+            out.append(f"{qualified_kind(resource)}/{doc['metadata']['name']} created\n")
+        return "".join(out)
+
+    def _create(self, cmd: KubectlCommand) -> str:
+        if len(cmd.args) != 2 or cmd.args[0] not in ("namespace", "ns"):
+            raise UnsupportedCommand("Only `create namespace` is translated")
+        resource = self._resolve("namespace")
+        resource.create(body={"apiVersion": "v1", "kind": "Namespace",
+                              "metadata": {"name": cmd.args[1]}})
+        return f"namespace/{cmd.args[1]} created\n"
+
+
+def qualified_kind(resource) -> str:
+    """kubectl's name for a type in output, e.g. "deployment.apps" or "pod"."""
+    kind = resource.kind.lower()
+    return f"{kind}.{resource.group}" if resource.group else kind
+
+
+def format_api_error(e: DynamicApiError) -> str:
+    """Format an API error the way kubectl prints it."""
+    try:
+        body = json.loads(e.body)
+        return f"Error from server ({body.get('reason', '')}): {body.get('message', '')}"
+    except (TypeError, ValueError):
+        return f"Error from server: {e.summary()}"
+
+
+_native = None
+_native_lock = threading.Lock()
+
+
+def get_native_kubectl() -> NativeKubectl:
+    """Return the process-wide NativeKubectl on the shared API client."""
+    global _native
+    with _native_lock:
+        if _native is None:
+            _native = NativeKubectl()
+        return _native
+
+
+# Benchmark: native fast path vs. forking kubectl
+if __name__ == "__main__":
+    from aiopslab.service.kubectl import KubeCtl
+
+    kubectl = KubeCtl()
+    commands = [
+        "kubectl get namespace default -o json",
+        "kubectl get storageclass -o name",
+        "kubectl get pods -n kube-system -o name",
+    ]
+    runs = 10
+
+    for native in (False, True):
+        kubectl.native = native
+        start = time.time()
+        for _ in range(runs):
+            for command in commands:
+                kubectl.exec_command(command)
+        elapsed = time.time() - start
+        label = "native" if native else "subprocess"
+        print(f"{label:>10}: {elapsed / (runs * len(commands)) * 1000:.1f} ms/command")
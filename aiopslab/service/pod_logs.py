@@ -0,0 +1,242 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+"""Incremental pod log retrieval.
+
+The Kubernetes log API cannot resume from a byte offset, so the reader asks for
+timestamped lines and remembers, per pod and container, the timestamp of the
+last line it has seen. Later reads only request the last few seconds with
+`since_seconds` and keep the lines newer than that timestamp, so repeated reads
+of the same pod transfer only the new part of its log. Only the last
+MAX_LOG_LINES lines of each container are kept; a log missing its start says so
+on its first line.
+"""
+
+import json
+import math
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from kubernetes.client.rest import ApiException
+
+from aiopslab.service.kubectl import KubeCtl
+
+# Extra seconds requested to cover clock skew between this host and the node
+SINCE_SLACK_SECONDS = 5
+MAX_CONCURRENT_READS = 8
+# Lines kept (and returned) per container; the first read fetches only these
+MAX_LOG_LINES = 5000
+
+
+def timestamp_key(timestamp: str) -> str:
+    """Sortable form of an RFC 3339 timestamp as written by the kubelet.
+
+    The kubelet trims trailing zeros from the fraction, so the fraction is padded
+    to nanoseconds before comparing timestamps as strings.
+    """
+    seconds, _, fraction = timestamp.rstrip("Z").partition(".")
+    return f"{seconds}.{fraction:0<9}"
+
+
+def _age_seconds(timestamp: str) -> float | None:
+    seconds = timestamp.partition(".")[0]
+    try:
+        then = datetime.strptime(seconds, "%Y-%m-%dT%H:%M:%S")
+    except ValueError:
+        return None
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return (now - then).total_seconds()
+
+
+class _LogState:
+    """Lines read so far from one container."""
+
+    __slots__ = ("lines", "last_key", "last_lines", "omitted", "tail_cut")
+
+    def __init__(self):
+        self.lines = deque(maxlen=MAX_LOG_LINES)
+        self.last_key = None
+        # Lines at `last_key`, to drop them when the next read overlaps
+        self.last_lines = set()
+        # Lines dropped from the front of `lines`, and whether the first read
+        # may have been cut by `tail_lines` (so more were omitted than counted)
+        self.omitted = 0
+        self.tail_cut = False
+
+    def omitted_marker(self) -> str | None:
+        """First line telling that the start of the log was dropped, if it was."""
+        if self.tail_cut:
+            return f"... earlier lines omitted (only the last {MAX_LOG_LINES} are kept)"
+        if self.omitted:
+            return f"... {self.omitted} earlier lines omitted"
+        return None
+
+
+class IncrementalLogReader:
+    """Reads pod logs, fetching only what was written since the previous read."""
+
+    def __init__(self, kubectl: KubeCtl | None = None):
+        self.kubectl = kubectl or KubeCtl()
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def reset(self, namespace: str = None):
+        """Forget the remembered logs of a namespace, or of all namespaces.
+
+        Args:
+            namespace (str): e.g. the namespace of a problem being started.
+                Other namespaces, such as those of concurrent problems, keep
+                their state. Defaults to all namespaces.
+        """
+        with self._lock:
+            if namespace is None:
+                self._states = {}
+            else:
+                self._states = {
+                    key: state
+                    for key, state in self._states.items()
+                    if key[0] != namespace
+                }
+
+    def read(
+        self,
+        pod_name: str,
+        namespace: str,
+        container: str = None,
+        timestamps: bool = False,
+        new_only: bool = False,
+    ) -> str:
+        """Return the log of one container.
+
+        Args:
+            pod_name (str): Name of the pod.
+            namespace (str): Namespace of the pod.
+            container (str): Container to read, required for multi-container pods.
+            timestamps (bool): Keep the timestamp at the start of each line.
+            new_only (bool): Only return lines written since the previous read.
+
+        Returns:
+            str: The log lines.
+        """
+        key = (namespace, pod_name, container)
+        with self._lock:
+            state = self._states.setdefault(key, _LogState())
+            since_seconds = None
+            tail_lines = MAX_LOG_LINES
+            age = _age_seconds(state.last_key) if state.last_key else None
+            if age is not None:
+                since_seconds = max(1, math.ceil(age) + SINCE_SLACK_SECONDS)
+                tail_lines = None
+
+        text = self.kubectl.get_pod_logs(
+            pod_name,
+            namespace,
+            container=container,
+            tail_lines=tail_lines,
+            since_seconds=since_seconds,
+            timestamps=True,
+        )
+
+        with self._lock:
+            first_read = state.last_key is None
+            new_lines = self._merge(state, text)
+            if first_read and tail_lines and len(new_lines) >= tail_lines:
+                state.tail_cut = True
+            lines = new_lines if new_only else list(state.lines)
+            marker = None if new_only else state.omitted_marker()
+
+        if not timestamps:
+            lines = [line.partition(" ")[2] for line in lines]
+        if marker:
+            lines.insert(0, marker)
+        return "\n".join(lines)
+
+    def _merge(self, state: _LogState, text: str) -> list:
+        """Append the lines of `text` newer than what `state` has seen."""
+        new_lines = []
+        for line in text.splitlines():
+            key = timestamp_key(line.partition(" ")[0])
+            if state.last_key is not None:
+                if key < state.last_key:
+                    continue
+                if key == state.last_key and line in state.last_lines:
+                    continue
+            if key != state.last_key:
+                state.last_key = key
+                state.last_lines = set()
+            state.last_lines.add(line)
+            new_lines.append(line)
+        state.omitted += max(
+            0, len(state.lines) + len(new_lines) - state.lines.maxlen
+        )
+        state.lines.extend(new_lines)
+        return new_lines
+
+    def read_pods(
+        self,
+        namespace: str,
+        label_selector: str,
+        timestamps: bool = False,
+        new_only: bool = False,
+    ) -> str:
+        """Read all containers of all pods matching a label selector in parallel.
+
+        Each log is preceded by a `==> pod[/container] <==` header when there is
+        more than one. A container whose log cannot be read, e.g. one still
+        waiting to start, gets the error in its section instead of failing the
+        whole read.
+        """
+        pods = self.kubectl.core_v1_api.list_namespaced_pod(
+            namespace, label_selector=label_selector
+        ).items
+        if not pods:
+            raise ValueError(f"No pods match '{label_selector}' in {namespace}")
+
+        targets = []
+        for pod in pods:
+            containers = [c.name for c in pod.spec.containers]
+            if len(containers) == 1:
+                targets.append((pod.metadata.name, None))
+            else:
+                targets.extend((pod.metadata.name, c) for c in containers)
+
+        def read_target(target):
+            pod_name, container = target
+            try:
+                return self.read(pod_name, namespace, container, timestamps, new_only)
+            except ApiException as e:
+                return f"Error: cannot read log: {_api_error_message(e)}"
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_READS) as pool:
+            logs = list(pool.map(read_target, targets))
+
+        if len(targets) == 1:
+            return logs[0]
+        sections = []
+        for (pod_name, container), log in zip(targets, logs):
+            name = f"{pod_name}/{container}" if container else pod_name
+            sections.append(f"==> {name} <==\n{log}")
+        return "\n\n".join(sections)
+
+
+def _api_error_message(e: ApiException) -> str:
+    """The API server's message, e.g. 'container "geo" ... is waiting to start'."""
+    try:
+        return json.loads(e.body)["message"]
+    except (TypeError, ValueError, KeyError):
+        return f"{e.status} {e.reason}"
+
+
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def get_log_reader() -> IncrementalLogReader:
+    """Return the process-wide log reader."""
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            _reader = IncrementalLogReader()
+        return _reader
@@ -3,18 +3,74 @@
 
 """Interface to Loki logging service."""
 
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
 import requests
+from requests.adapters import HTTPAdapter
+
+# Entries per query_range request while paginating
+PAGE_LIMIT = 5000
+# Ranges longer than this are split into windows fetched in parallel
+WINDOW_SECONDS = 15 * 60
+MAX_CONCURRENT_WINDOWS = 4
+REQUEST_TIMEOUT = 30
+# Window `get_pod_logs` reads when no start is given
+DEFAULT_LOG_SECONDS = 60 * 60
+
+NANOS = 10**9
+
+# Pod labels promtail exports as the `app` stream label
+PROMTAIL_APP_LABELS = ("app", "app.kubernetes.io/name")
+# Suffix Kubernetes appends to the pod names of a Deployment (ReplicaSet hash and
+# pod id, without vowels), a StatefulSet (ordinal) or a Job (pod id)
+POD_ID_CHARS = "[bcdfghjklmnpqrstvwxz2456789]"
+POD_NAME_SUFFIX = rf"-(({POD_ID_CHARS}{{1,10}}-)?{POD_ID_CHARS}{{5}}|[0-9]+)"
+
+
+def to_nanos(t) -> int:
+    """Epoch nanoseconds of a datetime, or of epoch seconds or nanoseconds."""
+    if isinstance(t, datetime):
+        return int(t.timestamp() * NANOS)
+    t = float(t)
+    # Values this large are already nanoseconds
+    return int(t) if t > 1e15 else int(t * NANOS)
+
+
+def rfc3339(nanos: int) -> str:
+    """RFC 3339 timestamp with nanoseconds, as the kubelet writes them."""
+    seconds = datetime.fromtimestamp(nanos // NANOS, tz=timezone.utc)
+    return f"{seconds.strftime('%Y-%m-%dT%H:%M:%S')}.{nanos % NANOS:09d}Z"
 
 
 class Loki:
-    def __init__(self, base_url):
-        self.base_url = base_url
+    def __init__(self, base_url, session=None):
+        """
+        Args:
+            base_url (str): URL of the Loki server.
+            session (requests.Session): Session to send requests with. By
+                default a session keeping connections alive is created.
+        """
+        self.base_url = base_url.rstrip("/")
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=MAX_CONCURRENT_WINDOWS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def _get(self, path, params):
+        params = {k: v for k, v in params.items() if v is not None}
+        return self.session.get(
+            f"{self.base_url}{path}", params=params, timeout=REQUEST_TIMEOUT
+        )
 
     def query(self, query, limit=100, time=None, direction="backward"):
-        url = f"{self.base_url}/loki/api/v1/query"
         params = {"query": query, "limit": limit, "time": time, "direction": direction}
-        response = requests.get(url, params=params)
-        return response.json()
+        return self._get("/loki/api/v1/query", params).json()
 
     def query_range(
         self,
@@ -27,7 +83,7 @@ class Loki:
         interval=None,
         direction="backward",
     ):
-        url = f"{self.base_url}/loki/api/v1/query_range"
+        """One query_range request; at most `limit` entries. See `iter_range`."""
         params = {
             "query": query,
             "limit": limit,
@@ -38,5 +94,173 @@ class Loki:
             "interval": interval,
             "direction": direction,
         }
-        response = requests.get(url, params=params)
-        return response.json()
+        return self._get("/loki/api/v1/query_range", params).json()
+
+    def iter_range(self, query, start, end, direction="forward", limit=PAGE_LIMIT):
+        """Yield every log entry of a LogQL query between `start` and `end`.
+
+        Ranges longer than WINDOW_SECONDS are split into windows fetched in
+        parallel; each window is paginated until exhausted. Entries are yielded
+        in time order (oldest first for "forward", newest first for "backward")
+        as their window completes, so memory use is bounded by the windows in
+        flight rather than by the range.
+
+        Args:
+            query (str): LogQL log query, e.g. '{namespace="x"} |= "error"'.
+            start (datetime | int | float): Start of the range (inclusive).
+            end (datetime | int | float): End of the range (exclusive).
+            direction (str): "forward" or "backward".
+            limit (int): Entries per request.
+
+        Yields:
+            tuple: (timestamp in epoch nanoseconds, stream labels, line).
+        """
+        start, end = to_nanos(start), to_nanos(end)
+        window = WINDOW_SECONDS * NANOS
+        windows = [(s, min(s + window, end)) for s in range(start, end, window)]
+        if direction == "backward":
+            windows.reverse()
+        if len(windows) <= 1:
+            for window_start, window_end in windows:
+                yield from self._paginate(
+                    query, window_start, window_end, direction, limit
+                )
+            return
+
+        def fetch(bounds):
+            return list(self._paginate(query, *bounds, direction, limit))
+
+        # Keep a bounded number of windows in flight; yield them in order
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_WINDOWS) as pool:
+            pending = deque()
+            for bounds in windows:
+                pending.append(pool.submit(fetch, bounds))
+                if len(pending) > MAX_CONCURRENT_WINDOWS:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def _paginate(self, query, start, end, direction, limit):
+        """Page through one window, moving the start (or end) to the last entry.
+
+        The next page includes the last timestamp again, since more entries may
+        share it; entries already returned at that timestamp are skipped.
+        """
+        seen_at_cursor = set()
+        while start < end:
+            response = self._get(
+                "/loki/api/v1/query_range",
+                {
+                    "query": query,
+                    "limit": limit,
+                    "start": start,
+                    "end": end,
+                    "direction": direction,
+                },
+            )
+            response.raise_for_status()
+            entries = [
+                (int(ts), stream["stream"], line)
+                for stream in response.json()["data"]["result"]
+                for ts, line in stream["values"]
+            ]
+            entries.sort(key=lambda e: e[0], reverse=direction == "backward")
+
+            new = [
+                e
+                for e in entries
+                if (e[0], _labels_key(e[1]), e[2]) not in seen_at_cursor
+            ]
+            yield from new
+            if len(entries) < limit or not new:
+                return
+
+            cursor = entries[-1][0]
+            seen_at_cursor = {
+                (e[0], _labels_key(e[1]), e[2]) for e in entries if e[0] == cursor
+            } | {key for key in seen_at_cursor if key[0] == cursor}
+            if direction == "backward":
+                end = cursor + 1
+            else:
+                start = cursor
+
+    def get_pod_logs(
+        self,
+        namespace,
+        service,
+        start=None,
+        end=None,
+        timestamps=False,
+        label_selector=None,
+    ):
+        """Logs of all pods of a service, in the format of IncrementalLogReader.
+
+        When the service's pods are selected by a label that promtail exports as
+        `app` (see `pod_stream_selector`), the streams are matched on it.
+        Otherwise pods are matched by name: the service name followed by the
+        suffix Kubernetes generates, so `frontend` does not match the pods of
+        `frontend-proxy`. Each pod's log is preceded by a `==> pod <==` header
+        when there is more than one.
+
+        Args:
+            namespace (str): Namespace of the service.
+            service (str): Name of the service.
+            start (datetime | int | float): Defaults to DEFAULT_LOG_SECONDS ago.
+            end (datetime | int | float): Defaults to now.
+            timestamps (bool): Start each line with its RFC 3339 timestamp.
+            label_selector (str): Kubernetes label selector of the service's pods,
+                e.g. "app=frontend".
+
+        Returns:
+            str: The log lines, oldest first.
+        """
+        end = end if end is not None else datetime.now(timezone.utc)
+        if start is None:
+            start = to_nanos(end) - DEFAULT_LOG_SECONDS * NANOS
+        query = pod_stream_selector(namespace, service, label_selector)
+
+        logs = {}
+        for ts, labels, line in self.iter_range(query, start, end):
+            if timestamps:
+                line = f"{rfc3339(ts)} {line}"
+            logs.setdefault(labels.get("pod", service), []).append(line)
+        if not logs:
+            raise ValueError(f"No logs for {service} in {namespace}")
+
+        if len(logs) == 1:
+            return "\n".join(next(iter(logs.values())))
+        return "\n\n".join(
+            f"==> {pod} <==\n" + "\n".join(lines)
+            for pod, lines in sorted(logs.items())
+        )
+
+
+def _logql_string(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def pod_stream_selector(namespace, service, label_selector=None) -> str:
+    """LogQL stream selector for the pods of a service."""
+    key, _, value = (label_selector or "").partition("=")
+    if key in PROMTAIL_APP_LABELS and value:
+        matcher = f"app={_logql_string(value)}"
+    else:
+        pattern = re.escape(service) + POD_NAME_SUFFIX
+        matcher = f"pod=~{_logql_string(pattern)}"
+    return f"{{namespace={_logql_string(namespace)}, {matcher}}}"
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_loki(base_url) -> Loki:
+    """Return the process-wide client for a Loki server."""
+    with _clients_lock:
+        if base_url not in _clients:
+            _clients[base_url] = Loki(base_url)
+        return _clients[base_url]
@@ -18,6 +18,7 @@ class Prometheus:
         self.namespace = None
         self.helm_configs = {}
         self.pvc_config_file = None
+        self.kubectl = KubeCtl()
 
         self.load_service_json()
 
@@ -91,18 +92,18 @@ class Prometheus:
     def _apply_pvc(self):
         """Apply the PersistentVolumeClaim configuration."""
         print(f"Applying PersistentVolumeClaim from {self.pvc_config_file}")
-        KubeCtl().exec_command(
+        self.kubectl.exec_command(
             f"kubectl apply -f {self.pvc_config_file} -n {self.namespace}"
         )
 
     def _delete_pvc(self):
         """Delete the PersistentVolume and associated PersistentVolumeClaim."""
         pvc_name = self._get_pvc_name_from_file(self.pvc_config_file)
-        result = KubeCtl().exec_command(f"kubectl get pvc {pvc_name} --ignore-not-found")
+        result = self.kubectl.exec_command(f"kubectl get pvc {pvc_name} -o name --ignore-not-found")
 
         if result:
             print(f"Deleting PersistentVolumeClaim {pvc_name}")
-            KubeCtl().exec_command(f"kubectl delete pvc {pvc_name}")
+            self.kubectl.exec_command(f"kubectl delete pvc {pvc_name}")
             print(f"Successfully deleted PersistentVolumeClaim from {pvc_name}")
         else:
             print(f"PersistentVolumeClaim {pvc_name} not found. Skipping deletion.")
@@ -115,9 +116,9 @@ class Prometheus:
 
     def _pvc_exists(self, pvc_name: str) -> bool:
         """Check if the PersistentVolumeClaim exists."""
-        command = f"kubectl get pvc {pvc_name}"
+        command = f"kubectl get pvc {pvc_name} -o name"
         try:
-            result = KubeCtl().exec_command(command)
+            result = self.kubectl.exec_command(command)
             if "No resources found" in result or "Error" in result:
                 return False
         except CalledProcessError as e:
@@ -130,7 +131,7 @@ class Prometheus:
             f"kubectl get pods -n {self.namespace} -l app.kubernetes.io/name=prometheus"
         )
         try:
-            result = KubeCtl().exec_command(command)
+            result = self.kubectl.exec_command(command)
             if "Running" in result:
                 return True
         except CalledProcessError:
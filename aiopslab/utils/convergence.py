@@ -0,0 +1,51 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import time
+
+
+def wait_until(
+    predicate,
+    timeout: float = 60,
+    initial: float = 0.2,
+    factor: float = 2.0,
+    max_interval: float = 5.0,
+    description: str = None,
+) -> bool:
+    """
+    Wait until a condition holds, checking with exponential backoff.
+
+    Args:
+        predicate (callable): Returns True once the condition holds. Exceptions
+            count as "not yet".
+        timeout (float): Deadline in seconds.
+        initial (float): First interval between checks.
+        factor (float): Growth of the interval after each failed check.
+        max_interval (float): Upper bound on the interval.
+        description (str): What is being waited for, used in the timeout message.
+
+    Returns:
+        bool: True if the condition held before the deadline, False otherwise.
+    """
+    deadline = time.time() + timeout
+    interval = initial
+    last_error = None
+
+    while True:
+        try:
+            if predicate():
+                return True
+        except Exception as e:
+            last_error = e
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        time.sleep(min(interval, remaining))
+        interval = min(interval * factor, max_interval)
+
+    message = f"Timed out after {timeout}s waiting for {description or 'condition'}"
+    if last_error is not None:
+        message += f" (last error: {last_error})"
+    print(message)
+    return False
@@ -0,0 +1,64 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from aiopslab.generators.fault.base import FaultInjector
+
+
+def make_pod(name, owner="geo-5d8f", deleting=False):
+    ref = SimpleNamespace(controller=True, kind="ReplicaSet", name=owner)
+    metadata = SimpleNamespace(
+        name=name,
+        owner_references=[ref],
+        deletion_timestamp="now" if deleting else None,
+    )
+    return SimpleNamespace(metadata=metadata)
+
+
+class TestBulkOperations(unittest.TestCase):
+    def setUp(self):
+        self.injector = FaultInjector("test-ns")
+        self.injector.kubectl = MagicMock()
+
+    def test_delete_pods_waits_for_replacements(self):
+        before = [make_pod("geo-a"), make_pod("geo-b"), make_pod("rate-a", "rate-1")]
+        terminating = [make_pod("geo-a", deleting=True), make_pod("geo-b", deleting=True)]
+        after = [make_pod("geo-c"), make_pod("geo-d"), make_pod("rate-a", "rate-1")]
+        self.injector.kubectl.list_pods.side_effect = [
+            SimpleNamespace(items=before),
+            SimpleNamespace(items=terminating + after[:1]),
+            SimpleNamespace(items=after),
+        ]
+
+        self.injector.delete_pods(["geo-a", "geo-b"], "test-ns")
+
+        deleted = {
+            c.args[0]
+            for c in self.injector.kubectl.core_v1_api.delete_namespaced_pod.call_args_list
+        }
+        self.assertEqual(deleted, {"geo-a", "geo-b"})
+        self.assertEqual(self.injector.kubectl.list_pods.call_count, 3)
+
+    def test_wait_times_out(self):
+        self.injector.kubectl.list_pods.return_value = SimpleNamespace(
+            items=[make_pod("geo-a")]
+        )
+        replaced = self.injector.wait_for_pods_replaced(
+            "test-ns", ["geo-a"], {}, timeout=0.05, sleep=0.01
+        )
+        self.assertFalse(replaced)
+
+    def test_restart_patches_all_deployments(self):
+        results = self.injector.restart_deployments(["geo", "rate"], "test-ns")
+        self.assertEqual(results, {"geo": True, "rate": True})
+        patched = {
+            c.args[0]
+            for c in self.injector.kubectl.apps_v1_api.patch_namespaced_deployment.call_args_list
+        }
+        self.assertEqual(patched, {"geo", "rate"})
+
+
+if __name__ == "__main__":
+    unittest.main()
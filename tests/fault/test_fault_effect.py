@@ -0,0 +1,66 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from unittest.mock import patch
+from aiopslab.generators.fault.base import FaultInjector
+from aiopslab.generators.fault.inject_symp import SymptomFaultInjector
+from aiopslab.utils.convergence import wait_until
+
+
+class DummyInjector(FaultInjector):
+    def __init__(self):
+        super().__init__("test-ns")
+        self.checks = 0
+
+    def inject_dummy(self, microservices):
+        self.injected = microservices
+
+    def verify_dummy(self, microservices):
+        self.checks += 1
+        return self.checks >= 3
+
+
+class TestConvergence(unittest.TestCase):
+    def test_wait_until_backs_off_until_true(self):
+        calls = []
+        ok = wait_until(lambda: calls.append(1) or len(calls) == 3, timeout=5, initial=0.01)
+        self.assertTrue(ok)
+        self.assertEqual(len(calls), 3)
+
+    def test_wait_until_deadline(self):
+        self.assertFalse(wait_until(lambda: False, timeout=0.05, initial=0.01))
+
+    def test_errors_count_as_not_yet(self):
+        self.assertFalse(wait_until(lambda: 1 / 0, timeout=0.05, initial=0.01))
+
+    @patch("aiopslab.generators.fault.base.time.sleep")
+    def test_inject_returns_when_fault_is_effective(self, mock_sleep):
+        injector = DummyInjector()
+        with patch("aiopslab.utils.convergence.time.sleep"):
+            injector._inject("dummy", ["geo"])
+        self.assertEqual(injector.injected, ["geo"])
+        self.assertEqual(injector.checks, 3)
+        mock_sleep.assert_not_called()
+
+    @patch("aiopslab.generators.fault.base.time.sleep")
+    def test_inject_without_predicate_settles(self, mock_sleep):
+        injector = DummyInjector()
+        injector._inject("unknown_fault")
+        mock_sleep.assert_called_once()
+
+    def test_chaos_faults_wait_for_injection(self):
+        for fault_type in (
+            "pod_failure",
+            "pod_kill",
+            "network_loss",
+            "network_delay",
+            "container_kill",
+            "kernel_fault",
+        ):
+            self.assertTrue(hasattr(SymptomFaultInjector, f"inject_{fault_type}"))
+            self.assertTrue(hasattr(SymptomFaultInjector, f"verify_{fault_type}"))
+
+
+if __name__ == "__main__":
+    unittest.main()
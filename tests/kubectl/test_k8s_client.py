@@ -0,0 +1,33 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from unittest.mock import patch
+from kubernetes import client
+from aiopslab.service import k8s_client
+from aiopslab.service.kubectl import KubeCtl
+
+
+class TestSharedClient(unittest.TestCase):
+    def setUp(self):
+        k8s_client.reset_api_client()
+
+    def tearDown(self):
+        k8s_client.reset_api_client()
+
+    @patch("aiopslab.service.k8s_client.config.load_kube_config")
+    def test_kubeconfig_loaded_once(self, mock_load):
+        first, second = KubeCtl(), KubeCtl()
+        self.assertIs(first.api_client, second.api_client)
+        mock_load.assert_called_once()
+
+    @patch("aiopslab.service.k8s_client.config.load_kube_config")
+    @patch.object(client.ApiClient, "call_api", return_value=None)
+    def test_api_calls_are_counted(self, mock_call, mock_load):
+        KubeCtl().list_namespaces()
+        KubeCtl().list_pods("default")
+        self.assertEqual(KubeCtl.client_stats()["api_calls"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from kubernetes.dynamic.exceptions import NotFoundError
+from aiopslab.service.kubectl_native import (
+    NativeKubectl,
+    UnsupportedCommand,
+    clean_manifest,
+    parse_command,
+)
+
+
+def make_resource(kind, group="", namespaced=True):
+    resource = MagicMock()
+    resource.kind = kind
+    resource.group = group
+    resource.name = kind.lower() + "s"
+    resource.namespaced = namespaced
+    resource.group_version = f"{group}/v1" if group else "v1"
+    return resource
+
+
+def not_found(name):
+    body = json.dumps({"reason": "NotFound", "message": f'pods "{name}" not found'})
+    return NotFoundError(SimpleNamespace(status=404, reason="Not Found", body=body, headers={}))
+
+
+class TestParseCommand(unittest.TestCase):
+    def test_flags(self):
+        cmd = parse_command("kubectl get service frontend -n test-ns -o json")
+        self.assertEqual(cmd.verb, "get")
+        self.assertEqual(cmd.args, ["service", "frontend"])
+        self.assertEqual(cmd.namespace, "test-ns")
+        self.assertEqual(cmd.output, "json")
+
+        cmd = parse_command("kubectl scale deployment geo --replicas=0 -n ns")
+        self.assertEqual(cmd.replicas, 0)
+
+        cmd = parse_command("kubectl delete -f a.yaml --timeout=10s --ignore-not-found")
+        self.assertEqual(cmd.timeout, 10)
+        self.assertTrue(cmd.ignore_not_found)
+
+    def test_patch_payload_is_one_argument(self):
+        cmd = parse_command(
+            "kubectl patch storageclass openebs-hostpath -p "
+            "'{\"metadata\": {\"annotations\": {\"a\": \"true\"}}}'"
+        )
+        self.assertEqual(json.loads(cmd.patch)["metadata"]["annotations"]["a"], "true")
+
+    def test_unsupported(self):
+        for command in [
+            "kubectl create configmap x --dry-run=client -o yaml | kubectl apply -f -",
+            "kubectl exec -it pod -- /bin/bash",
+            "kubectl get pods -o wide",
+            "kubectl logs pod -n ns --tail 10",
+            "helm list",
+        ]:
+            with self.assertRaises(UnsupportedCommand, msg=command):
+                parse_command(command)
+
+    def test_clean_manifest(self):
+        obj = {"kind": "Deployment", "status": {}, "metadata": {"name": "a", "uid": "1", "resourceVersion": "2"}}
+        self.assertEqual(clean_manifest(obj), {"kind": "Deployment", "metadata": {"name": "a"}})
+
+
+class TestNativeKubectl(unittest.TestCase):
+    def setUp(self):
+        self.native = NativeKubectl(api_client=MagicMock())
+        self.native._default_namespace = "default"
+        self.resources = {"Pod": make_resource("Pod"), "Deployment": make_resource("Deployment", "apps")}
+        self.native._resource = lambda api_version, kind: self.resources[kind]
+
+    def test_get_not_found(self):
+        self.resources["Pod"].get.side_effect = not_found("web")
+        self.assertEqual(
+            self.native.execute("kubectl get pod web -n ns -o json"),
+            'Error from server (NotFound): pods "web" not found\n',
+        )
+        self.assertEqual(
+            self.native.execute("kubectl get pod web -n ns -o name --ignore-not-found"), ""
+        )
+
+    def test_delete_pod(self):
+        pod = self.resources["Pod"]
+        pod.get.side_effect = not_found("web")
+        out = self.native.execute("kubectl delete pod web -n ns")
+        self.assertEqual(out, 'pod "web" deleted\n')
+        pod.delete.assert_called_once_with(name="web", namespace="ns")
+
+    def test_rollout_restart(self):
+        out = self.native.execute("kubectl rollout restart deployment geo -n ns")
+        self.assertEqual(out, "deployment.apps/geo restarted\n")
+        body = self.resources["Deployment"].patch.call_args.kwargs["body"]
+        self.assertIn(
+            "kubectl.kubernetes.io/restartedAt",
+            body["spec"]["template"]["metadata"]["annotations"],
+        )
+
+    def test_table_output_falls_back(self):
+        with self.assertRaises(UnsupportedCommand):
+            self.native.execute("kubectl get pods -n ns")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from kubernetes.client.rest import ApiException
+
+from aiopslab.service import pod_logs
+from aiopslab.service.pod_logs import IncrementalLogReader, timestamp_key
+
+
+def ts(seconds_ago, fraction=""):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    stamp = (now - timedelta(seconds=seconds_ago)).strftime("%Y-%m-%dT%H:%M:%S")
+    return f"{stamp}{fraction}Z"
+
+
+class FakeKubeCtl:
+    def __init__(self):
+        self.logs = {}
+        self.calls = []
+        pods = [
+            SimpleNamespace(
+                metadata=SimpleNamespace(name=name),
+                spec=SimpleNamespace(containers=[SimpleNamespace(name="geo")]),
+            )
+            for name in ("geo-1", "geo-2")
+        ]
+        self.core_v1_api = SimpleNamespace(
+            list_namespaced_pod=lambda ns, label_selector: SimpleNamespace(items=pods)
+        )
+
+    def get_pod_logs(
+        self,
+        pod_name,
+        namespace,
+        container=None,
+        tail_lines=None,
+        since_seconds=None,
+        timestamps=False,
+    ):
+        self.calls.append((pod_name, since_seconds))
+        log = self.logs[pod_name]
+        if isinstance(log, Exception):
+            raise log
+        return "\n".join(log[-tail_lines:] if tail_lines else log) + "\n"
+
+
+class TestIncrementalLogReader(unittest.TestCase):
+    def test_timestamp_key_orders_trimmed_fractions(self):
+        self.assertLess(
+            timestamp_key("2024-11-05T10:00:00.5Z"),
+            timestamp_key("2024-11-05T10:00:00.50001Z"),
+        )
+        self.assertLess(
+            timestamp_key("2024-11-05T10:00:00Z"),
+            timestamp_key("2024-11-05T10:00:00.1Z"),
+        )
+
+    def test_second_read_fetches_only_new_lines(self):
+        kubectl = FakeKubeCtl()
+        old, last = ts(60), ts(10, ".25")
+        kubectl.logs["geo-1"] = [f"{old} starting", f"{last} ready", f"{last} serving"]
+        reader = IncrementalLogReader(kubectl)
+
+        self.assertEqual(reader.read("geo-1", "ns"), "starting\nready\nserving")
+        self.assertIsNone(kubectl.calls[-1][1])
+
+        # The API returns overlapping lines again; only the new one is kept
+        kubectl.logs["geo-1"] = [f"{last} serving", f"{ts(1)} request 1"]
+        self.assertEqual(reader.read("geo-1", "ns", new_only=True), "request 1")
+        self.assertLess(kubectl.calls[-1][1], 30)
+        self.assertEqual(
+            reader.read("geo-1", "ns"), "starting\nready\nserving\nrequest 1"
+        )
+
+        reader.reset()
+        reader.read("geo-1", "ns")
+        self.assertIsNone(kubectl.calls[-1][1])
+
+    def test_reads_all_replicas(self):
+        kubectl = FakeKubeCtl()
+        kubectl.logs = {"geo-1": [f"{ts(5)} one"], "geo-2": [f"{ts(5)} two"]}
+        reader = IncrementalLogReader(kubectl)
+
+        logs = reader.read_pods("ns", "app=geo")
+
+        self.assertEqual(logs, "==> geo-1 <==\none\n\n==> geo-2 <==\ntwo")
+
+    def test_unreadable_replica_reports_its_error(self):
+        kubectl = FakeKubeCtl()
+        error = ApiException(status=400, reason="Bad Request")
+        error.body = (
+            '{"message": "container \\"geo\\" in pod \\"geo-2\\" is waiting '
+            'to start: ContainerCreating"}'
+        )
+        kubectl.logs = {"geo-1": [f"{ts(5)} one"], "geo-2": error}
+        reader = IncrementalLogReader(kubectl)
+
+        logs = reader.read_pods("ns", "app=geo")
+
+        self.assertEqual(
+            logs,
+            "==> geo-1 <==\none\n\n==> geo-2 <==\nError: cannot read log: "
+            'container "geo" in pod "geo-2" is waiting to start: ContainerCreating',
+        )
+
+    def test_kept_lines_are_bounded(self):
+        kubectl = FakeKubeCtl()
+        kubectl.logs["geo-1"] = [f"{ts(30)} line {i}" for i in range(3)]
+        reader = IncrementalLogReader(kubectl)
+
+        with patch.object(pod_logs, "MAX_LOG_LINES", 5):
+            self.assertEqual(reader.read("geo-1", "ns"), "line 0\nline 1\nline 2")
+            kubectl.logs["geo-1"] = [f"{ts(1)} line {i}" for i in range(3, 7)]
+            logs = reader.read("geo-1", "ns").splitlines()
+            self.assertEqual(reader.read("geo-1", "ns", new_only=True), "")
+
+        self.assertEqual(
+            logs, ["... 2 earlier lines omitted"] + [f"line {i}" for i in range(2, 7)]
+        )
+
+    def test_log_cut_by_the_first_read_is_marked(self):
+        kubectl = FakeKubeCtl()
+        kubectl.logs["geo-1"] = [f"{ts(30)} line {i}" for i in range(20)]
+        reader = IncrementalLogReader(kubectl)
+
+        with patch.object(pod_logs, "MAX_LOG_LINES", 5):
+            logs = reader.read("geo-1", "ns").splitlines()
+
+        self.assertTrue(logs[0].startswith("... earlier lines omitted"))
+        self.assertEqual(logs[1:], [f"line {i}" for i in range(15, 20)])
+
+    def test_reset_keeps_other_namespaces(self):
+        kubectl = FakeKubeCtl()
+        kubectl.logs["geo-1"] = [f"{ts(30)} one"]
+        reader = IncrementalLogReader(kubectl)
+        reader.read("geo-1", "ns-w1")
+        reader.read("geo-1", "ns-w2")
+
+        reader.reset("ns-w1")
+        reader.read("geo-1", "ns-w1")
+        reader.read("geo-1", "ns-w2")
+
+        # Only the reset namespace is fetched in full (no since_seconds) again
+        self.assertIsNone(kubectl.calls[2][1])
+        self.assertIsNotNone(kubectl.calls[3][1])
+
+if __name__ == "__main__":
+    unittest.main()
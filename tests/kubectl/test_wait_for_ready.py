@@ -0,0 +1,146 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from urllib3.exceptions import ProtocolError
+
+from aiopslab.service.kubectl import MAX_WATCH_FAILURES, KubeCtl, ReadinessTracker
+
+
+def make_pod(name, ready):
+    status = SimpleNamespace(container_statuses=[SimpleNamespace(ready=ready)])
+    return SimpleNamespace(metadata=SimpleNamespace(name=name), status=status)
+
+
+def make_list(pods, resource_version="100"):
+    return SimpleNamespace(
+        items=pods, metadata=SimpleNamespace(resource_version=resource_version)
+    )
+
+
+class TestReadinessTracker(unittest.TestCase):
+    def test_tracks_events(self):
+        tracker = ReadinessTracker()
+        tracker.reset([make_pod("a", True), make_pod("b", False)])
+        self.assertFalse(tracker.all_ready())
+        self.assertEqual(tracker.pending(), ["b"])
+
+        tracker.update("MODIFIED", make_pod("b", True))
+        self.assertTrue(tracker.all_ready())
+        self.assertIsNotNone(tracker.timeline["b"]["ready"])
+
+    def test_deleted_pods_are_dropped(self):
+        tracker = ReadinessTracker()
+        tracker.reset([make_pod("a", True), make_pod("old", False)])
+        tracker.update("DELETED", make_pod("old", False))
+        self.assertTrue(tracker.all_ready())
+
+    def test_empty_namespace_is_not_ready(self):
+        self.assertFalse(ReadinessTracker().all_ready())
+
+
+class TestWaitForReady(unittest.TestCase):
+    def setUp(self):
+        self.kubectl = KubeCtl.__new__(KubeCtl)
+        self.kubectl.core_v1_api = MagicMock()
+
+    @patch("aiopslab.service.kubectl.watch.Watch")
+    def test_returns_when_last_pod_turns_ready(self, mock_watch):
+        self.kubectl.core_v1_api.list_namespaced_pod.return_value = make_list(
+            [make_pod("a", True), make_pod("b", False)]
+        )
+        mock_watch.return_value.stream.return_value = iter(
+            [
+                {"type": "MODIFIED", "object": make_pod("a", True)},
+                {"type": "MODIFIED", "object": make_pod("b", True)},
+                {"type": "MODIFIED", "object": make_pod("never-reached", False)},
+            ]
+        )
+
+        timeline = self.kubectl.wait_for_ready("ns", max_wait=5)
+
+        self.assertEqual(set(timeline), {"a", "b"})
+        self.kubectl.core_v1_api.list_namespaced_pod.assert_called_once()
+        kwargs = mock_watch.return_value.stream.call_args.kwargs
+        self.assertEqual(kwargs["resource_version"], "100")
+
+    @patch("aiopslab.service.kubectl.watch.Watch")
+    def test_dropped_watch_is_resumed_by_relisting(self, mock_watch):
+        self.kubectl.core_v1_api.list_namespaced_pod.return_value = make_list(
+            [make_pod("a", False)]
+        )
+        streams = iter(
+            [
+                ProtocolError("Connection broken: connection reset by peer"),
+                iter([{"type": "MODIFIED", "object": make_pod("a", True)}]),
+            ]
+        )
+
+        def stream(*args, **kwargs):
+            result = next(streams)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        mock_watch.return_value.stream.side_effect = stream
+
+        timeline = self.kubectl.wait_for_ready("ns", sleep=0.01, max_wait=5)
+
+        self.assertIsNotNone(timeline["a"]["ready"])
+        self.assertEqual(self.kubectl.core_v1_api.list_namespaced_pod.call_count, 2)
+
+    @patch("aiopslab.service.kubectl.watch.Watch")
+    def test_persistently_failing_watch_falls_back_to_polling(self, mock_watch):
+        lists = [make_list([make_pod("a", False)])] * (MAX_WATCH_FAILURES + 2)
+        self.kubectl.core_v1_api.list_namespaced_pod.side_effect = lists + [
+            make_list([make_pod("a", True)])
+        ]
+        mock_watch.return_value.stream.side_effect = ProtocolError("proxy closed")
+
+        started = time.time()
+        timeline = self.kubectl.wait_for_ready("ns", sleep=0.05, max_wait=5)
+
+        self.assertIsNotNone(timeline["a"]["ready"])
+        self.assertEqual(mock_watch.return_value.stream.call_count, MAX_WATCH_FAILURES)
+        # Relists backed off: 0.05 + 0.1 + 0.2 seconds
+        self.assertGreater(time.time() - started, 0.3)
+
+    @patch("aiopslab.service.kubectl.watch.Watch")
+    def test_namespace_deletion_survives_dropped_watch(self, mock_watch):
+        self.kubectl.core_v1_api.list_namespace.side_effect = [
+            make_list([SimpleNamespace()]),
+            make_list([]),
+        ]
+        mock_watch.return_value.stream.side_effect = ProtocolError("reset")
+
+        self.kubectl.wait_for_namespace_deletion("ns", sleep=0.01, max_wait=5)
+
+        self.assertEqual(self.kubectl.core_v1_api.list_namespace.call_count, 2)
+
+    def test_connection_errors_fall_back_to_polling(self):
+        self.kubectl.core_v1_api.list_namespaced_pod.side_effect = [
+            ProtocolError("Connection aborted"),
+            make_list([make_pod("a", True)]),
+        ]
+
+        timeline = self.kubectl.wait_for_ready("ns", sleep=0.01, max_wait=5)
+
+        self.assertEqual(set(timeline), {"a"})
+
+    @patch("aiopslab.service.kubectl.watch.Watch")
+    def test_timeout_reports_pending_pods(self, mock_watch):
+        self.kubectl.core_v1_api.list_namespaced_pod.return_value = make_list(
+            [make_pod("stuck", False)]
+        )
+        mock_watch.return_value.stream.side_effect = lambda *a, **kw: iter([])
+
+        with self.assertRaisesRegex(Exception, "stuck"):
+            self.kubectl.wait_for_ready("ns", max_wait=0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from aiopslab.observer import backend
+from aiopslab.observer.utils.frame_io import write_frame
+from aiopslab.orchestrator.actions.base import TaskActions
+
+NAMESPACE = "test-hotel-reservation"
+
+
+def make_bundle(root: Path, end: datetime) -> Path:
+    """A snapshot bundle with 10 minutes of metrics, logs and spans before `end`."""
+    bundle = root / "snapshot_test"
+    end_s = int(end.timestamp())
+    timestamps = list(range(end_s - 600, end_s + 1, 15))
+
+    metrics = []
+    for ts in timestamps:
+        jump = 5.0 if ts > end_s - 150 else 0.0
+        metrics.append(("node1.frontend-1", "cpu_usage", 1.0 + jump, ts))
+        metrics.append(("node1.geo-1", "cpu_usage", 1.0, ts))
+        metrics.append(("node1.geo-1", "memory_spec_limit", 100.0, ts))
+    os.makedirs(bundle / "metric" / "container")
+    write_frame(
+        pd.DataFrame(metrics, columns=["cmdb_id", "kpi_name", "value", "timestamp"]),
+        str(bundle / "metric" / "container" / "kpi_cpu_usage"),
+        "csv",
+    )
+
+    logs = pd.DataFrame(
+        {
+            "log_id": ["1", "2", "3", "4", "5"],
+            "timestamp": [end_s - 30, end_s - 20, end_s - 10, end_s - 5, end_s - 5],
+            "date": ["t1", "t2", "t3", "t4", "t4"],
+            "pod_name": ["geo-1", "geo-2", "geo-1", "geo_x-1", "geo-proxy-7d9cb-x2bqz"],
+            "namespace": [NAMESPACE] * 5,
+            "message": ["first", "other replica", "second", "not geo", "proxy"],
+        }
+    )
+    os.makedirs(bundle / "log")
+    write_frame(logs, str(bundle / "log" / "log_1"), "csv")
+
+    spans = pd.DataFrame(
+        {
+            "trace_id": ["t1", "t2"],
+            "span_id": ["s1", "s2"],
+            "parent_span": [None, None],
+            "service_name": ["frontend", "geo"],
+            "operation_name": ["GET", "Nearby"],
+            # One span an hour before the recording ends
+            "start_time": [(end_s - 60) * 10**6, (end_s - 3600) * 10**6],
+            "duration": [1500, 900],
+            "has_error": [True, False],
+            "response": ["500", "200"],
+        }
+    )
+    os.makedirs(bundle / "trace")
+    write_frame(spans, str(bundle / "trace" / "traces_1"), "csv")
+
+    with open(bundle / "manifest.json", "w") as f:
+        json.dump(
+            {
+                "namespace": NAMESPACE,
+                "start_time": (end - timedelta(minutes=10)).isoformat(),
+                "end_time": end.isoformat(),
+            },
+            f,
+        )
+    return bundle
+
+
+class TestRecordedBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        # Recorded well in the past: replay must not depend on the wall clock
+        self.end = datetime(2024, 11, 5, 10, 0, 0)
+        self.bundle = make_bundle(root, self.end)
+        db_path = backend.record_snapshot(self.bundle, root / "t.db")
+        self.backend = backend.RecordedBackend(db_path)
+
+    def test_now_is_the_end_of_the_recording(self):
+        self.assertEqual(self.backend.now(), self.end)
+
+    def test_logs_of_all_replicas_in_reader_format(self):
+        logs = self.backend.get_logs(NAMESPACE, "geo")
+        self.assertEqual(
+            logs, "==> geo-1 <==\nfirst\nsecond\n\n==> geo-2 <==\nother replica"
+        )
+        self.assertEqual(
+            self.backend.get_logs(NAMESPACE, "geo_x", timestamps=True), "t4 not geo"
+        )
+        with self.assertRaises(ValueError):
+            self.backend.get_logs(NAMESPACE, "search")
+
+    def test_summary_ranks_the_shifted_pod_first(self):
+        start = self.end - timedelta(minutes=10)
+        summary = self.backend.summarize_metrics(NAMESPACE, start, self.end)
+        self.assertEqual(list(summary["pod"]), ["frontend-1", "geo-1"])
+        self.assertNotIn("memory_spec_limit", set(summary["metric"]))
+        self.assertEqual(summary.loc[0, "max"], 6.0)
+
+    def test_spans_in_window_only(self):
+        start = self.end - timedelta(minutes=5)
+        spans = self.backend.get_spans(NAMESPACE, start, self.end)
+        self.assertEqual(list(spans["span_id"]), ["s1"])
+        self.assertTrue(spans.loc[0, "has_error"])
+
+    def test_recording_a_bundle_again_adds_no_rows(self):
+        backend.record_snapshot(self.bundle, self.backend.db_path)
+
+        start = self.end - timedelta(minutes=10)
+        spans = self.backend.get_spans(NAMESPACE, start, self.end)
+        self.assertEqual(len(spans), 1)
+        logs = self.backend.get_logs(NAMESPACE, "geo")
+        self.assertEqual(logs.count("first"), 1)
+        summary = self.backend.summarize_metrics(NAMESPACE, start, self.end)
+        self.assertEqual(summary.loc[0, "max"], 6.0)
+        exported = self.backend._metrics(NAMESPACE, start, self.end, "value")
+        self.assertEqual(len(exported), 3 * 41)
+
+    def test_actions_read_from_the_selected_backend(self):
+        backend.set_backend(self.backend)
+        self.addCleanup(backend.set_backend, None)
+
+        summary = TaskActions.get_traces(NAMESPACE, duration=5)
+        self.assertIn("frontend", summary)
+        self.assertIn("1 traces, 1 spans", summary)
+        self.assertIn("frontend-1", TaskActions.get_metrics(NAMESPACE, duration=10))
+
+
+if __name__ == "__main__":
+    unittest.main()
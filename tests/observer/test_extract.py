@@ -0,0 +1,111 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import tempfile
+import unittest
+import zipfile
+
+import pandas as pd
+
+from aiopslab.observer.utils.extract import (
+    merge_csv,
+    merge_frames,
+    zip_dir_parallel,
+)
+from aiopslab.observer.utils.frame_io import _pyarrow, read_frame, write_frame
+
+
+def window(start, rows, step=2):
+    return pd.DataFrame(
+        {
+            "timestamp": range(start, start + rows * step, step),
+            "pod_name": [f"geo-{i % 3}" for i in range(rows)],
+            "message": [f"request {start + i}" for i in range(rows)],
+        }
+    )
+
+
+class TestExtract(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = self.tmp.name
+
+    def write_windows(self, frames, fmt="csv"):
+        return [
+            write_frame(df, os.path.join(self.path, f"window_{i}"), fmt)
+            for i, df in enumerate(frames)
+        ]
+
+    def test_merge_csv_matches_concat(self):
+        frames = [window(0, 5), window(100, 3), window(200, 4)]
+        files = self.write_windows(frames)
+        expected = pd.concat(frames).reset_index(drop=True)
+
+        merge_csv(self.path, files, "log")
+
+        merged = pd.read_csv(os.path.join(self.path, "log.csv"), index_col=0)
+        pd.testing.assert_frame_equal(merged, expected)
+        self.assertEqual(os.listdir(self.path), ["log.csv"])
+
+    def test_sorted_merge(self):
+        files = self.write_windows([window(0, 50), window(1, 50), window(50, 10)])
+
+        merge_csv(self.path, files, "log", sort_by="timestamp")
+
+        merged = pd.read_csv(os.path.join(self.path, "log.csv"), index_col=0)
+        self.assertEqual(len(merged), 110)
+        self.assertTrue(merged["timestamp"].is_monotonic_increasing)
+        self.assertEqual(list(merged.index), list(range(110)))
+
+    def test_merge_parquet_row_groups(self):
+        if _pyarrow() is None:
+            self.skipTest("pyarrow is not installed")
+        files = self.write_windows([window(0, 5), window(100, 3)], fmt="parquet")
+
+        path = merge_frames(self.path, files, "log", fmt="parquet")
+
+        merged = read_frame(path)
+        self.assertEqual(len(merged), 8)
+        self.assertEqual(merged["message"].iloc[-1], "request 102")
+
+    def test_merge_columnar_with_column_missing_from_first_file(self):
+        if _pyarrow() is None:
+            self.skipTest("pyarrow is not installed")
+        first = pd.DataFrame({"timestamp": [1, 2], "v": [0.5, 1.5]})
+        second = pd.DataFrame({"timestamp": [3], "v": [2], "extra": ["x"]})
+        for fmt in ("parquet", "arrow"):
+            files = self.write_windows([first, second], fmt=fmt)
+
+            path = merge_frames(self.path, files, f"log_{fmt}", fmt=fmt)
+
+            merged = read_frame(path)
+            self.assertEqual(list(merged.columns), ["timestamp", "v", "extra"])
+            self.assertEqual(list(merged["v"]), [0.5, 1.5, 2.0])
+            self.assertEqual(list(merged["extra"].fillna("")), ["", "", "x"])
+
+    def test_zip_dir_parallel(self):
+        source = os.path.join(self.path, "telemetry")
+        os.makedirs(os.path.join(source, "metric"))
+        contents = {
+            "metric/kpi_cpu.csv": b"timestamp,value\n" + b"1,0.5\n" * 10000,
+            "log.csv": b"log line\n" * 5000,
+            "empty.txt": b"",
+        }
+        for name, data in contents.items():
+            with open(os.path.join(source, name), "wb") as f:
+                f.write(data)
+
+        zip_path = zip_dir_parallel(source, max_workers=2)
+
+        with zipfile.ZipFile(zip_path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual({n: zf.read(n) for n in zf.namelist()}, contents)
+            info = zf.getinfo("log.csv")
+            self.assertEqual(info.compress_type, zipfile.ZIP_DEFLATED)
+            self.assertLess(info.compress_size, info.file_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from aiopslab.observer.utils import frame_io
+from aiopslab.observer.utils.frame_io import FrameWriter, read_frame, _pyarrow
+
+
+def trace_frame(services, start=1700000000000000):
+    return pd.DataFrame(
+        {
+            "trace_id": [f"t{i}" for i in range(len(services))],
+            "service_name": services,
+            "start_time": [start + i for i in range(len(services))],
+            "duration": [10] * len(services),
+            "has_error": [i % 2 == 0 for i in range(len(services))],
+            "response": [200 if i % 2 else "Unknown" for i in range(len(services))],
+        }
+    )
+
+
+class TestFrameIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_chunks(self, fmt):
+        with FrameWriter(os.path.join(self.tmp.name, "traces"), fmt) as writer:
+            writer.write(trace_frame(["frontend", "geo"]))
+            writer.write(trace_frame(["rate", "search", "user"]))
+        return writer.path
+
+    def test_csv_append_and_projection(self):
+        path = self.write_chunks("csv")
+
+        self.assertTrue(path.endswith(".csv"))
+        df = read_frame(path, columns=["service_name", "duration"])
+        self.assertEqual(list(df.columns), ["service_name", "duration"])
+        self.assertEqual(len(df), 5)
+
+    @unittest.skipIf(_pyarrow() is None, "pyarrow is not installed")
+    def test_columnar_formats_keep_dtypes(self):
+        for fmt in ("parquet", "arrow"):
+            with self.subTest(fmt=fmt):
+                df = read_frame(self.write_chunks(fmt))
+
+                self.assertEqual(len(df), 5)
+                self.assertEqual(df["service_name"].dtype, "category")
+                self.assertEqual(df["has_error"].dtype, bool)
+                self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["start_time"]))
+                self.assertEqual(list(df["service_name"])[-1], "user")
+
+                projected = read_frame(self.write_chunks(fmt), columns=["duration"])
+                self.assertEqual(list(projected.columns), ["duration"])
+
+    def test_columnar_reads_without_pyarrow_fail_clearly(self):
+        path = self.write_chunks("csv")
+        with patch.object(frame_io, "_pyarrow", return_value=None):
+            with self.assertRaisesRegex(ImportError, "requires pyarrow"):
+                frame_io.frame_schema(path)
+            with self.assertRaisesRegex(ImportError, "requires pyarrow"):
+                frame_io.frame_columns(path.replace(".csv", ".parquet"))
+            self.assertEqual(len(frame_io.frame_columns(path)), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from datetime import datetime, timezone
+
+from aiopslab.observer.utils.index_planner import IndexPlanner, hour_range
+
+# 2024-11-05T10:00:00Z
+TEN = datetime(2024, 11, 5, 10, tzinfo=timezone.utc).timestamp()
+
+
+class FakeIndices:
+    def __init__(self, counts):
+        self.counts = counts
+        self.calls = 0
+
+    def stats(self, index, metric):
+        self.calls += 1
+        return {
+            "indices": {
+                name: {"primaries": {"docs": {"count": count}}}
+                for name, count in self.counts.items()
+            }
+        }
+
+
+class FakeElasticsearch:
+    def __init__(self, counts):
+        self.indices = FakeIndices(counts)
+        self.aggregations = []
+
+    def search(self, index, size, aggs):
+        self.aggregations.append(index)
+        bucket = {
+            "key": "logstash-archive",
+            "doc_count": 5,
+            "first": {"value": (TEN - 7200) * 1000},
+            "last": {"value": (TEN - 3600) * 1000},
+        }
+        return {"aggregations": {"per_index": {"buckets": [bucket]}}}
+
+
+class TestIndexPlanner(unittest.TestCase):
+    def setUp(self):
+        self.elastic = FakeElasticsearch(
+            {
+                "logstash-2024.11.05.09": 10,
+                "logstash-2024.11.05.10": 10,
+                "logstash-2024.11.05.11": 0,
+                "logstash-2024.11.05.12": 10,
+                "logstash-archive": 5,
+            }
+        )
+        self.planner = IndexPlanner(self.elastic)
+
+    def test_hour_range(self):
+        self.assertEqual(hour_range("logstash-2024.11.05.10"), (TEN, TEN + 3600))
+        self.assertIsNone(hour_range("logstash-archive"))
+
+    def test_selects_only_overlapping_hours(self):
+        self.assertEqual(
+            self.planner.plan(TEN + 60, TEN + 360), ["logstash-2024.11.05.10"]
+        )
+        self.assertEqual(
+            self.planner.plan(TEN - 60, TEN + 2 * 3600 - 60),
+            ["logstash-2024.11.05.09", "logstash-2024.11.05.10"],
+        )
+        self.assertEqual(
+            self.planner.plan(TEN + 2 * 3600 + 60, TEN + 2 * 3600 + 120),
+            ["logstash-2024.11.05.12"],
+        )
+        # Stats are listed once and reused
+        self.assertEqual(self.elastic.indices.calls, 1)
+
+    def test_unnamed_indices_use_timestamp_range(self):
+        self.assertIn("logstash-archive", self.planner.plan(TEN - 5000, TEN - 4000))
+        self.assertNotIn("logstash-archive", self.planner.plan(TEN + 60, TEN + 120))
+        self.assertEqual(self.elastic.aggregations, ["logstash-archive"])
+
+
+if __name__ == "__main__":
+    unittest.main()
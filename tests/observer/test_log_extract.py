@@ -0,0 +1,139 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone
+
+from elasticsearch.exceptions import ConnectionTimeout
+
+from aiopslab.observer.log_api import LogAPI, LOG_SOURCE_FIELDS, PAGE_ATTEMPTS
+from aiopslab.observer.utils.frame_io import read_frame
+from aiopslab.observer.utils.index_planner import IndexPlanner
+
+START = 1700000000
+
+
+def make_hit(i):
+    ts = datetime.fromtimestamp(START + i, tz=timezone.utc)
+    return {
+        "_id": f"log-{i}",
+        "_source": {
+            "@timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "message": f"request {i}",
+            "kubernetes": {
+                "pod": {"name": f"geo-{i % 3}"},
+                "container": {"name": "hotel-reserv-geo"},
+                "namespace": "test-hotel-reservation",
+                "node": {"name": "node-1"},
+            },
+        },
+    }
+
+
+class FakeIndices:
+    def stats(self, index, metric):
+        hour = datetime.fromtimestamp(START, tz=timezone.utc).strftime("%Y.%m.%d.%H")
+        return {"indices": {f"logstash-{hour}": {"primaries": {"docs": {"count": 1}}}}}
+
+
+class FakeElasticsearch:
+    """Serves point-in-time searches with slices and search_after from memory."""
+
+    def __init__(self, num_hits, timeouts=0):
+        self.docs = [make_hit(i) for i in range(num_hits)]
+        # Searches of slice 1 that time out
+        self.timeouts = timeouts
+        self.indices = FakeIndices()
+        self.searches = []
+        self.closed = []
+        self._lock = threading.Lock()
+
+    def open_point_in_time(self, index, keep_alive):
+        return {"id": "pit-1"}
+
+    def close_point_in_time(self, id):
+        self.closed.append(id)
+
+    def search(self, pit, query, sort, size, source, search_after, slice, track_total_hits):
+        with self._lock:
+            self.searches.append({"source": source, "slice": slice, "query": query})
+            if self.timeouts and slice["id"] == 1:
+                self.timeouts -= 1
+                raise ConnectionTimeout("timed out")
+        docs = [
+            dict(doc, sort=[i])
+            for i, doc in enumerate(self.docs)
+            if slice is None or i % slice["max"] == slice["id"]
+        ]
+        if search_after is not None:
+            docs = [doc for doc in docs if doc["sort"] > search_after]
+        return {"pit_id": pit["id"], "hits": {"hits": docs[:size]}}
+
+
+class TestLogExtract(unittest.TestCase):
+    def make_api(self, num_hits, timeouts=0):
+        api = LogAPI.__new__(LogAPI)
+        api.elastic = FakeElasticsearch(num_hits, timeouts)
+        api.index_planner = IndexPlanner(api.elastic)
+        return api
+
+    def test_pages_through_all_slices(self):
+        api = self.make_api(1003)
+
+        pages = list(api.search_hits(START, START + 3600, page_size=100, slices=4))
+
+        ids = sorted(hit["_id"] for page in pages for hit in page)
+        self.assertEqual(len(ids), 1003)
+        self.assertEqual(len(set(ids)), 1003)
+        self.assertTrue(all(len(page) <= 100 for page in pages))
+        self.assertEqual(
+            {s["slice"]["id"] for s in api.elastic.searches}, {0, 1, 2, 3}
+        )
+        self.assertTrue(all(s["source"] == LOG_SOURCE_FIELDS for s in api.elastic.searches))
+        self.assertEqual(api.elastic.closed, ["pit-1"])
+
+    def test_timed_out_page_is_retried_from_the_same_position(self):
+        api = self.make_api(1003, timeouts=PAGE_ATTEMPTS - 1)
+
+        pages = list(api.search_hits(START, START + 3600, page_size=100, slices=4))
+
+        ids = {hit["_id"] for page in pages for hit in page}
+        self.assertEqual(len(ids), 1003)
+
+    def test_slice_timing_out_fails_the_export(self):
+        api = self.make_api(1003, timeouts=PAGE_ATTEMPTS)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ConnectionTimeout):
+                api.log_extract(START, START + 3600, tmp, fmt="csv")
+        self.assertEqual(api.elastic.closed, ["pit-1"])
+
+    def test_namespace_filter(self):
+        api = self.make_api(10)
+
+        list(api.search_hits(START, START + 3600, namespace="test-hotel-reservation"))
+
+        filters = api.elastic.searches[0]["query"]["bool"]["filter"]
+        self.assertIn(
+            {"match_phrase": {"kubernetes.namespace": "test-hotel-reservation"}},
+            filters,
+        )
+
+    def test_log_extract_writes_all_logs(self):
+        api = self.make_api(250)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            api.log_extract(START, START + 3600, tmp, fmt="csv")
+            files = os.listdir(tmp)
+            self.assertEqual(len(files), 1)
+            df = read_frame(os.path.join(tmp, files[0]))
+
+        self.assertEqual(len(df), 250)
+        self.assertEqual(set(df["pod_name"]), {"geo-0", "geo-1", "geo-2"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import time
+import unittest
+
+from aiopslab.observer.utils.log_histogram import LogHistogram, interval_seconds
+
+HOUR = 3600
+
+
+class FakePlanner:
+    def plan(self, start_time, end_time):
+        return ["logstash-all"]
+
+
+class FakeElasticsearch:
+    """Aggregates a fixed list of log timestamps into a date histogram."""
+
+    def __init__(self, timestamps):
+        self.timestamps = timestamps
+        self.ranges = []
+
+    def search(self, index, size, query, aggs):
+        bounds = query["range"]["@timestamp"]
+        start, end = bounds["gte"] / 1000, bounds["lte"] / 1000
+        self.ranges.append((start, end))
+        step = interval_seconds(aggs["logs"]["date_histogram"]["fixed_interval"])
+        buckets = []
+        for key in range(int(start) // step * step, int(end) + 1, step):
+            count = sum(
+                start <= t <= end and key <= t < key + step for t in self.timestamps
+            )
+            buckets.append({"key": key * 1000, "doc_count": count})
+        return {"aggregations": {"logs": {"buckets": buckets}}}
+
+
+class TestLogHistogram(unittest.TestCase):
+    def test_interval_seconds(self):
+        self.assertEqual(interval_seconds("30m"), 1800)
+        self.assertEqual(interval_seconds("1d"), 86400)
+        with self.assertRaises(ValueError):
+            interval_seconds("1w")
+
+    def test_only_open_buckets_are_queried_again(self):
+        now = time.time()
+        current = int(now) // HOUR * HOUR
+        logs = [current - 2 * HOUR + 5, current - HOUR + 5, now - 0.5]
+        elastic = FakeElasticsearch(logs)
+        histogram = LogHistogram(elastic, FakePlanner())
+
+        first = histogram.counts(now - 3 * HOUR, now, "1h")
+        second = histogram.counts(now - 3 * HOUR, now, "1h")
+
+        self.assertEqual(first, second)
+        self.assertEqual(list(first.values()), [0, 1, 1, 1])
+        self.assertEqual(elastic.ranges[1][0], current)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+
+from aiopslab.observer.utils.log_normalize import (
+    HOTEL_RESERVATION_FIELDS,
+    normalize_hits,
+)
+
+
+def hit(log_id, timestamp="2023-11-14T22:13:20.500Z", pod="geo-1"):
+    return {
+        "_id": log_id,
+        "_source": {
+            "@timestamp": timestamp,
+            "message": "hello",
+            "kubernetes": {
+                "pod": {"name": pod},
+                "container": {"name": "hotel-reserv-geo"},
+                "namespace": "test-hotel-reservation",
+                "node": {"name": "node-1"},
+            },
+        },
+    }
+
+
+class TestNormalizeHits(unittest.TestCase):
+    def test_normalizes_and_counts_malformed(self):
+        no_pod = hit("c")
+        del no_pod["_source"]["kubernetes"]["pod"]
+        hits = [hit("a"), hit("b", timestamp="yesterday"), no_pod, {"_id": "d"}]
+
+        df, malformed = normalize_hits(hits, HOTEL_RESERVATION_FIELDS)
+
+        self.assertEqual(malformed, 3)
+        self.assertEqual(list(df["log_id"]), ["a"])
+        self.assertEqual(
+            list(df.columns),
+            [
+                "log_id",
+                "timestamp",
+                "date",
+                "pod_name",
+                "container_name",
+                "namespace",
+                "node_name",
+                "message",
+            ],
+        )
+        self.assertAlmostEqual(df.iloc[0]["timestamp"], 1700000000.5)
+
+    def test_empty(self):
+        df, malformed = normalize_hits([], HOTEL_RESERVATION_FIELDS)
+        self.assertTrue(df.empty)
+        self.assertEqual(malformed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
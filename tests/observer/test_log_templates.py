@@ -0,0 +1,44 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+
+from aiopslab.observer.log_templates import TemplateMiner
+
+
+class TestTemplateMiner(unittest.TestCase):
+    def test_collapses_lines_into_templates(self):
+        log = "\n".join(
+            [
+                "2024-11-05T10:00:01Z user 17 logged in from 10.0.0.1",
+                "2024-11-05T10:00:02Z user 42 logged in from 10.0.0.7",
+                "2024-11-05T10:00:03Z failed to connect to mongodb-geo",
+                "2024-11-05T10:00:04Z user 42 logged in from 10.0.0.7",
+                "",
+            ]
+        )
+        miner = TemplateMiner()
+        miner.add_lines(log, timestamps=True)
+
+        df = miner.to_frame()
+        self.assertEqual(miner.lines, 4)
+        self.assertEqual(len(df), 2)
+
+        top = df.iloc[0]
+        self.assertEqual(top["template"], "user <*> logged in from <*>")
+        self.assertEqual(top["count"], 3)
+        self.assertEqual(top["first_seen"], "2024-11-05T10:00:01Z")
+        self.assertEqual(top["last_seen"], "2024-11-05T10:00:04Z")
+        self.assertEqual(top["examples"], [["42", "10.0.0.7"]])
+
+    def test_dissimilar_lines_stay_apart(self):
+        miner = TemplateMiner()
+        miner.add("GET /hotels 200")
+        miner.add("connection reset by peer")
+
+        self.assertEqual(len(miner.templates), 2)
+        self.assertIn("2 log lines, 2 templates", miner.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
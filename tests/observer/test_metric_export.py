@@ -0,0 +1,39 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from aiopslab.observer.metric_api import series_to_frame
+
+
+class TestSeriesToFrame(unittest.TestCase):
+    def test_converts_and_filters_series(self):
+        data_raw = [
+            {
+                "metric": {"pod": "geo-1", "instance": "node1"},
+                "values": [[1700000015, "2.5"], [1700000000, "1.23456"]],
+            },
+            {
+                "metric": {"pod": "jaeger-1", "instance": "node1"},
+                "values": [[1700000000, "9"]],
+            },
+            {
+                "metric": {"pod": "rate-1", "instance": "node2"},
+                "values": [[1700000000, "NaN"]],
+            },
+        ]
+        dt = series_to_frame("container_threads", data_raw, {"geo-1", "rate-1"})
+
+        self.assertEqual(list(dt.columns), ["timestamp", "cmdb_id", "kpi_name", "value"])
+        self.assertEqual(len(dt), 3)
+        self.assertEqual(list(dt["timestamp"]), [1700000000, 1700000000, 1700000015])
+        self.assertEqual(dt.iloc[0]["cmdb_id"], "node1.geo-1")
+        self.assertAlmostEqual(dt.iloc[0]["value"], 1.235)
+        self.assertEqual(set(dt["kpi_name"]), {"container_threads"})
+
+    def test_no_matching_pods(self):
+        data_raw = [{"metric": {"pod": "x", "instance": "n"}, "values": [[1, "1"]]}]
+        self.assertIsNone(series_to_frame("m", data_raw, {"y"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
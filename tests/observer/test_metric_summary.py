@@ -0,0 +1,73 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from datetime import datetime, timedelta
+
+from aiopslab.observer.metric_api import PrometheusAPI
+from aiopslab.observer.metric_summary import anomaly_score, change_point
+from aiopslab.observer.query_cache import RangeQueryCache
+
+
+class FakePrometheus:
+    """Range queries return a flat series for geo and a step for rate."""
+
+    def __init__(self, jump_at):
+        self.instant_queries = []
+        self.jump_at = jump_at
+
+    def custom_query(self, query, params=None):
+        self.instant_queries.append(query)
+        return [
+            {"metric": {"pod": "geo-1"}, "value": [0, "1"]},
+            {"metric": {"pod": "rate-1"}, "value": [0, "5"]},
+        ]
+
+    def custom_query_range(self, query, start_time, end_time, step):
+        first = -(-int(start_time.timestamp()) // step) * step
+        times = range(first, int(end_time.timestamp()) + 1, step)
+        flat = [[t, "1"] for t in times]
+        jump = [[t, "1" if t < self.jump_at else "9"] for t in times]
+        return [
+            {"metric": {"pod": "geo-1"}, "values": flat},
+            {"metric": {"pod": "rate-1"}, "values": jump},
+            {"metric": {"pod": "jaeger-1"}, "values": jump},
+        ]
+
+
+class TestMetricSummary(unittest.TestCase):
+    def test_change_point(self):
+        index, shift, score = change_point([1] * 10 + [5] * 10)
+        self.assertEqual(index, 10)
+        self.assertAlmostEqual(shift, 4.0)
+        self.assertGreater(score, 3)
+
+        self.assertEqual(change_point([2] * 20), (None, 0.0, 0.0))
+
+    def test_anomaly_score(self):
+        self.assertEqual(anomaly_score([3.0] * 10), 0.0)
+        self.assertGreater(anomaly_score([1, 1.1, 0.9, 1, 1, 10]), 10)
+
+    def test_summarize_metrics_ranks_series(self):
+        api = PrometheusAPI.__new__(PrometheusAPI)
+        api.namespace = "test-hotel-reservation"
+        api.pod_list = {"geo-1", "rate-1"}
+        api.cache = RangeQueryCache()
+        end = datetime.now()
+        jump_at = int(end.timestamp()) // 15 * 15 - 8 * 15
+        api.client = FakePrometheus(jump_at)
+
+        df = api.summarize_metrics(
+            end - timedelta(minutes=5), end, metrics=["container_threads"], top_k=5
+        )
+
+        self.assertEqual(list(df["pod"]), ["rate-1", "geo-1"])
+        self.assertEqual(df.iloc[0]["p95"], 5)
+        self.assertEqual(df.iloc[0]["change_at"].timestamp(), jump_at)
+        self.assertTrue(
+            any(q.startswith("quantile_over_time(0.95,") for q in api.client.instant_queries)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
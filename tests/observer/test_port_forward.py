@@ -0,0 +1,83 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from unittest.mock import patch
+
+from aiopslab.observer.port_forward import PortForward, PortForwardManager
+
+
+class FakeForward:
+    """Stands in for a kubectl subprocess; `healthy` is flipped by the test."""
+
+    started = []
+
+    def __init__(self, target, remote_port, namespace, health_path=None):
+        self.target = target
+        self.namespace = namespace
+        self.local_port = 40000 + len(FakeForward.started)
+        self.healthy = False
+        self.stopped = False
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.local_port}"
+
+    def start(self):
+        FakeForward.started.append(self)
+        self.healthy = True
+        return True
+
+    def is_healthy(self):
+        return self.healthy
+
+    def stop(self):
+        self.stopped = True
+        self.healthy = False
+
+
+class TestPortForwardManager(unittest.TestCase):
+    def setUp(self):
+        FakeForward.started = []
+        patcher = patch("aiopslab.observer.port_forward.PortForward", FakeForward)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = PortForwardManager()
+
+    def test_reuses_healthy_tunnel(self):
+        url = self.manager.get_url("svc/prometheus-server", 80, "observe")
+        again = self.manager.get_url("svc/prometheus-server", 80, "observe")
+
+        self.assertEqual(url, again)
+        self.assertEqual(len(FakeForward.started), 1)
+
+    def test_reconnects_unhealthy_tunnel(self):
+        url = self.manager.get_url("svc/jaeger", 16686, "ns")
+        FakeForward.started[0].healthy = False
+
+        new_url = self.manager.get_url("svc/jaeger", 16686, "ns")
+
+        self.assertNotEqual(url, new_url)
+        self.assertTrue(FakeForward.started[0].stopped)
+
+    def test_close_namespace(self):
+        self.manager.get_url("svc/prometheus-server", 80, "observe")
+        self.manager.get_url("svc/jaeger", 16686, "ns")
+
+        self.manager.close_namespace("ns")
+
+        prometheus, jaeger = FakeForward.started
+        self.assertTrue(jaeger.stopped)
+        self.assertFalse(prometheus.stopped)
+
+
+class TestPortForward(unittest.TestCase):
+    def test_url_uses_bound_port(self):
+        forward = PortForward("svc/jaeger", 16686, "ns")
+        forward.local_port = 41234
+        self.assertEqual(forward.url, "http://localhost:41234")
+        self.assertFalse(forward.is_healthy())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import time
+import unittest
+
+from aiopslab.observer.query_cache import BUCKET_POINTS, RangeQueryCache
+
+STEP = 15
+BUCKET = STEP * BUCKET_POINTS
+
+
+class GridPrometheus:
+    """Range queries return one series with a sample at every step in range."""
+
+    def __init__(self):
+        self.ranges = []
+
+    def custom_query_range(self, query, start_time, end_time, step):
+        start, end = int(start_time.timestamp()), int(end_time.timestamp())
+        self.ranges.append((start, end))
+        first = -(-start // step) * step
+        values = [[t, str(t % 7)] for t in range(first, end + 1, step)]
+        return [{"metric": {"pod": "geo-1"}, "values": values}]
+
+
+class TestRangeQueryCache(unittest.TestCase):
+    def setUp(self):
+        self.client = GridPrometheus()
+        self.cache = RangeQueryCache()
+        # Well in the past, so every bucket is closed
+        self.base = (int(time.time()) - 100 * BUCKET) // BUCKET * BUCKET
+
+    def query(self, start, end):
+        result = self.cache.query_range(self.client, "up", start, end, STEP)
+        return result[0]["values"]
+
+    def test_overlapping_window_fetches_only_new_buckets(self):
+        first = self.query(self.base + 100, self.base + 2 * BUCKET + 100)
+        self.assertEqual(len(self.client.ranges), 1)
+
+        later = self.query(self.base + BUCKET, self.base + 3 * BUCKET + 100)
+
+        self.assertEqual(self.client.ranges[1][0], self.base + 3 * BUCKET)
+        self.assertEqual(len(self.client.ranges), 2)
+        self.assertEqual(later[0], (self.base + BUCKET, str((self.base + BUCKET) % 7)))
+        self.assertEqual(later[-1][0], self.base + 3 * BUCKET + 90)
+        self.assertEqual(
+            [t for t, _ in later], list(range(later[0][0], later[-1][0] + 1, STEP))
+        )
+        self.assertEqual(first[0][0], self.base + 105)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_open_buckets_are_not_cached(self):
+        now = int(time.time())
+        self.query(now - 600, now)
+        self.query(now - 600, now)
+        self.assertEqual(len(self.client.ranges), 2)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.max_bytes = 1
+        self.query(self.base, self.base + BUCKET - STEP)
+        self.assertEqual(self.cache.stats()["buckets"], 0)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
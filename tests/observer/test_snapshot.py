@@ -0,0 +1,80 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import json
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from aiopslab.observer import observe
+
+
+def slow_writer(name, seconds=0.3):
+    def collect(start_time, end_time, save_path, namespace):
+        time.sleep(seconds)
+        (save_path / f"{name}.csv").write_text(f"{name},{namespace}\n")
+
+    return collect
+
+
+def failing(start_time, end_time, save_path, namespace):
+    raise ConnectionError("no route to jaeger")
+
+
+class TestCollectSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.end = datetime.now()
+        self.start = self.end - timedelta(minutes=5)
+
+    def snapshot(self):
+        return observe.collect_snapshot(
+            self.start, self.end, namespace="hotel", save_root=self.tmp.name
+        )
+
+    def test_signals_run_concurrently_into_one_bundle(self):
+        collectors = {s: slow_writer(s) for s in ("metric", "log", "trace")}
+        with patch.dict(observe.SIGNAL_COLLECTORS, collectors):
+            started = time.time()
+            bundle = self.snapshot()
+            elapsed = time.time() - started
+
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual((bundle / "log" / "log.csv").read_text(), "log,hotel\n")
+        manifest = json.loads((bundle / "manifest.json").read_text())
+        self.assertTrue(bundle.name.endswith(manifest["content_hash"][:16]))
+        self.assertEqual(manifest["signals"]["metric"]["files"], 1)
+
+        # Same data, same bundle; no staging directory left behind
+        with patch.dict(observe.SIGNAL_COLLECTORS, collectors):
+            self.assertEqual(self.snapshot(), bundle)
+        self.assertEqual(len(list(bundle.parent.iterdir())), 1)
+
+    def test_failing_signal_is_recorded(self):
+        collectors = {"metric": slow_writer("metric", 0), "trace": failing}
+        with patch.dict(observe.SIGNAL_COLLECTORS, collectors, clear=True):
+            bundle = self.snapshot()
+
+        manifest = json.loads((bundle / "manifest.json").read_text())
+        self.assertIn("no route to jaeger", manifest["signals"]["trace"]["error"])
+        self.assertIsNone(manifest["signals"]["metric"]["error"])
+
+    def test_empty_snapshots_of_other_windows_get_their_own_bundle(self):
+        with patch.dict(observe.SIGNAL_COLLECTORS, {"trace": failing}, clear=True):
+            first = self.snapshot()
+            self.start -= timedelta(minutes=5)
+            second = self.snapshot()
+            # A failed collection is never served from an earlier bundle
+            self.assertEqual(self.snapshot(), second)
+
+        self.assertNotEqual(first, second)
+        manifest = json.loads((second / "manifest.json").read_text())
+        self.assertEqual(manifest["start_time"], self.start.isoformat())
+        self.assertEqual(len(list(second.parent.iterdir())), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from types import SimpleNamespace as NS
+
+from aiopslab.observer.topology import NamespaceTopology
+
+
+def pod(name, labels, owner=None):
+    owners = [NS(kind="ReplicaSet", name=owner)] if owner else None
+    return NS(
+        metadata=NS(name=name, labels=labels, owner_references=owners),
+        spec=NS(node_name="node-1"),
+        status=NS(phase="Running"),
+    )
+
+
+def service(name, selector):
+    return NS(metadata=NS(name=name, labels={}), spec=NS(selector=selector))
+
+
+class FakeCoreV1:
+    def __init__(self, pods, services):
+        self.pods, self.services = pods, services
+        self.lists = 0
+
+    def _list(self, items):
+        self.lists += 1
+        return NS(items=items, metadata=NS(resource_version="1"))
+
+    def list_namespaced_pod(self, namespace, **kwargs):
+        return self._list(self.pods)
+
+    def list_namespaced_service(self, namespace, **kwargs):
+        return self._list(self.services)
+
+
+class TestNamespaceTopology(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeCoreV1(
+            [
+                pod("geo-1", {"app": "geo"}, owner="geo-5d8f"),
+                pod("loadgenerator-1", {"app": "load"}),
+            ],
+            [service("geo", {"app": "geo"})],
+        )
+        self.topology = NamespaceTopology("hotel", self.api)
+        self.topology.start(watch_changes=False)
+
+    def test_inventory(self):
+        self.assertEqual(self.topology.pod_names(), {"geo-1"})
+        self.assertEqual(self.topology.service_names(), ["geo"])
+        self.assertEqual(self.topology.pod("geo-1")["owner"], "ReplicaSet/geo-5d8f")
+        self.assertEqual(self.topology.services_of_pod("geo-1"), ["geo"])
+        self.assertEqual(self.api.lists, 2)
+
+    def test_watch_events_update_inventory(self):
+        self.topology.apply_event("pods", "ADDED", pod("geo-2", {"app": "geo"}))
+        self.topology.apply_event("pods", "DELETED", pod("geo-1", {"app": "geo"}))
+        self.topology.apply_event("services", "MODIFIED", service("geo", {"app": "x"}))
+
+        self.assertEqual(self.topology.pod_names(), {"geo-2"})
+        self.assertEqual(self.topology.services_of_pod("geo-2"), [])
+        self.assertEqual(self.api.lists, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
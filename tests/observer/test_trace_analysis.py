@@ -0,0 +1,80 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+
+from aiopslab.observer.trace_analysis import (
+    add_self_time,
+    dependency_graph,
+    flatten_spans,
+    suspicious_services,
+)
+
+PROCESSES = {
+    "p1": {"serviceName": "frontend"},
+    "p2": {"serviceName": "geo"},
+    "p3": {"serviceName": "mongodb-geo"},
+}
+
+
+def span(span_id, process, duration, parent=None, tags=()):
+    s = {
+        "spanID": span_id,
+        "processID": process,
+        "operationName": "op",
+        "startTime": 1700000000000000,
+        "duration": duration,
+        "tags": list(tags),
+    }
+    if parent:
+        s["references"] = [{"refType": "CHILD_OF", "spanID": parent}]
+    return s
+
+
+def trace(trace_id, geo_error=False):
+    error = [{"key": "error", "value": True}] if geo_error else []
+    return {
+        "traceID": trace_id,
+        "processes": PROCESSES,
+        "spans": [
+            span("a", "p1", 1000, tags=[{"key": "http.status_code", "value": 200}]),
+            span("b", "p2", 800, parent="a", tags=error),
+            span("c", "p3", 100, parent="b"),
+        ],
+    }
+
+
+class TestTraceAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.spans = flatten_spans([trace("t1"), trace("t2", geo_error=True)])
+
+    def test_flatten_spans(self):
+        self.assertEqual(len(self.spans), 6)
+        first = self.spans.iloc[0]
+        self.assertEqual(first["parent_span"], "ROOT")
+        self.assertEqual(first["response"], 200)
+        self.assertEqual(self.spans.iloc[1]["parent_span"], "a")
+        self.assertEqual(self.spans.iloc[1]["response"], "Unknown")
+        self.assertEqual(list(self.spans["has_error"]), [False] * 4 + [True, False])
+
+    def test_self_time(self):
+        self_time = add_self_time(self.spans)["self_time"]
+        self.assertEqual(list(self_time[:3]), [200, 700, 100])
+
+    def test_dependency_graph(self):
+        graph = dependency_graph(self.spans)
+        graph = graph.set_index(["parent_service", "child_service"])
+
+        self.assertEqual(len(graph), 2)
+        edge = graph.loc[("frontend", "geo")]
+        self.assertEqual(edge["calls"], 2)
+        self.assertAlmostEqual(edge["error_rate"], 0.5)
+        self.assertAlmostEqual(edge["p95_ms"], 0.8)
+
+    def test_suspicious_services(self):
+        ranking = suspicious_services(self.spans)
+        self.assertEqual(ranking.iloc[0]["service_name"], "geo")
+
+
+if __name__ == "__main__":
+    unittest.main()
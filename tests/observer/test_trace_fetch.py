@@ -0,0 +1,128 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import json
+import sys
+import time
+import threading
+import unittest
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from aiopslab.observer.trace_api import TraceAPI
+
+
+class StubJaeger:
+    """Minimal Jaeger query API: every service returns the same shared trace."""
+
+    def __init__(self, services, latency=0.0):
+        self.services = services
+        self.latency = latency
+        self.queries = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                time.sleep(stub.latency)
+                if url.path == "/api/services":
+                    data = stub.services
+                else:
+                    stub.queries.append(query)
+                    data = stub.traces(query["service"])
+                body = json.dumps({"data": data}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def traces(self, service):
+        def span(span_id, process):
+            return {
+                "spanID": span_id,
+                "processID": process,
+                "operationName": "op",
+                "startTime": 1,
+                "duration": 2,
+            }
+
+        processes = {"p1": {"serviceName": "frontend"}, "p2": {"serviceName": service}}
+        shared = {
+            "traceID": "shared",
+            "spans": [span("a", "p1"), span(service, "p2")],
+            "processes": processes,
+        }
+        own = {
+            "traceID": f"own-{service}",
+            "spans": [span("b", "p2")],
+            "processes": processes,
+        }
+        return [shared, own]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestTraceFetch(unittest.TestCase):
+    def setUp(self):
+        self.jaeger = StubJaeger(["frontend", "geo", "rate", "jaeger-all-in-one"])
+        self.api = TraceAPI("test-hotel-reservation", base_url=self.jaeger.url)
+
+    def tearDown(self):
+        self.jaeger.close()
+
+    def test_extract_traces_dedupes_and_uses_bounds(self):
+        end = datetime(2024, 11, 5, 10, 0, 0)
+        traces = self.api.extract_traces(end - timedelta(minutes=5), end)
+
+        ids = sorted(t["traceID"] for t in traces)
+        self.assertEqual(ids, ["own-frontend", "own-geo", "own-rate", "shared"])
+        services = sorted(q["service"] for q in self.jaeger.queries)
+        self.assertEqual(services, ["frontend", "geo", "rate"])
+        query = self.jaeger.queries[0]
+        self.assertEqual(int(query["end"]), int(end.timestamp() * 1_000_000))
+        self.assertEqual(int(query["end"]) - int(query["start"]), 300 * 1_000_000)
+
+        shared = next(t for t in traces if t["traceID"] == "shared")
+        self.assertEqual(shared["spans"][0]["serviceName"], "frontend")
+
+
+def benchmark(num_services=20, latency=0.05):
+    """Latency of fetching all services one by one vs. concurrently from a stub Jaeger."""
+    jaeger = StubJaeger([f"service-{i}" for i in range(num_services)], latency)
+    api = TraceAPI("test-hotel-reservation", base_url=jaeger.url)
+    end = datetime.now()
+    start = end - timedelta(minutes=5)
+
+    t0 = time.time()
+    for service in api.get_services():
+        api.get_traces(service, start, end)
+    sequential = time.time() - t0
+
+    t0 = time.time()
+    api.extract_traces(start, end)
+    concurrent = time.time() - t0
+    jaeger.close()
+
+    print(f"{num_services} services, {latency * 1000:.0f} ms per request")
+    print(f"sequential: {sequential:.2f}s  concurrent: {concurrent:.2f}s")
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        unittest.main()
@@ -0,0 +1,110 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import time
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from aiopslab.orchestrator.parallel import ClusterLock, is_cluster_scoped
+from aiopslab.service.apps.base import Application, namespace_suffix
+from aiopslab.service.apps.hotelres import HotelReservation
+from aiopslab.service.kubectl import KubeCtl
+from aiopslab.paths import SOCIAL_NETWORK_METADATA
+
+
+class TestClusterLock(unittest.TestCase):
+    def test_shared_holders_overlap(self):
+        lock = ClusterLock()
+        inside = []
+        peak = []
+
+        def worker():
+            with lock.hold():
+                inside.append(1)
+                peak.append(len(inside))
+                time.sleep(0.05)
+                inside.pop()
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertGreater(max(peak), 1)
+
+    def test_exclusive_runs_alone(self):
+        lock = ClusterLock()
+        events = []
+
+        def shared():
+            with lock.hold():
+                events.append("shared-start")
+                time.sleep(0.05)
+                events.append("shared-end")
+
+        def exclusive():
+            time.sleep(0.01)
+            with lock.hold(exclusive=True):
+                events.append("exclusive")
+
+        threads = [threading.Thread(target=shared), threading.Thread(target=exclusive)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(events, ["shared-start", "shared-end", "exclusive"])
+
+
+class TestNamespaceIsolation(unittest.TestCase):
+    def test_cluster_scoped(self):
+        self.assertTrue(is_cluster_scoped("pod_kill_hotel_res-detection-1"))
+        self.assertTrue(is_cluster_scoped("assign_to_non_existent_node_social_net-detection-1"))
+        for problem_id in (
+            "kernel_fault_hotel_reservation-detection-1",
+            "disk_woreout-localization-1",
+            "operator_overload_replicas-detection-1",
+        ):
+            self.assertTrue(is_cluster_scoped(problem_id), problem_id)
+        self.assertFalse(is_cluster_scoped("k8s_target_port-misconfig-detection-1"))
+
+    def test_namespace_suffix(self):
+        app = Application(SOCIAL_NETWORK_METADATA)
+        with namespace_suffix("-w1"):
+            app.load_app_json()
+        self.assertEqual(app.namespace, "test-social-network-w1")
+        self.assertEqual(app.helm_configs["namespace"], "test-social-network-w1")
+
+        app.load_app_json()
+        self.assertEqual(app.namespace, "test-social-network")
+
+    @patch("aiopslab.service.apps.hotelres.time.sleep")
+    def test_cleanup_deletes_only_its_own_volumes(self, _):
+        def pv(name, namespace):
+            claim = SimpleNamespace(namespace=namespace)
+            return SimpleNamespace(
+                metadata=SimpleNamespace(name=name),
+                spec=SimpleNamespace(claim_ref=claim),
+            )
+
+        kubectl = KubeCtl.__new__(KubeCtl)
+        kubectl.core_v1_api = MagicMock()
+        kubectl.core_v1_api.list_persistent_volume.return_value.items = [
+            pv("pv-main", "test-hotel-reservation"),
+            pv("pv-worker", "test-hotel-reservation-w1"),
+        ]
+        kubectl.exec_command = MagicMock(return_value="")
+        kubectl.delete_namespace = MagicMock()
+        app = HotelReservation.__new__(HotelReservation)
+        app.kubectl = kubectl
+        app.namespace = "test-hotel-reservation"
+
+        app.cleanup()
+
+        commands = [c.args[0] for c in kubectl.exec_command.call_args_list]
+        self.assertIn("kubectl delete pv pv-main", commands)
+        self.assertFalse(any("pv-worker" in c for c in commands))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import unittest
+from unittest.mock import MagicMock
+from aiopslab.orchestrator.warm_env import (
+    WarmEnvironment,
+    fingerprint,
+    touched_services,
+)
+
+
+class TestWarmEnvironment(unittest.TestCase):
+    def setUp(self):
+        self.kubectl = MagicMock()
+        self.env = WarmEnvironment(self.kubectl)
+
+    def test_first_use_deploys(self):
+        setup = MagicMock()
+        saved = self.env.ensure("prometheus", "abc", lambda: True, setup)
+        self.assertEqual(saved, 0.0)
+        setup.assert_called_once()
+
+    def test_reuses_healthy_component(self):
+        setup = MagicMock()
+        self.env.ensure("prometheus", "abc", lambda: True, setup)
+        self.env.setup_costs["prometheus"] = 42.0
+
+        saved = self.env.ensure("prometheus", "abc", lambda: True, setup)
+        self.assertEqual(saved, 42.0)
+        self.assertEqual(self.env.total_saved, 42.0)
+        setup.assert_called_once()
+
+    def test_redeploys_on_changed_fingerprint(self):
+        setup = MagicMock()
+        self.env.ensure("app:ns", "v1", lambda: True, setup)
+        self.env.ensure("app:ns", "v2", lambda: True, setup)
+        self.assertEqual(setup.call_count, 2)
+
+    def test_redeploys_unhealthy_component(self):
+        setup = MagicMock()
+        self.env.ensure("openebs", "v1", lambda: False, setup)
+        self.env.ensure("openebs", "v1", lambda: False, setup)
+        self.assertEqual(setup.call_count, 2)
+
+    def test_reset_restarts_touched_services(self):
+        problem = MagicMock()
+        problem.app.namespace = "test-social-network"
+        problem.faulty_service = "user-service"
+        problem.sys_status_after_recovery.return_value = False
+
+        self.env.fingerprints["app:test-social-network"] = "v1"
+        self.env.reset(problem)
+
+        self.kubectl.exec_command.assert_called_once_with(
+            "kubectl rollout restart deployment user-service -n test-social-network"
+        )
+        self.assertIn("app:test-social-network", self.env.fingerprints)
+
+    def test_reset_invalidates_unrecoverable_app(self):
+        problem = MagicMock()
+        problem.app.namespace = "test-hotel-reservation"
+        problem.faulty_service = ["geo"]
+        problem.sys_status_after_recovery.return_value = False
+        self.kubectl.wait_for_ready.side_effect = Exception("timeout")
+
+        self.env.fingerprints["app:test-hotel-reservation"] = "v1"
+        self.env.reset(problem)
+        self.assertNotIn("app:test-hotel-reservation", self.env.fingerprints)
+
+    def test_helpers(self):
+        self.assertEqual(fingerprint({"a": 1, "b": 2}), fingerprint({"b": 2, "a": 1}))
+        self.assertEqual(touched_services(MagicMock(faulty_service="PLACEHOLDER")), [])
+        self.assertEqual(touched_services(MagicMock(faulty_service="geo")), ["geo"])
+
+
+if __name__ == "__main__":
+    unittest.main()
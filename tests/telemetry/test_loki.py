@@ -0,0 +1,138 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+
+import re
+import threading
+import unittest
+from unittest.mock import patch
+
+from aiopslab.service.telemetry import loki
+from aiopslab.service.telemetry.loki import (
+    NANOS,
+    POD_NAME_SUFFIX,
+    Loki,
+    pod_stream_selector,
+)
+
+START = 1_700_000_000 * NANOS
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    """Answers query_range like Loki: [start, end), sorted by direction, limited."""
+
+    def __init__(self, entries):
+        # (timestamp, pod, line)
+        self.entries = entries
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params, timeout):
+        with self._lock:
+            self.requests.append(params)
+        start, end = int(params["start"]), int(params["end"])
+        backward = params["direction"] == "backward"
+        matches = sorted(
+            (e for e in self.entries if start <= e[0] < end),
+            key=lambda e: e[0],
+            reverse=backward,
+        )[: params["limit"]]
+        streams = {}
+        for ts, pod, line in matches:
+            streams.setdefault(pod, []).append([str(ts), line])
+        result = [
+            {"stream": {"namespace": "hotel", "pod": pod}, "values": values}
+            for pod, values in streams.items()
+        ]
+        return FakeResponse({"data": {"resultType": "streams", "result": result}})
+
+
+def make_entries(count, pods=("geo-1", "geo-2"), spacing=NANOS):
+    # Pairs of entries share a timestamp to exercise the pagination cursor
+    return [
+        (START + (i // 2) * spacing, pods[i % len(pods)], f"line {i}")
+        for i in range(count)
+    ]
+
+
+class TestLoki(unittest.TestCase):
+    def test_paginates_without_loss_or_duplicates(self):
+        entries = make_entries(95)
+        session = FakeSession(entries)
+        client = Loki("http://loki:3100", session=session)
+
+        for direction in ("forward", "backward"):
+            got = list(
+                client.iter_range("{}", START, START + 600 * NANOS, direction, limit=10)
+            )
+            self.assertEqual(sorted(e[2] for e in got), sorted(e[2] for e in entries))
+            timestamps = [e[0] for e in got]
+            self.assertEqual(
+                timestamps, sorted(timestamps, reverse=direction == "backward")
+            )
+        self.assertGreater(len(session.requests), 20)
+
+    def test_long_ranges_are_split_into_windows(self):
+        entries = make_entries(200, spacing=60 * NANOS)
+        session = FakeSession(entries)
+        client = Loki("http://loki:3100", session=session)
+
+        with patch.object(loki, "WINDOW_SECONDS", 600):
+            got = list(client.iter_range("{}", START, START + 6000 * NANOS))
+
+        self.assertEqual([e[2] for e in got], [e[2] for e in entries])
+        self.assertEqual(len({r["start"] for r in session.requests}), 10)
+
+    def test_get_pod_logs(self):
+        session = FakeSession(make_entries(4))
+        client = Loki("http://loki:3100", session=session)
+
+        logs = client.get_pod_logs(
+            "hotel", "geo", START, START + 10 * NANOS, timestamps=True
+        )
+
+        self.assertEqual(
+            logs,
+            "==> geo-1 <==\n"
+            "2023-11-14T22:13:20.000000000Z line 0\n"
+            "2023-11-14T22:13:21.000000000Z line 2\n\n"
+            "==> geo-2 <==\n"
+            "2023-11-14T22:13:20.000000000Z line 1\n"
+            "2023-11-14T22:13:21.000000000Z line 3",
+        )
+        self.assertEqual(
+            session.requests[0]["query"],
+            f'{{namespace="hotel", pod=~"geo{POD_NAME_SUFFIX}"}}',
+        )
+
+    def test_pod_selection(self):
+        self.assertEqual(
+            pod_stream_selector(
+                "astronomy-shop", "frontend", "app.kubernetes.io/name=frontend"
+            ),
+            '{namespace="astronomy-shop", app="frontend"}',
+        )
+
+        # Loki anchors regex matchers at both ends
+        pattern = re.compile(re.escape("frontend") + POD_NAME_SUFFIX)
+        for pod in ("frontend-5d8f7c9b4-x2bqz", "frontend-x2bqz", "frontend-0"):
+            self.assertTrue(pattern.fullmatch(pod), pod)
+        for pod in ("frontend-proxy-5d8f7c9b4-x2bqz", "frontend-proxy-0"):
+            self.assertFalse(pattern.fullmatch(pod), pod)
+
+        selector = pod_stream_selector("hotel", "geo.v2")
+        self.assertIn('pod=~"geo\\\\.v2-', selector)
+
+
+if __name__ == "__main__":
+    unittest.main()